@@ -0,0 +1,280 @@
+import sys
+import os
+import json
+from collections import Counter
+from pathlib import Path
+from cleaner import compile_rules, read_rules, INVALID_CHARS_RE, compile_rules_steps, is_regex_rule
+from rename import DEFAULT_IGNORE_DIRS
+
+STYLES = ['kebab', 'snake', 'lower-camel', 'upper-camel']
+
+
+class RuleStats:
+    """Per-rule counters collected while tracing a corpus"""
+
+    def __init__(self, keyword, replacement):
+        self.keyword = keyword
+        self.replacement = replacement
+        self.hits = 0           # names the rule changed
+        self.occurrences = 0    # total replaced substrings
+        self.native_hits = 0    # keyword present in the lowercased input name
+        self.chained_hits = 0   # keyword only present because an earlier rule produced it
+        self.feeders = Counter()
+
+    def to_dict(self):
+        return {
+            'keyword': self.keyword,
+            'replacement': self.replacement,
+            'hits': self.hits,
+            'occurrences': self.occurrences,
+            'native_hits': self.native_hits,
+            'chained_hits': self.chained_hits,
+            'feeders': dict(self.feeders),
+        }
+
+
+def collect_names(folder_path: Path, ignore_dirs=None, cancelled=None):
+    """Collect the unique file and folder names below folder_path"""
+    if ignore_dirs is None:
+        ignore_dirs = DEFAULT_IGNORE_DIRS
+    names = set()
+    for root, dirs, files in os.walk(folder_path):
+        if cancelled is not None and cancelled():
+            break
+        dirs[:] = [d for d in dirs if d not in ignore_dirs]
+        names.update(dirs)
+        names.update(files)
+    return names
+
+
+def read_names_file(path):
+    """Read a corpus of names, one per line"""
+    with open(path, encoding='utf-8') as f:
+        return {line.rstrip('\n') for line in f if line.strip()}
+
+
+def trace_corpus(names, rules):
+    """Apply rules to every name and record which rules fire and why"""
+    stats = [RuleStats(k, v) for k, v in rules.items()]
+    # Steps are one per rule, regex rules come precompiled
+    steps = [step if keyword is None else None for keyword, step in compile_rules_steps(rules)]
+    for original in names:
+        lowered = original.lower()
+        name = lowered
+        fired = []
+        for index, regex in enumerate(steps):
+            if regex is not None:
+                name, count = regex.subn(name)
+                if count:
+                    rule = stats[index]
+                    rule.hits += 1
+                    rule.occurrences += count
+                    if regex.pattern.search(lowered):
+                        rule.native_hits += 1
+                    else:
+                        rule.chained_hits += 1
+                    fired.append(index)
+                continue
+            rule = stats[index]
+            count = name.count(rule.keyword) if rule.keyword else 0
+            if not count:
+                continue
+            rule.hits += 1
+            rule.occurrences += count
+            if rule.keyword in lowered:
+                rule.native_hits += 1
+            else:
+                rule.chained_hits += 1
+                for feeder in fired:
+                    if rule.keyword in stats[feeder].replacement:
+                        rule.feeders[stats[feeder].keyword] += 1
+            name = name.replace(rule.keyword, rule.replacement)
+            fired.append(index)
+    return stats
+
+
+def may_reproduce(replacement, keyword):
+    # A deletion can join neighbours into keyword, a replacement can spell it out.
+    # Patterns and group references could match or produce anything
+    if is_regex_rule(keyword) or '\\' in replacement:
+        return True
+    return replacement == '' or any(c in keyword for c in replacement)
+
+
+def static_findings(rules):
+    """Find rules that provably never change the result of clean_name"""
+    items = list(rules.items())
+    findings = {}
+    for index, (keyword, replacement) in enumerate(items):
+        if is_regex_rule(keyword):
+            # Regex rules are only checked for validity, their effect isn't predicted statically
+            try:
+                compile_rules_steps({keyword: replacement})
+            except ValueError as e:
+                findings[keyword] = ('invalid', str(e))
+            continue
+        if not keyword:
+            findings[keyword] = ('empty', 'empty keyword inserts the replacement between every character')
+            continue
+        if keyword == replacement:
+            findings[keyword] = ('noop', 'keyword and replacement are identical')
+            continue
+        if keyword != keyword.lower() and not any(v != v.lower() for _, v in items[:index]):
+            findings[keyword] = ('unreachable', 'names are lowercased before rules run')
+            continue
+        for earlier in range(index):
+            earlier_keyword = items[earlier][0]
+            if not earlier_keyword or is_regex_rule(earlier_keyword) or earlier_keyword not in keyword:
+                continue
+            between = items[earlier:index]
+            if not any(may_reproduce(v, earlier_keyword) for _, v in between):
+                findings[keyword] = ('shadowed', f'every match is consumed by earlier rule "{earlier_keyword}"')
+                break
+        if keyword in findings:
+            continue
+        later = items[index + 1:]
+        if (replacement == '' and all(INVALID_CHARS_RE.fullmatch(c) for c in keyword)
+                and all(len(k) == 1 and k not in keyword for k, _ in later)):
+            findings[keyword] = ('filtered', 'the invalid-character filter removes these characters anyway')
+    return findings
+
+
+def minimize_rules(rules):
+    """Drop provably redundant rules until nothing more can be removed"""
+    minimized = dict(rules)
+    removed = {}
+    while True:
+        findings = {k: f for k, f in static_findings(minimized).items() if f[0] not in ('empty', 'invalid')}
+        if not findings:
+            return minimized, removed
+        # Remove one rule at a time, later findings may depend on it
+        keyword = next(iter(findings))
+        removed[keyword] = findings[keyword]
+        del minimized[keyword]
+
+
+def fold_chains(rules, stats):
+    """Fold rules that only ever fire on text produced by a single earlier rule"""
+    folded = dict(rules)
+    merged = []
+    keys = list(rules)
+    for rule in stats:
+        if rule.keyword not in folded or rule.native_hits or not rule.chained_hits or is_regex_rule(rule.keyword):
+            continue
+        if len(rule.feeders) != 1:
+            continue
+        feeder = next(iter(rule.feeders))
+        if feeder not in folded or is_regex_rule(feeder):
+            continue
+        start, end = keys.index(feeder), keys.index(rule.keyword)
+        # Rules in between could also rewrite the feeder output, keep those chains
+        if any(k in folded[feeder] for k in keys[start + 1:end] if k in folded):
+            continue
+        folded[feeder] = folded[feeder].replace(rule.keyword, rule.replacement)
+        del folded[rule.keyword]
+        merged.append((feeder, rule.keyword))
+    return folded, merged
+
+
+def equivalent_on(names, rules_a, rules_b):
+    """Return the names whose cleaned form differs between two rule sets"""
+    cleaners = [(compile_rules(rules_a, style).clean, compile_rules(rules_b, style).clean) for style in STYLES]
+    return [name for name in names for clean_a, clean_b in cleaners if clean_a(name) != clean_b(name)]
+
+
+def analyze(names, rules, fold=False):
+    """Analyze rules against names and build a minimized rule set"""
+    names = sorted(names)
+    stats = trace_corpus(names, rules)
+    findings = static_findings(rules)
+    minimized, removed = minimize_rules(rules)
+    merged = []
+    if fold:
+        candidate, merged = fold_chains(minimized, trace_corpus(names, minimized))
+        if not equivalent_on(names, minimized, candidate):
+            minimized = candidate
+        else:
+            merged = []
+    mismatches = equivalent_on(names, rules, minimized)
+    return {
+        'names': len(names),
+        'rules': [rule.to_dict() for rule in stats],
+        'findings': {k: {'kind': kind, 'reason': reason} for k, (kind, reason) in findings.items()},
+        'removed': {k: {'kind': kind, 'reason': reason} for k, (kind, reason) in removed.items()},
+        'never_fired': [rule.keyword for rule in stats if not rule.hits],
+        'chains': [
+            {'rule': rule.keyword, 'feeder': feeder, 'count': count}
+            for rule in stats for feeder, count in rule.feeders.items()
+        ],
+        'merged': [{'feeder': a, 'rule': b} for a, b in merged],
+        'minimized': minimized,
+        'mismatches': mismatches,
+    }
+
+
+def print_report(result):
+    print(f"📊 Analyzed {len(result['rules'])} rules on {result['names']} names")
+    print("\n📝 Rule hits (names / occurrences / via chain):")
+    for rule in result['rules']:
+        print(f"  {rule['keyword']!r} → {rule['replacement']!r}: "
+              f"{rule['hits']} / {rule['occurrences']} / {rule['chained_hits']}")
+    if result['findings']:
+        print("\n⚠️ Dead or shadowed rules:")
+        for keyword, finding in result['findings'].items():
+            print(f"  {keyword!r} [{finding['kind']}] {finding['reason']}")
+    if result['never_fired']:
+        print("\n💤 Rules that never fired on this corpus:")
+        for keyword in result['never_fired']:
+            print(f"  {keyword!r}")
+    if result['chains']:
+        print("\n🔗 Chains (rule fired only on text produced by an earlier rule):")
+        for chain in result['chains']:
+            print(f"  {chain['feeder']!r} → {chain['rule']!r} ({chain['count']} names)")
+    for merge in result['merged']:
+        print(f"  merged {merge['rule']!r} into {merge['feeder']!r}")
+    print(f"\n✂️ Minimized rule set: {len(result['minimized'])} of {len(result['rules'])} rules")
+    if result['mismatches']:
+        print(f"❌ Minimized rules differ on {len(result['mismatches'])} names")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Analyze naming rules against a corpus of names.")
+    parser.add_argument("corpus", help="Folder to collect names from, or a text file with one name per line.")
+    parser.add_argument("--rules", default="rules.json", help="Rules file to analyze (default: rules.json)")
+    parser.add_argument("--ignore", help="Comma-separated list of directories to ignore (default: .git,node_modules,.venv)")
+    parser.add_argument("--fold-chains", action="store_true", help="Merge chain-only rules into their feeder (verified on the corpus)")
+    parser.add_argument("--output", help="Write the minimized rules to this file (optional)")
+    parser.add_argument("--json", action="store_true", help="Print the analysis as JSON")
+    args = parser.parse_args()
+
+    corpus = Path(args.corpus)
+    if not corpus.exists():
+        print(f"❌ Corpus does not exist: {corpus}")
+        sys.exit(1)
+    rules = read_rules(args.rules)
+
+    if corpus.is_dir():
+        ignore_dirs = set(args.ignore.split(',')) if args.ignore else None
+        names = collect_names(corpus, ignore_dirs)
+    else:
+        names = read_names_file(corpus)
+
+    result = analyze(names, rules, fold=args.fold_chains)
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print_report(result)
+
+    if args.output:
+        if result['mismatches']:
+            print(f"❌ Not writing {args.output}: minimized rules are not equivalent")
+            sys.exit(1)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result['minimized'], f, indent=2, ensure_ascii=False)
+        print(f"\n📝 Minimized rules written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
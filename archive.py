@@ -0,0 +1,242 @@
+import sys
+import os
+import struct
+import tarfile
+import zipfile
+from pathlib import PurePosixPath
+from cleaner import compile_rules, read_rules
+
+# Bytes copied per read when streaming member data
+COPY_BUFFER = 1024 * 1024
+
+# Zip local file header: signature .. extra field length
+_LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+_ZIP64_EXTRA_ID = 0x0001
+_DATA_DESCRIPTOR_FLAG = 0x08
+
+
+def suffixed(name, number, style):
+    """Add a collision counter to name, keeping the extension"""
+    stem, dot, ext = name.partition('.') if not name.startswith('.') else (name, '', '')
+    if style == 'snake':
+        stem = f"{stem}_{number}"
+    elif style in ('lower-camel', 'upper-camel'):
+        stem = f"{stem}{number}"
+    else:
+        stem = f"{stem}-{number}"
+    return stem + dot + ext
+
+
+class MemberNamer:
+    """Clean archive member paths component by component, resolving collisions"""
+
+    # Every target path is remembered to detect collisions, so memory grows with the
+    # number of members (their names, never their data)
+    def __init__(self, style='kebab', rules=None):
+        self.style = style
+        self.rules = rules
+        self.clean = compile_rules(rules, style).clean
+        self.dirs = {'': ''}
+        self.used = set()
+        # Paths that are already clean, kept for their own member
+        self.reserved = set()
+        self.collisions = []
+
+    def reserve(self, names):
+        """Claim the member paths that are already clean, so a dirty name never takes one of them"""
+        for name in names:
+            path = ''
+            for part in name.rstrip('/').split('/'):
+                if (self.clean(part) or part) != part:
+                    break
+                path = f"{path}/{part}" if path else part
+                self.reserved.add(path)
+
+    def _unique(self, source, parent, name):
+        target = f"{parent}/{name}" if parent else name
+        number = 1
+        while target in self.used or (target in self.reserved and target != source):
+            candidate = suffixed(name, number, self.style)
+            target = f"{parent}/{candidate}" if parent else candidate
+            number += 1
+        if number > 1:
+            self.collisions.append((source, target))
+        self.used.add(target)
+        return target
+
+    def directory(self, path):
+        """Map a source directory path (no trailing slash) to its target"""
+        target = self.dirs.get(path)
+        if target is None:
+            parent, _, name = path.rpartition('/')
+            target = self._unique(path, self.directory(parent), self.clean(name) or name)
+            self.dirs[path] = target
+        return target
+
+    def member(self, name, is_dir):
+        """Map a member name; directories keep their trailing slash"""
+        path = name.rstrip('/')
+        if is_dir:
+            return self.directory(path) + '/'
+        parent, _, base = path.rpartition('/')
+        return self._unique(path, self.directory(parent), self.clean(base) or base)
+
+
+def _strip_zip64_extra(extra):
+    # The zip64 sizes are rewritten by zipfile, keep every other extra record
+    kept = []
+    offset = 0
+    while offset + 4 <= len(extra):
+        header_id, size = struct.unpack('<HH', extra[offset:offset + 4])
+        if header_id != _ZIP64_EXTRA_ID:
+            kept.append(extra[offset:offset + 4 + size])
+        offset += 4 + size
+    return b''.join(kept)
+
+
+def _copy_raw(src_fp, dst_fp, size):
+    while size:
+        chunk = src_fp.read(min(COPY_BUFFER, size))
+        if not chunk:
+            raise zipfile.BadZipFile('truncated member data')
+        dst_fp.write(chunk)
+        size -= len(chunk)
+
+
+def rename_zip(src, dst, namer, on_member=None):
+    """Copy a zip with renamed members, moving compressed data without recompressing it"""
+    with zipfile.ZipFile(src) as source, open(src, 'rb') as raw, zipfile.ZipFile(dst, 'w') as target:
+        namer.reserve(info.filename for info in source.infolist())
+        for info in source.infolist():
+            new_name = namer.member(info.filename, info.is_dir())
+            raw.seek(info.header_offset)
+            header = _LOCAL_HEADER.unpack(raw.read(_LOCAL_HEADER.size))
+            if header[0] != zipfile.stringFileHeader:
+                raise zipfile.BadZipFile(f'bad local header for {info.filename}')
+            raw.seek(header[-2] + header[-1], os.SEEK_CUR)
+
+            zinfo = zipfile.ZipInfo(new_name, info.date_time)
+            for attr in ('compress_type', 'comment', 'create_system', 'create_version', 'extract_version',
+                         'reserved', 'volume', 'internal_attr', 'external_attr', 'CRC', 'compress_size', 'file_size'):
+                setattr(zinfo, attr, getattr(info, attr))
+            zinfo.extra = _strip_zip64_extra(info.extra)
+            # Sizes and CRC are known from the central directory, so no data descriptor is needed
+            zinfo.flag_bits = info.flag_bits & ~_DATA_DESCRIPTOR_FLAG & ~0x800
+
+            # zipfile has no public raw-copy API; this mirrors what ZipFile.write does
+            zinfo.header_offset = target.fp.tell()
+            target.fp.write(zinfo.FileHeader())
+            _copy_raw(raw, target.fp, info.compress_size)
+            target.filelist.append(zinfo)
+            target.NameToInfo[zinfo.filename] = zinfo
+            target.start_dir = target.fp.tell()
+            if on_member is not None:
+                on_member(info.filename, new_name)
+
+
+def _tar_mode(path, reading):
+    name = str(path).lower()
+    if reading:
+        return 'r|*'
+    for suffixes, compression in (
+        (('.tar.gz', '.tgz'), 'gz'),
+        (('.tar.bz2', '.tbz2', '.tbz'), 'bz2'),
+        (('.tar.xz', '.txz'), 'xz'),
+    ):
+        if name.endswith(suffixes):
+            return f'w|{compression}'
+    return 'w|'
+
+
+def rename_tar(src, dst, namer, on_member=None):
+    """Stream a tar archive into a new one with renamed members"""
+    # A first pass over the headers finds the names that are already clean; the data is
+    # skipped, though a compressed archive is decompressed twice
+    with tarfile.open(src, _tar_mode(src, True)) as source:
+        namer.reserve(member.name for member in source)
+    # Old path -> new path of the members whose path changed, for links to them
+    renamed = {}
+    # Stream-mode tarfile needs a str name to pick the gzip header
+    dst = os.fspath(dst)
+    with tarfile.open(src, _tar_mode(src, True)) as source, tarfile.open(dst, _tar_mode(dst, False)) as target:
+        for member in source:
+            old_name = member.name
+            member.name = namer.member(old_name, member.isdir()).rstrip('/') or old_name
+            if member.name != old_name.rstrip('/'):
+                renamed[old_name.rstrip('/')] = member.name
+            if member.islnk():
+                member.linkname = renamed.get(member.linkname, member.linkname)
+            elif member.issym() and not member.linkname.startswith('/'):
+                # Follow the rename when the link points at a member already seen
+                parent = PurePosixPath(old_name).parent
+                resolved = os.path.normpath(str(parent / member.linkname))
+                if resolved in renamed:
+                    member.linkname = os.path.relpath(renamed[resolved], str(PurePosixPath(member.name).parent))
+            if member.isreg():
+                target.addfile(member, source.extractfile(member))
+            else:
+                target.addfile(member)
+            if on_member is not None:
+                on_member(old_name, member.name)
+
+
+def rename_archive(src, dst, style='kebab', rules=None, on_member=None):
+    """Write dst with every member name of src cleaned; returns the collisions resolved"""
+    namer = MemberNamer(style, rules)
+    if zipfile.is_zipfile(src):
+        rename_zip(src, dst, namer, on_member)
+    elif tarfile.is_tarfile(src):
+        rename_tar(src, dst, namer, on_member)
+    else:
+        raise ValueError(f"Unsupported archive format: {src}")
+    return namer.collisions
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Clean member names inside a zip or tar archive without extracting it.")
+    parser.add_argument("source", help="Archive to read (zip, tar, tar.gz, tar.bz2, tar.xz)")
+    parser.add_argument("target", help="Archive to write; for tar, the suffix picks the compression")
+    parser.add_argument("--style", choices=['kebab', 'snake', 'lower-camel', 'upper-camel'], default='kebab', help="Naming style (default: kebab)")
+    parser.add_argument("--rules", help="Rules file to use (default: rules.json)")
+    parser.add_argument("--quiet", action="store_true", help="Only print the summary")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.source):
+        print(f"❌ Archive does not exist: {args.source}")
+        sys.exit(1)
+    if os.path.abspath(args.source) == os.path.abspath(args.target):
+        print("❌ Target must be a different file than the source")
+        sys.exit(1)
+    rules = read_rules(args.rules) if args.rules else None
+
+    count = 0
+    renamed = 0
+
+    def on_member(old, new):
+        nonlocal count, renamed
+        count += 1
+        if old.rstrip('/') != new.rstrip('/'):
+            renamed += 1
+            if not args.quiet:
+                print(f"  {old} → {new}")
+
+    # Write next to the target and move it into place, keeping the suffix for tar compression
+    directory, name = os.path.split(os.path.abspath(args.target))
+    partial = os.path.join(directory, f'.partial-{name}')
+    try:
+        collisions = rename_archive(args.source, partial, args.style, rules, on_member)
+        os.replace(partial, args.target)
+    except Exception as e:
+        if os.path.exists(partial):
+            os.remove(partial)
+        print(f"❌ {e}")
+        sys.exit(1)
+    for source, target in collisions:
+        print(f"⚠️ Name collision: {source} → {target}")
+    print(f"\n✅ Wrote {args.target}: {renamed} of {count} members renamed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import weakref
+from pathlib import Path
+from cleaner import compile_rules
+from rename import apply_rename, walk_tree
+
+# Entries listed per executor job; a directory is always read whole
+DEFAULT_CHUNK_SIZE = 512
+# Renames applied per executor job
+DEFAULT_APPLY_CHUNK_SIZE = 64
+# Blocking jobs in flight at once, shared by every root unless a limiter is passed
+DEFAULT_CONCURRENCY = 8
+
+# One shared limiter per event loop
+_default_limiters = weakref.WeakKeyDictionary()
+
+
+def default_limiter():
+    """The semaphore bounding blocking jobs across all roots on the running loop"""
+    loop = asyncio.get_running_loop()
+    limiter = _default_limiters.get(loop)
+    if limiter is None:
+        limiter = _default_limiters[loop] = asyncio.Semaphore(DEFAULT_CONCURRENCY)
+    return limiter
+
+
+async def _run_blocking(limiter, func, *args):
+    async with limiter:
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+def _advance(walk, size):
+    """Run the walk until about size entries have been listed; returns its items, [] at the end"""
+    items = []
+    listed = 0
+    for item in walk:
+        items.append(item)
+        listed += len(item[1]) + len(item[2])
+        if listed >= size:
+            break
+    return items
+
+
+async def aiter_renames(folder_path: Path, ignore_dirs=None, style='kebab', chunk_size=DEFAULT_CHUNK_SIZE,
+                        limiter=None, symlinks='skip', one_file_system=False, include_mounts=None,
+                        on_skip_mount=None, dir_configs=True):
+    """Async version of rename.iter_renames, walking the tree in executor chunks"""
+    # rename.walk_tree reads every directory completely before it is yielded, and
+    # yields it only after everything inside it, so entries can be applied as they
+    # arrive without a listing seeing them again. on_skip_mount runs on an executor thread
+    if limiter is None:
+        limiter = default_limiter()
+    config = None
+    if dir_configs:
+        from dirconfig import DirConfig
+        config = DirConfig.root(None, style, ignore_dirs)
+    clean = compile_rules(None, style).clean
+    stop = threading.Event()
+    walk = walk_tree(folder_path, ignore_dirs, symlinks, stop.is_set, one_file_system, include_mounts,
+                     on_skip_mount, config)
+    try:
+        while True:
+            items = await _run_blocking(limiter, _advance, walk, chunk_size)
+            if not items:
+                return
+            for current, files, dirs, dir_config in items:
+                if dir_config is not None:
+                    clean = dir_config.ruleset.clean
+                for name in files + dirs:
+                    new_name = clean(name)
+                    if new_name != name:
+                        yield current / name, current / new_name
+    finally:
+        # A job still in the executor stops at its next directory
+        stop.set()
+
+
+async def aapply_renames(changes, use_git=False, chunk_size=DEFAULT_APPLY_CHUNK_SIZE, limiter=None):
+    """Apply (old, new) pairs from an iterable or async iterable in order; returns the applied pairs"""
+    # On cancellation the chunk already in the executor finishes, the rest is left untouched
+    if limiter is None:
+        limiter = default_limiter()
+    applied = []
+    pending = []
+
+    def apply_chunk(chunk):
+        for old_path, new_path in chunk:
+            apply_rename(old_path, new_path, use_git)
+            applied.append((old_path, new_path))
+
+    async def flush():
+        chunk = list(pending)
+        pending.clear()
+        await _run_blocking(limiter, apply_chunk, chunk)
+
+    if hasattr(changes, '__aiter__'):
+        async for change in changes:
+            pending.append(change)
+            if len(pending) >= chunk_size:
+                await flush()
+    else:
+        for change in changes:
+            pending.append(change)
+            if len(pending) >= chunk_size:
+                await flush()
+    if pending:
+        await flush()
+    return applied
+
+
+async def arename_recursive(folder_path: Path, apply=False, ignore_dirs=None, use_git=False, style='kebab',
+                            limiter=None, symlinks='skip', one_file_system=False, include_mounts=None,
+                            on_skip_mount=None, dir_configs=True):
+    """Async counterpart of rename.rename_recursive"""
+    changes = [change async for change in aiter_renames(folder_path, ignore_dirs, style, limiter=limiter,
+                                                        symlinks=symlinks, one_file_system=one_file_system,
+                                                        include_mounts=include_mounts,
+                                                        on_skip_mount=on_skip_mount, dir_configs=dir_configs)]
+    if apply:
+        await aapply_renames(changes, use_git, limiter=limiter)
+    return changes
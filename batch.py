@@ -0,0 +1,88 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from rename import rename_recursive, mount_entries
+from throttle import make_limiter
+
+
+def read_manifest(path):
+    """Read one root per line; blank lines and lines starting with # are skipped"""
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+
+def run_root(root, apply=False, ignore_dirs=None, use_git=False, style='kebab', git_index=False,
+             max_ops=None, adaptive=False, symlinks='skip', one_file_system=False, include_mounts=None,
+             dir_configs=True):
+    """Process one root; failures are reported in the summary instead of raised"""
+    start = time.perf_counter()
+    summary = {'root': str(root), 'status': 'ok', 'renamed': 0, 'changes': [], 'error': None}
+    skipped = summary['skipped_mounts'] = []
+
+    def on_skip_mount(path):
+        skipped.append({'path': str(path), 'entries': mount_entries(path)})
+
+    limiter = make_limiter(max_ops, adaptive) if apply else None
+    try:
+        folder = Path(root)
+        if not folder.is_dir():
+            raise FileNotFoundError(f"Folder does not exist: {folder}")
+        changes = rename_recursive(folder, apply=apply, ignore_dirs=ignore_dirs, use_git=use_git, style=style,
+                                   git_index=git_index, limiter=limiter, symlinks=symlinks,
+                                   one_file_system=one_file_system, include_mounts=include_mounts,
+                                   on_skip_mount=on_skip_mount, dir_configs=dir_configs)
+        summary['renamed'] = len(changes)
+        summary['changes'] = [[str(old), str(new)] for old, new in changes]
+        if limiter is not None:
+            summary['ops_per_sec'] = round(limiter.achieved_rate(), 1)
+    except Exception as e:
+        summary['status'] = 'error'
+        summary['error'] = f"{type(e).__name__}: {e}"
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+    return summary
+
+
+def run_batch(roots, workers=None, apply=False, ignore_dirs=None, use_git=False, style='kebab', git_index=False,
+              max_ops=None, adaptive=False, symlinks='skip', one_file_system=False, include_mounts=None,
+              dir_configs=True, on_result=None):
+    """Process many roots on a process pool and return an aggregated report"""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    roots = list(dict.fromkeys(roots))
+    if max_ops or adaptive:
+        # Roots run side by side, so each worker gets an even share of the limit
+        from throttle import DEFAULT_ADAPTIVE_MAX
+        max_ops = (max_ops or DEFAULT_ADAPTIVE_MAX) / min(workers, max(len(roots), 1))
+    start = time.perf_counter()
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(run_root, root, apply, ignore_dirs, use_git, style, git_index, max_ops, adaptive,
+                            symlinks, one_file_system, include_mounts, dir_configs): root
+            for root in roots
+        }
+        for future in as_completed(futures):
+            root = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                # The worker process itself died (e.g. killed or out of memory)
+                summary = {'root': str(root), 'status': 'error', 'renamed': 0, 'changes': [],
+                           'error': f"{type(e).__name__}: {e}", 'seconds': None}
+            results[root] = summary
+            if on_result is not None:
+                on_result(summary)
+    ordered = [results[root] for root in roots]
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'style': style,
+        'applied': apply,
+        'workers': workers,
+        'seconds': round(time.perf_counter() - start, 3),
+        'roots': len(ordered),
+        'failed': sum(1 for summary in ordered if summary['status'] != 'ok'),
+        'renamed': sum(summary['renamed'] for summary in ordered),
+        'results': ordered,
+    }
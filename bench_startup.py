@@ -0,0 +1,125 @@
+import os
+import sys
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+
+# Startup budgets in milliseconds; this script exits non-zero when one is exceeded
+IMPORT_BUDGETS_MS = {
+    'cleaner': 15,
+    'rename': 25,
+}
+DRY_RUN_BUDGET_MS = 120
+# GUI import times are only reported: the toolkits are optional and vary a lot between machines
+GUI_MODULES = ('gui_tkinter', 'gui_pyside6')
+# Peak RSS budgets: the no-op dry run, and what each planned rename adds on top of it
+DRY_RUN_RSS_BUDGET_MB = 40
+PLAN_BYTES_PER_ENTRY_BUDGET = 1024
+# Files in the synthetic tree planned for the per-entry memory figure
+PLAN_DIRS = 100
+PLAN_FILES_PER_DIR = 200
+RUNS = 5
+
+
+def import_time_ms(module):
+    """Cumulative import time of module as reported by python -X importtime"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=HERE, capture_output=True, text=True, check=True,
+    )
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = [part.strip() for part in line[len('import time:'):].split('|')]
+        if parts[2] == module:
+            return int(parts[1]) / 1000
+    raise RuntimeError(f'{module} not found in importtime output')
+
+
+def run_measured(args):
+    """Wall-clock ms and peak RSS in bytes of a child process (RSS is None without os.wait4)"""
+    start = time.perf_counter()
+    process = subprocess.Popen(args, cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if not hasattr(os, 'wait4'):
+        process.wait()
+        elapsed, rss = (time.perf_counter() - start) * 1000, None
+    else:
+        # wait4 reaps the child itself, so its rusage is this child's alone
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = (time.perf_counter() - start) * 1000
+        process.returncode = os.waitstatus_to_exitcode(status)
+        # Linux reports kilobytes, macOS bytes
+        rss = usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, args)
+    return elapsed, rss
+
+
+def dry_run(folder=None):
+    """Time and peak RSS of a dry run of rename.py, on an empty folder by default"""
+    if folder is not None:
+        return run_measured([sys.executable, str(HERE / 'rename.py'), folder])
+    with tempfile.TemporaryDirectory() as folder:
+        return run_measured([sys.executable, str(HERE / 'rename.py'), folder])
+
+
+def make_plan_tree(folder):
+    """PLAN_DIRS directories of PLAN_FILES_PER_DIR files, every name needing a rename"""
+    for d in range(PLAN_DIRS):
+        directory = Path(folder) / f'Dir {d}'
+        directory.mkdir()
+        for f in range(PLAN_FILES_PER_DIR):
+            (directory / f'File {f}.TXT').touch()
+    return PLAN_DIRS * (PLAN_FILES_PER_DIR + 1)
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main():
+    failed = False
+    print(f"⏱️ Startup benchmark (median of {RUNS} runs)")
+    for module, budget in IMPORT_BUDGETS_MS.items():
+        elapsed = median([import_time_ms(module) for _ in range(RUNS)])
+        ok = elapsed <= budget
+        failed |= not ok
+        print(f"  {'✅' if ok else '❌'} import {module}: {elapsed:.1f} ms (budget {budget} ms)")
+    runs = [dry_run() for _ in range(RUNS)]
+    elapsed = median([ms for ms, _ in runs])
+    ok = elapsed <= DRY_RUN_BUDGET_MS
+    failed |= not ok
+    print(f"  {'✅' if ok else '❌'} rename.py dry run: {elapsed:.1f} ms (budget {DRY_RUN_BUDGET_MS} ms)")
+    for module in GUI_MODULES:
+        try:
+            elapsed = median([import_time_ms(module) for _ in range(RUNS)])
+        except subprocess.CalledProcessError:
+            print(f"  ⚠️ import {module}: skipped, its GUI toolkit is not installed")
+            continue
+        print(f"  📊 import {module}: {elapsed:.1f} ms")
+    if runs[0][1] is None:
+        print("  ⚠️ Peak RSS not measured: os.wait4 is not available on this platform")
+        return 1 if failed else 0
+
+    base_rss = median([rss for _, rss in runs])
+    ok = base_rss <= DRY_RUN_RSS_BUDGET_MB * 1024 * 1024
+    failed |= not ok
+    print(f"  {'✅' if ok else '❌'} rename.py dry run peak RSS: {base_rss / 1024 / 1024:.1f} MB "
+          f"(budget {DRY_RUN_RSS_BUDGET_MB} MB)")
+    with tempfile.TemporaryDirectory() as folder:
+        entries = make_plan_tree(folder)
+        rss = median([dry_run(folder)[1] for _ in range(RUNS)])
+    per_entry = max(rss - base_rss, 0) / entries
+    ok = per_entry <= PLAN_BYTES_PER_ENTRY_BUDGET
+    failed |= not ok
+    print(f"  {'✅' if ok else '❌'} planning {entries:,} renames: {rss / 1024 / 1024:.1f} MB peak RSS, "
+          f"{per_entry:.0f} bytes per rename (budget {PLAN_BYTES_PER_ENTRY_BUDGET})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,41 +1,116 @@
 import re
-import json
 
-# Global variable to store rules
+# Global variable to store rules, loaded from rules.json on first use
 RULES = {}
+_rules_loaded = False
+
+DEFAULT_RULES = {
+    "c#": "csharp",
+    "c++": "cpp",
+    " ": "-",
+    "+": "",
+    "#": "",
+    "&": "and"
+}
+
+# Characters removed by the invalid-character filter in clean_name
+INVALID_CHARS_RE = re.compile(r"[^\w\-.]")
+
+# Rule keys starting with this are regular expressions, e.g. "re:-v\\d+$": ""
+REGEX_PREFIX = "re:"
+# Compiled rule steps kept per distinct rules dict
+_COMPILED_LIMIT = 64
+_compiled = {}
+# (RULES, its steps) for clean_name; load_rules replaces RULES rather than editing it
+_global_steps = None
+
+class RegexRule:
+    """One regex rule, compiled once and applied as its own pass over the name"""
+
+    # Each rule sees the output of the rules before it, like literal rules do.
+    # Combining rules into one alternation would let the leftmost match win instead
+    def __init__(self, keyword, replacement):
+        self.keyword = keyword
+        self.replacement = replacement
+        try:
+            self.pattern = re.compile(keyword[len(REGEX_PREFIX):])
+        except re.error as e:
+            raise ValueError(f"Invalid regex rule {keyword!r}: {e}") from None
+
+    def sub(self, name):
+        return self.pattern.sub(self.replacement, name)
+
+    def subn(self, name):
+        """(new name, number of matches replaced)"""
+        return self.pattern.subn(self.replacement, name)
+
+def compile_rules_steps(rules):
+    """Turn a rules dict into steps, one per rule: (keyword, replacement) literals and (None, RegexRule)"""
+    key = tuple(rules.items())
+    steps = _compiled.get(key)
+    if steps is not None:
+        return steps
+    steps = [(None, RegexRule(keyword, replacement)) if keyword.startswith(REGEX_PREFIX)
+             else (keyword, replacement)
+             for keyword, replacement in key]
+    if len(_compiled) >= _COMPILED_LIMIT:
+        _compiled.clear()
+    _compiled[key] = steps
+    return steps
+
+def is_regex_rule(keyword):
+    return keyword.startswith(REGEX_PREFIX)
+
+def read_rules(path="rules.json"):
+    """Read a rules file without touching the global RULES"""
+    import json
+    with open(path, encoding="utf-8") as f:
+        rules = json.load(f)
+    # Bad regex rules fail here, like invalid JSON does
+    compile_rules_steps(rules)
+    return rules
 
 def load_rules():
     """Load naming conversion rules from rules.json"""
-    global RULES
+    global RULES, _rules_loaded
     try:
-        with open("rules.json", encoding="utf-8") as f:
-            RULES = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
+        RULES = read_rules("rules.json")
+    except (FileNotFoundError, ValueError):
         # Default rules if file doesn't exist or is invalid
-        RULES = {
-            "c#": "csharp",
-            "c++": "cpp",
-            " ": "-",
-            "+": "",
-            "#": "",
-            "&": "and"
-        }
+        RULES = dict(DEFAULT_RULES)
+    _rules_loaded = True
+
+def get_rules():
+    """Return the global rules, loading them on first use"""
+    if not _rules_loaded:
+        load_rules()
+    return RULES
 
 def reload_rules():
     """Reload rules from rules.json file"""
     load_rules()
 
-# Load rules on module import
-load_rules()
+def clean_name(name: str, style='kebab', rules=None) -> str:
+    global _global_steps
+    if rules is None:
+        # Hashing hundreds of rules per call costs more than cleaning, so the
+        # global rules' steps are reused while RULES is the same dict
+        if _global_steps is None or _global_steps[0] is not RULES:
+            _global_steps = (get_rules(), compile_rules_steps(get_rules()))
+        return _clean(name, style, _global_steps[1])
+    return _clean(name, style, compile_rules_steps(rules))
 
-def clean_name(name: str, style='kebab') -> str:
+def _clean(name, style, steps):
     name = name.lower()
 
-    for keyword, replacement in RULES.items():
-        name = name.replace(keyword, replacement)
+    for keyword, replacement in steps:
+        if keyword is None:
+            name = replacement.sub(name)
+        else:
+            name = name.replace(keyword, replacement)
 
     # Remove invalid characters (keep letters, numbers, -, _, .)
-    name = re.sub(r"[^\w\-.]", "", name)
+    name = INVALID_CHARS_RE.sub("", name)
     
     # Convert to specified style
     if style == 'kebab':
@@ -64,3 +139,49 @@ def clean_name(name: str, style='kebab') -> str:
             name = ''.join(word.capitalize() for word in parts)
     
     return name
+
+# Cleaned names remembered per rule set before its cache is reset
+RULESET_CACHE_LIMIT = 100_000
+# Distinct rule sets kept before old ones (e.g. from reloaded rules) are dropped
+RULESETS_LIMIT = 64
+
+class RuleSet:
+    """Rules and a style bundled together, cleaning each distinct name only once"""
+
+    def __init__(self, rules, style='kebab'):
+        self.rules = dict(rules)
+        self.style = style
+        self.steps = compile_rules_steps(self.rules)
+        self.cache = {}
+        self.lookups = 0
+        self.misses = 0
+
+    def clean(self, name):
+        self.lookups += 1
+        cleaned = self.cache.get(name)
+        if cleaned is None:
+            self.misses += 1
+            if len(self.cache) >= RULESET_CACHE_LIMIT:
+                self.cache.clear()
+            cleaned = self.cache[name] = _clean(name, self.style, self.steps)
+        return cleaned
+
+# Shared rule sets, keyed by their rules and style
+_rulesets = {}
+
+def compile_rules(rules=None, style='kebab'):
+    """Return the shared RuleSet for a rules dict (default: the global rules) and style"""
+    if rules is None:
+        rules = get_rules()
+    key = (tuple(rules.items()), style)
+    ruleset = _rulesets.get(key)
+    if ruleset is None:
+        if len(_rulesets) >= RULESETS_LIMIT:
+            _rulesets.clear()
+        ruleset = _rulesets[key] = RuleSet(rules, style)
+    return ruleset
+
+def cache_stats():
+    """Return (lookups, misses) summed over the shared rule sets"""
+    rulesets = list(_rulesets.values())
+    return sum(r.lookups for r in rulesets), sum(r.misses for r in rulesets)
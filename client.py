@@ -0,0 +1,164 @@
+import sys
+import os
+import json
+import socket
+
+# Kept free of heavy imports: this module is on the hot path of every hook call
+DEFAULT_PORT = 8765
+STYLES = ('kebab', 'snake', 'lower-camel', 'upper-camel')
+
+
+def default_socket_path():
+    if hasattr(os, 'getuid'):
+        return os.environ.get('REPO_NAMER_SOCKET', f'/tmp/repo-namer-{os.getuid()}.sock')
+    return None
+
+
+def default_token_path():
+    """Per-user file holding the secret every request must carry, created by the server"""
+    return os.environ.get('REPO_NAMER_TOKEN_FILE', os.path.join(os.path.expanduser('~'), '.repo-namer-token'))
+
+
+def read_token(path=None):
+    with open(path or default_token_path(), encoding='utf-8') as f:
+        return f.read().strip()
+
+
+def connect(socket_path=None, port=None, timeout=None):
+    """Connect to a running server over a Unix socket, or localhost TCP when port is given"""
+    if port is None and socket_path is None:
+        socket_path = default_socket_path()
+    if port is None and socket_path is not None and hasattr(socket, 'AF_UNIX'):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        address = socket_path
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        address = ('127.0.0.1', port or DEFAULT_PORT)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def request(message, socket_path=None, port=None, timeout=None, token=None):
+    """Send one JSON request and return the JSON response"""
+    # Without a token file there is no server to talk to, which callers treat like a refused connection
+    message = dict(message, token=token if token is not None else read_token())
+    with connect(socket_path, port, timeout) as sock:
+        sock.sendall(json.dumps(message).encode('utf-8') + b'\n')
+        with sock.makefile('rb') as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError('server closed the connection without a response')
+    return json.loads(line)
+
+
+def parse_args(argv):
+    """Parse the subset of rename.py options the server understands"""
+    options = {'folder': None, 'apply': False, 'ignore': None, 'report': None, 'git': False,
+               'style': 'kebab', 'socket': None, 'port': None}
+    args = iter(argv)
+    for arg in args:
+        if arg in ('--apply', '--git'):
+            options[arg[2:]] = True
+        elif arg in ('--ignore', '--report', '--style', '--socket', '--port'):
+            value = next(args, None)
+            if value is None:
+                raise ValueError(f'{arg} needs a value')
+            options[arg[2:]] = value
+        elif arg.startswith('--') and '=' in arg:
+            key, value = arg[2:].split('=', 1)
+            if key not in ('ignore', 'report', 'style', 'socket', 'port'):
+                raise ValueError(f'unknown option {arg}')
+            options[key] = value
+        elif arg.startswith('-'):
+            raise ValueError(f'unknown option {arg}')
+        elif options['folder'] is None:
+            options['folder'] = arg
+        else:
+            raise ValueError('only one folder is supported')
+    if options['folder'] is None:
+        raise ValueError('a folder is required')
+    if options['style'] not in STYLES:
+        raise ValueError(f"invalid --style {options['style']!r} (choose from {', '.join(STYLES)})")
+    if options['port'] is not None:
+        options['port'] = int(options['port'])
+    return options
+
+
+def run_locally():
+    """Fall back to the regular CLI when no server is running"""
+    argv = [sys.argv[0]]
+    skip = False
+    for arg in sys.argv[1:]:
+        if skip:
+            skip = False
+        elif arg in ('--socket', '--port'):
+            skip = True
+        elif not arg.startswith(('--socket=', '--port=')):
+            argv.append(arg)
+    sys.argv = argv
+    import rename
+    rename.main()
+
+
+def main():
+    try:
+        options = parse_args(sys.argv[1:])
+    except ValueError:
+        # Options only rename.py knows, and mistakes, are left to rename.py to run or report
+        run_locally()
+        return
+
+    folder = os.path.abspath(options['folder'])
+    if not os.path.exists(folder):
+        print(f"❌ Folder does not exist: {options['folder']}")
+        sys.exit(1)
+    rules = os.path.abspath('rules.json')
+    message = {
+        'cmd': 'apply' if options['apply'] else 'plan',
+        'folder': folder,
+        'style': options['style'],
+        'ignore': options['ignore'].split(',') if options['ignore'] else None,
+        'git': options['git'],
+        'rules': rules if os.path.exists(rules) else None,
+    }
+    try:
+        response = request(message, options['socket'], options['port'])
+    except OSError:
+        run_locally()
+        return
+    # Show paths the way they were given, like rename.py does
+    shown = os.path.normpath(options['folder'])
+    changes = [[shown + old[len(folder):], shown + new[len(folder):]] for old, new in response.get('changes', ())]
+    if not response.get('ok'):
+        if changes:
+            # An apply that failed partway still renamed these
+            lines = [f"  {old} → {new}" for old, new in changes]
+            print(f"⚠️ Renamed {len(changes)} items before the error:\n" + "\n".join(lines))
+        print(f"❌ {response.get('error')}")
+        sys.exit(1)
+
+    if options['ignore']:
+        print(f"📁 Ignored directories: {', '.join(set(options['ignore'].split(',')))}")
+    if not changes:
+        print("✅ No files or folders need to be renamed.")
+        return
+    lines = [f"  {old} → {new}" for old, new in changes]
+    print("📝 The following items will be renamed (old → new):\n" + "\n".join(lines))
+    if options['report']:
+        with open(options['report'], "w", encoding="utf-8") as f:
+            for old, new in changes:
+                f.write(f"{old} → {new}\n")
+        print(f"\n📝 Report written to {options['report']}")
+    if options['apply']:
+        print("\n✅ All changes have been applied!")
+    else:
+        print("\n⚠️ No changes applied (use --apply to execute renaming)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import json
+from cleaner import compile_rules
+from rename import DEFAULT_IGNORE_DIRS
+
+# Per-directory config file, applied to the directory's contents and everything below
+CONFIG_NAME = '.reponamer.json'
+STYLES = ('kebab', 'snake', 'lower-camel', 'upper-camel')
+
+# Effective configs shared by every directory that ends up with the same settings
+_configs = {}
+
+
+class DirConfig:
+    """Effective settings for one subtree: rule set, style, ignored directories and skip"""
+
+    def __init__(self, rules, style, ignore_dirs, skip=False):
+        self.ruleset = compile_rules(rules, style)
+        self.ignore_dirs = frozenset(ignore_dirs)
+        self.skip = skip
+
+    @property
+    def rules(self):
+        return self.ruleset.rules
+
+    @property
+    def style(self):
+        return self.ruleset.style
+
+    @classmethod
+    def shared(cls, rules, style, ignore_dirs, skip=False):
+        key = (tuple(rules.items()), style, frozenset(ignore_dirs), skip)
+        config = _configs.get(key)
+        if config is None:
+            config = _configs[key] = cls(rules, style, ignore_dirs, skip)
+        return config
+
+    @classmethod
+    def root(cls, rules=None, style='kebab', ignore_dirs=None):
+        """The config a walk starts from, before any config file is read"""
+        if rules is None:
+            rules = compile_rules(None, style).rules
+        return cls.shared(rules, style, DEFAULT_IGNORE_DIRS if ignore_dirs is None else ignore_dirs)
+
+    def child(self, path):
+        """Merge the config file at path over this config"""
+        return self.merge(load_config(path), path)
+
+    def merge(self, data, path):
+        """Merge an already loaded config file over this config"""
+        rules = dict(self.rules)
+        # A null replacement removes an inherited rule
+        for keyword, replacement in (data.get('rules') or {}).items():
+            if replacement is None:
+                rules.pop(keyword, None)
+            else:
+                rules[keyword] = replacement
+        style = data.get('style', self.style)
+        if style not in STYLES:
+            raise ValueError(f"Invalid config file {path}: unknown style {style!r}")
+        ignore_dirs = self.ignore_dirs.union(data.get('ignore') or ())
+        return DirConfig.shared(rules, style, ignore_dirs, bool(data.get('skip', False)))
+
+
+class ConfigSet:
+    """Several root configs walked together, each config file read once and merged into all of them"""
+
+    def __init__(self, configs):
+        self.configs = tuple(configs)
+        # Config files add the same ignores and skips to every member, so the walk can follow the first
+        self.ignore_dirs = self.configs[0].ignore_dirs
+        self.skip = self.configs[0].skip
+
+    def child(self, path):
+        data = load_config(path)
+        return ConfigSet(config.merge(data, path) for config in self.configs)
+
+
+def load_config(path):
+    """Read and check a config file"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Invalid config file {path}: {e}") from None
+    if not isinstance(data, dict):
+        raise ValueError(f"Invalid config file {path}: expected a JSON object")
+    return data
@@ -0,0 +1,185 @@
+import os
+import math
+import random
+import shutil
+import tempfile
+import time
+from collections import Counter
+from cleaner import compile_rules
+from rename import DEFAULT_IGNORE_DIRS
+
+# Distinct directories listed by default before the estimate stops
+DEFAULT_BUDGET = 2000
+# Probes per listing allowed, so a small tree that is fully listed still stops
+MAX_PROBES_PER_DIR = 20
+# Timed renames used to project the apply time
+LATENCY_PROBES = 20
+# Two-sided 95% normal quantile
+Z_95 = 1.96
+METRICS = ('directories', 'entries', 'renames', 'collisions')
+
+
+class Listing:
+    """What one directory contributes: its subdirectories and its counts"""
+
+    __slots__ = ('subdirs', 'entries', 'renames', 'collisions')
+
+    def __init__(self, subdirs, entries, renames, collisions):
+        self.subdirs = subdirs
+        self.entries = entries
+        self.renames = renames
+        self.collisions = collisions
+
+
+def list_directory(path, ignore_dirs, clean):
+    """List path and count its entries, renames and renames that collide with another name"""
+    names = []
+    subdirs = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir()
+                is_link = is_dir and entry.is_symlink()
+            except OSError:
+                is_dir, is_link = False, False
+            if is_dir and entry.name in ignore_dirs:
+                continue
+            names.append(entry.name)
+            # Symlinked directories are entries but aren't descended, like the default walk
+            if is_dir and not is_link:
+                subdirs.append(entry.path)
+    targets = [clean(name) for name in names]
+    renames = sum(1 for name, target in zip(names, targets) if name != target)
+    # Two entries cleaned to the same name can't both keep it
+    collisions = sum(count - 1 for count in Counter(targets).values() if count > 1)
+    return Listing(subdirs, len(names), renames, collisions)
+
+
+class Estimator:
+    """Knuth's random-probe estimator of tree size and rename volume"""
+
+    # Each probe walks from the root to a leaf, picking a random subdirectory at each
+    # level. A directory reached through branching factors b1..bk stands for b1*...*bk
+    # directories like it, so the weighted sums along one probe are unbiased estimates
+    # of the totals; the spread across probes gives the confidence interval.
+    def __init__(self, folder_path, ignore_dirs=None, style='kebab', budget=DEFAULT_BUDGET, seed=None):
+        self.root = os.fspath(folder_path)
+        self.ignore_dirs = DEFAULT_IGNORE_DIRS if ignore_dirs is None else ignore_dirs
+        self.clean = compile_rules(None, style).clean
+        self.budget = budget
+        self.random = random.Random(seed)
+        self.listings = {}
+        self.list_seconds = 0.0
+        self.samples = {metric: [] for metric in METRICS}
+
+    def listing(self, path):
+        listing = self.listings.get(path)
+        if listing is None:
+            start = time.perf_counter()
+            try:
+                listing = list_directory(path, self.ignore_dirs, self.clean)
+            except OSError:
+                listing = Listing([], 0, 0, 0)
+            self.list_seconds += time.perf_counter() - start
+            self.listings[path] = listing
+        return listing
+
+    def probe(self):
+        totals = dict.fromkeys(METRICS, 0.0)
+        weight = 1.0
+        path = self.root
+        while True:
+            listing = self.listing(path)
+            totals['directories'] += weight
+            totals['entries'] += weight * listing.entries
+            totals['renames'] += weight * listing.renames
+            totals['collisions'] += weight * listing.collisions
+            if not listing.subdirs:
+                break
+            weight *= len(listing.subdirs)
+            path = self.random.choice(listing.subdirs)
+        for metric in METRICS:
+            self.samples[metric].append(totals[metric])
+
+    def complete(self):
+        """True when every directory below the root has been listed"""
+        return all(subdir in self.listings for listing in self.listings.values() for subdir in listing.subdirs)
+
+    def run(self):
+        max_probes = self.budget * MAX_PROBES_PER_DIR
+        while len(self.listings) < self.budget and len(self.samples['entries']) < max_probes:
+            self.probe()
+            if len(self.samples['entries']) % 100 == 0 and self.complete():
+                break
+        return self.result()
+
+    def result(self):
+        exact = self.complete()
+        seen = {
+            'directories': len(self.listings),
+            'entries': sum(listing.entries for listing in self.listings.values()),
+            'renames': sum(listing.renames for listing in self.listings.values()),
+            'collisions': sum(listing.collisions for listing in self.listings.values()),
+        }
+        estimates = {}
+        for metric in METRICS:
+            if exact:
+                # The whole tree was listed, the counts are no longer estimates
+                estimates[metric] = (seen[metric], seen[metric], seen[metric])
+                continue
+            values = self.samples[metric]
+            mean = sum(values) / len(values)
+            spread = 0.0
+            if len(values) > 1:
+                variance = sum((value - mean) ** 2 for value in values) / (len(values) - 1)
+                spread = Z_95 * math.sqrt(variance / len(values))
+            # What was actually listed is a hard lower bound
+            low = max(mean - spread, seen[metric])
+            estimates[metric] = (max(mean, low), low, max(mean + spread, low))
+        return {
+            'estimates': estimates,
+            'exact': exact,
+            'probes': len(self.samples['entries']),
+            'listed': len(self.listings),
+            'seconds_per_listing': self.list_seconds / max(len(self.listings), 1),
+        }
+
+
+def measure_rename_latency(scratch_parent, probes=LATENCY_PROBES):
+    """Median seconds per os.rename in a scratch directory created (and removed) inside scratch_parent, or None"""
+    try:
+        scratch = tempfile.mkdtemp(dir=scratch_parent, prefix='.repo-namer-probe-')
+    except OSError:
+        return None
+    timings = []
+    try:
+        current = os.path.join(scratch, 'probe-a')
+        open(current, 'w').close()
+        for i in range(probes):
+            target = os.path.join(scratch, f'probe-{"b" if i % 2 == 0 else "a"}')
+            start = time.perf_counter()
+            os.rename(current, target)
+            timings.append(time.perf_counter() - start)
+            current = target
+    except OSError:
+        return None
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def estimate_tree(folder_path, ignore_dirs=None, style='kebab', budget=DEFAULT_BUDGET, seed=None, latency_dir=None):
+    """Estimate directories, entries, renames and collisions, plus projected scan and apply times"""
+    # Only reads the tree. The apply time needs test renames, which are done in a scratch
+    # directory under latency_dir when one is given; without it apply_seconds is None
+    result = Estimator(folder_path, ignore_dirs, style, budget, seed).run()
+    directories = result['estimates']['directories']
+    renames = result['estimates']['renames']
+    result['scan_seconds'] = tuple(count * result['seconds_per_listing'] for count in directories)
+    result['rename_latency'] = measure_rename_latency(latency_dir) if latency_dir is not None else None
+    if result['rename_latency'] is not None:
+        result['apply_seconds'] = tuple(count * result['rename_latency'] for count in renames)
+    else:
+        result['apply_seconds'] = None
+    return result
@@ -0,0 +1,136 @@
+import os
+import sys
+import heapq
+import shutil
+import tempfile
+from pathlib import Path
+
+# Default in-memory buffer before a sorted run is spilled to disk
+DEFAULT_BUFFER_MB = 64
+# Runs merged at once; every MAX_MERGE_FAN_IN runs of one size are merged into a bigger run
+MAX_MERGE_FAN_IN = 64
+# Bytes read per block from a spilled run
+READ_SIZE = 64 * 1024
+# Rough per-entry cost on top of the two strings (tuple, key, list slot)
+_ENTRY_OVERHEAD = 120
+
+
+def depth_key(change):
+    """Deepest entries first, then by path, the order renames can be applied in"""
+    # The whole pair is part of the key so duplicates always end up next to each other
+    old, new = change
+    return -old.count(os.sep), old, new
+
+
+def _write_run(directory, changes):
+    fd, path = tempfile.mkstemp(dir=directory, suffix='.run')
+    with os.fdopen(fd, 'wb') as f:
+        for old, new in changes:
+            f.write(os.fsencode(old) + b'\0' + os.fsencode(new) + b'\0')
+    return path
+
+
+def _read_run(path):
+    with open(path, 'rb') as f:
+        pending = b''
+        while True:
+            block = f.read(READ_SIZE)
+            if not block:
+                break
+            fields = (pending + block).split(b'\0')
+            pending = fields.pop()
+            # A record is two fields; keep an unpaired old path for the next block
+            if len(fields) % 2:
+                pending = fields.pop() + b'\0' + pending
+            for i in range(0, len(fields), 2):
+                yield os.fsdecode(fields[i]), os.fsdecode(fields[i + 1])
+
+
+class ExternalSorter:
+    """Sort and deduplicate (old, new) pairs in bounded memory, spilling sorted runs to disk"""
+
+    def __init__(self, buffer_mb=DEFAULT_BUFFER_MB, key=depth_key, tmpdir=None):
+        self.limit = int(buffer_mb * 1024 * 1024)
+        self.key = key
+        self.tmpdir = tmpdir
+        self.directory = None
+        self.buffer = []
+        self.buffered = 0
+        self.runs = []
+        self.count = 0
+
+    def add(self, old, new):
+        old, new = str(old), str(new)
+        self.buffer.append((old, new))
+        self.buffered += sys.getsizeof(old) + sys.getsizeof(new) + _ENTRY_OVERHEAD
+        self.count += 1
+        if self.buffered >= self.limit:
+            self._spill()
+
+    def extend(self, changes):
+        for old, new in changes:
+            self.add(old, new)
+        return self
+
+    def _spill(self):
+        if self.directory is None:
+            self.directory = tempfile.mkdtemp(prefix='repo-namer-sort-', dir=self.tmpdir)
+        self.buffer.sort(key=self.key)
+        self.runs.append((0, _write_run(self.directory, self.buffer)))
+        self.buffer = []
+        self.buffered = 0
+        self._compact()
+
+    def _compact(self):
+        # Tiered merging: MAX_MERGE_FAN_IN runs of one level are merged into one run of the
+        # next level, so each pair is rewritten once per level rather than at every compaction.
+        # Levels only grow towards the front of the list, like the digits of a counter.
+        while len(self.runs) >= MAX_MERGE_FAN_IN:
+            level = self.runs[-1][0]
+            if self.runs[-MAX_MERGE_FAN_IN][0] != level:
+                break
+            self._merge_last(MAX_MERGE_FAN_IN, level + 1)
+
+    def _merge_last(self, count, level):
+        paths = [path for _, path in self.runs[-count:]]
+        merged = heapq.merge(*(_read_run(path) for path in paths), key=self.key)
+        self.runs[-count:] = [(level, _write_run(self.directory, merged))]
+        for path in paths:
+            os.remove(path)
+
+    def __iter__(self):
+        """Yield unique (old_path, new_path) pairs in key order; can be iterated more than once"""
+        if self.runs and self.buffer:
+            self._spill()
+        # Several levels can leave more runs than the fan-in; merge the smallest ones first
+        while len(self.runs) > MAX_MERGE_FAN_IN:
+            count = min(len(self.runs) - MAX_MERGE_FAN_IN + 1, MAX_MERGE_FAN_IN)
+            self._merge_last(count, self.runs[-count][0])
+        if self.runs:
+            streams = [_read_run(path) for _, path in self.runs]
+            merged = heapq.merge(*streams, key=self.key) if len(streams) > 1 else streams[0]
+        else:
+            self.buffer.sort(key=self.key)
+            merged = iter(self.buffer)
+        previous = None
+        for change in merged:
+            if change != previous:
+                yield Path(change[0]), Path(change[1])
+            previous = change
+
+    @property
+    def spilled(self):
+        return len(self.runs)
+
+    def close(self):
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+        self.runs = []
+        self.buffer = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
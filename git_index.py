@@ -0,0 +1,122 @@
+import os
+import subprocess
+from pathlib import Path
+from rename import DEFAULT_IGNORE_DIRS
+
+# Bytes read from git per pipe read
+READ_SIZE = 256 * 1024
+
+
+def iter_index_paths(folder_path):
+    """Stream the tracked paths under folder_path from `git ls-files -z`, in index order"""
+    process = subprocess.Popen(
+        ['git', '-C', str(folder_path), 'ls-files', '-z'],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    finished = False
+    try:
+        pending = b''
+        while True:
+            block = process.stdout.read1(READ_SIZE)
+            if not block:
+                break
+            paths = (pending + block).split(b'\0')
+            pending = paths.pop()
+            for path in paths:
+                yield os.fsdecode(path)
+        if pending:
+            yield os.fsdecode(pending)
+        finished = True
+    finally:
+        if not finished:
+            # The consumer stopped early, don't wait for the rest of the listing
+            process.kill()
+        process.stdout.close()
+        error = process.stderr.read().decode('utf-8', 'replace').strip()
+        process.stderr.close()
+        returncode = process.wait()
+    if returncode != 0:
+        raise RuntimeError(f"git ls-files failed: {error or f'exit status {returncode}'}")
+
+
+def iter_index_renames(folder_path: Path, ignore_dirs=None, style='kebab', progress=None, cancelled=None,
+                       stats=None, dir_configs=True):
+    """Yield (old_path, new_path) pairs for tracked entries, deepest first, without walking the tree"""
+    # The index is sorted by path, so every directory is one contiguous run of
+    # entries: it can be renamed as soon as the listing leaves it
+    from dirconfig import CONFIG_NAME, DirConfig
+    if ignore_dirs is None:
+        ignore_dirs = DEFAULT_IGNORE_DIRS
+    folder_path = Path(folder_path)
+    if any(ignored in folder_path.parts for ignored in ignore_dirs):
+        return
+    root = DirConfig.root(None, style, ignore_dirs)
+    if dir_configs and (folder_path / CONFIG_NAME).is_file():
+        root = root.child(folder_path / CONFIG_NAME)
+        if root.skip:
+            return
+    # Per open directory: the config for its contents (None when they are left alone, for
+    # ignored and skipped directories and everything below them) and the cleaner for its
+    # own name (None when it is ignored, or inside an ignored or skipped directory)
+    open_dirs = []
+    levels = []
+    current = None
+    parent = folder_path
+    config = root
+    closed = 0
+
+    def close_to(depth):
+        nonlocal closed
+        while len(open_dirs) > depth:
+            name = open_dirs.pop()
+            _, clean = levels.pop()
+            outer = folder_path.joinpath(*open_dirs)
+            closed += 1
+            if progress is not None:
+                progress(closed)
+            if clean is None:
+                continue
+            if stats is not None:
+                stats['directories'] += 1
+                stats['entries'] += 1
+            new_name = clean(name)
+            if new_name != name:
+                if stats is not None:
+                    stats['planned_directory'] += 1
+                yield outer / name, outer / new_name
+
+    for path in iter_index_paths(folder_path):
+        directory, _, name = path.rpartition('/')
+        if directory != current:
+            if cancelled is not None and cancelled():
+                return
+            current = directory
+            parts = directory.split('/') if directory else []
+            common = 0
+            while common < len(open_dirs) and common < len(parts) and open_dirs[common] == parts[common]:
+                common += 1
+            yield from close_to(common)
+            for part in parts[common:]:
+                outer = levels[-1][0] if levels else root
+                if outer is None or part in outer.ignore_dirs:
+                    levels.append((None, None))
+                else:
+                    # Config files are read from the working tree, tracked or not, like a walk does
+                    inner = outer
+                    config_path = folder_path.joinpath(*open_dirs, part, CONFIG_NAME)
+                    if dir_configs and config_path.is_file():
+                        inner = outer.child(config_path)
+                    levels.append((None if inner.skip else inner, outer.ruleset.clean))
+                open_dirs.append(part)
+            parent = folder_path.joinpath(*open_dirs)
+            config = levels[-1][0] if levels else root
+        if config is None:
+            continue
+        if stats is not None:
+            stats['entries'] += 1
+        new_name = config.ruleset.clean(name)
+        if new_name != name:
+            if stats is not None:
+                stats['planned_file'] += 1
+            yield parent / name, parent / new_name
+    yield from close_to(0)
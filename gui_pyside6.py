@@ -1,23 +1,62 @@
 import sys
 import json
-import csv
-from datetime import datetime
+from array import array
+from bisect import bisect_right
 from pathlib import Path
-from rename import rename_recursive
+from rename import iter_renames, iter_variant_renames, apply_plan, plan_directory
+from hooks import Hooks
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
-    QFileDialog, QListWidget, QListWidgetItem, QComboBox, QTextEdit, QMessageBox, QCheckBox, QStatusBar,
-    QDialog, QFrame, QGroupBox, QSplitter, QScrollArea, QSizePolicy
+    QFileDialog, QListView, QAbstractItemView, QComboBox, QTextEdit, QMessageBox, QCheckBox, QStatusBar,
+    QDialog, QFrame, QGroupBox, QSplitter, QScrollArea, QSizePolicy, QTreeWidget, QTreeWidgetItem
+)
+from PySide6.QtCore import (
+    Qt, QMimeData, QSize, QThread, Signal, QAbstractListModel, QModelIndex, QTimer, QStringListModel
 )
-from PySide6.QtCore import Qt, QMimeData, QSize
 from PySide6.QtGui import QDragEnterEvent, QDropEvent, QFont, QPalette, QColor
 
+# Rows shown in the live rules preview
+PREVIEW_LIMIT = 500
+# Styles offered in the style box
+STYLES = ['kebab', 'snake', 'lower-camel', 'upper-camel']
+# Rows of finished previews kept for switching back to a style without a rescan
+PLAN_CACHE_ROWS = 200_000
+
+class IndexWorker(QThread):
+    """Collect the names under a folder and build the live-preview index"""
+    ready = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, folder_path, ignore_dirs, rules, style, parent=None):
+        super().__init__(parent)
+        self.folder_path = folder_path
+        self.ignore_dirs = ignore_dirs
+        self.rules = rules
+        self.style = style
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        # Only needed once the rules editor opens, keep them off the startup path
+        from analyze_rules import collect_names
+        from name_index import NameIndex
+        try:
+            names = collect_names(self.folder_path, self.ignore_dirs, cancelled=lambda: self._cancelled)
+            if not self._cancelled:
+                self.ready.emit(NameIndex(names, self.rules, self.style))
+        except Exception as e:
+            self.failed.emit(str(e))
+
 class RulesDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, folder_path=None, ignore_dirs=None, style='kebab', rules=None):
         super().__init__(parent)
         self.setWindowTitle("Edit Naming Rules")
-        self.resize(600, 500)
+        self.resize(1000, 500)
         self.setModal(True)
+        self.index = None
+        self.index_worker = None
         
         layout = QVBoxLayout()
         self.setLayout(layout)
@@ -28,6 +67,8 @@ class RulesDialog(QDialog):
         instructions.setStyleSheet("color: #666; padding: 10px; background: #f5f5f5; border-radius: 5px;")
         layout.addWidget(instructions)
         
+        splitter = QSplitter(Qt.Horizontal)
+        
         # Text editor
         self.text_edit = QTextEdit()
         self.text_edit.setFont(QFont("Consolas", 11))
@@ -40,7 +81,38 @@ class RulesDialog(QDialog):
                 padding: 10px;
             }
         """)
-        layout.addWidget(self.text_edit)
+        splitter.addWidget(self.text_edit)
+        
+        # Live preview
+        preview_widget = QWidget()
+        preview_layout = QVBoxLayout()
+        preview_layout.setContentsMargins(0, 0, 0, 0)
+        preview_widget.setLayout(preview_layout)
+        self.preview_status = QLabel("Select a folder to see a live preview of rule changes.")
+        self.preview_status.setWordWrap(True)
+        preview_layout.addWidget(self.preview_status)
+        self.preview_list = QListView()
+        self.preview_list.setFont(QFont("Consolas", 10))
+        self.preview_list.setUniformItemSizes(True)
+        self.preview_model = QStringListModel(self)
+        self.preview_list.setModel(self.preview_model)
+        preview_layout.addWidget(self.preview_list)
+        splitter.addWidget(preview_widget)
+        splitter.setSizes([500, 500])
+        layout.addWidget(splitter)
+        
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(150)
+        self.preview_timer.timeout.connect(self.update_preview)
+        self.text_edit.textChanged.connect(self.preview_timer.start)
+        
+        if folder_path is not None and rules is not None:
+            self.preview_status.setText("Indexing names...")
+            self.index_worker = IndexWorker(folder_path, ignore_dirs, rules, style, self)
+            self.index_worker.ready.connect(self.on_index_ready)
+            self.index_worker.failed.connect(self.preview_status.setText)
+            self.index_worker.start()
         
         # Buttons
         btn_layout = QHBoxLayout()
@@ -81,6 +153,218 @@ class RulesDialog(QDialog):
         btn_layout.addWidget(self.cancel_btn)
         layout.addLayout(btn_layout)
 
+    def on_index_ready(self, index):
+        self.index = index
+        self.update_preview()
+
+    def update_preview(self):
+        """Re-clean only the names the edited rules can affect"""
+        if self.index is None:
+            return
+        try:
+            rules = json.loads(self.text_edit.toPlainText())
+        except json.JSONDecodeError as e:
+            self.preview_status.setText(f"Invalid JSON: {e}")
+            return
+        if not isinstance(rules, dict) or not all(isinstance(v, str) for v in rules.values()):
+            self.preview_status.setText("Rules must be a JSON object of string replacements.")
+            return
+        try:
+            recleaned = self.index.update_rules(rules)
+        except ValueError as e:
+            self.preview_status.setText(str(e))
+            return
+        rows = self.index.changed_names(PREVIEW_LIMIT)
+        self.preview_model.setStringList([f"{name}: {before} → {after}" for name, before, after in rows])
+        self.preview_status.setText(f"{len(self.index.changed)} names change "
+                                    f"(re-cleaned {recleaned} of {len(self.index)})")
+
+    def done(self, result):
+        if self.index_worker is not None:
+            self.index_worker.cancel()
+            self.index_worker.wait()
+        super().done(result)
+
+class RenameWorker(QThread):
+    """Scan (or apply a plan) off the UI thread, reporting results in batches"""
+    batch_ready = Signal(list)
+    progress = Signal(int, int)
+    failed = Signal(str)
+
+    BATCH_SIZE = 1000
+    BATCH_INTERVAL = 0.1
+
+    def __init__(self, folder_path, ignore_dirs=None, style='kebab', items=None, use_git=False, parent=None):
+        super().__init__(parent)
+        self.folder_path = folder_path
+        self.ignore_dirs = ignore_dirs
+        self.style = style
+        # Where a finished preview is cached, so late results can't land under another preview's key
+        self.cache_key = None
+        # Styles planned in the same walk as style, and their plans once it finishes
+        self.other_styles = ()
+        self.variants = {}
+        self.items = items
+        self.use_git = use_git
+        self.was_cancelled = False
+        self.error = None
+        self._cancelled = False
+        self._scanned = 0
+        self._found = 0
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def _hooks(self):
+        # The engine batches results and progress; each batch becomes one signal
+        hooks = Hooks(self.BATCH_SIZE, self.BATCH_INTERVAL)
+        hooks.add('on_directory_scanned', self._on_scanned)
+        hooks.add('on_planned' if self.items is None else 'after_rename', self._on_changes)
+        return hooks
+
+    def _on_scanned(self, batch):
+        self._scanned += len(batch)
+        self.progress.emit(self._scanned, self._found)
+
+    def _on_changes(self, batch):
+        self._found += len(batch)
+        self.batch_ready.emit(batch)
+        self.progress.emit(self._scanned, self._found)
+
+    def run(self):
+        hooks = self._hooks()
+        try:
+            if self.items is None and self.other_styles:
+                styles = [self.style, *self.other_styles]
+                variants = {style: [] for style in self.other_styles}
+                for variant, old_path, new_path in iter_variant_renames(
+                        self.folder_path, [(None, style) for style in styles], self.ignore_dirs,
+                        cancelled=self.is_cancelled, hooks=hooks):
+                    if variant:
+                        variants[styles[variant]].append((old_path, new_path))
+                self.variants = variants
+            elif self.items is None:
+                for _ in iter_renames(self.folder_path, self.ignore_dirs, self.style,
+                                      cancelled=self.is_cancelled, hooks=hooks):
+                    pass
+            else:
+                apply_plan(self.items, self.use_git, hooks=hooks, cancelled=self.is_cancelled)
+        except Exception as e:
+            self.error = str(e)
+            self.failed.emit(self.error)
+        finally:
+            self.was_cancelled = self._cancelled
+            hooks.flush()
+
+class ChangesModel(QAbstractListModel):
+    """List model over the plan; rows are formatted only when the view asks for them"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.changes = []
+        self._rows = None
+        self._query = ''
+        self._index_text = ''
+        self._index_starts = array('q')
+        self._index_length = 0
+        self._indexed = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.changes) if self._rows is None else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        old, new = self.changes[self.plan_index(index.row())]
+        return f"{old} → {new}"
+
+    def plan_index(self, row):
+        """Map a view row to its position in the plan"""
+        return row if self._rows is None else self._rows[row]
+
+    def set_changes(self, changes):
+        self.beginResetModel()
+        self.changes = changes
+        self._rows = None
+        self._query = ''
+        self._index_text = ''
+        self._index_starts = array('q')
+        self._index_length = 0
+        self._indexed = 0
+        self.endResetModel()
+
+    def append_changes(self, batch):
+        if not batch:
+            return
+        start = len(self.changes)
+        if self._rows is None:
+            self.beginInsertRows(QModelIndex(), start, start + len(batch) - 1)
+            self.changes.extend(batch)
+            self.endInsertRows()
+            return
+        self.changes.extend(batch)
+        # Rows arriving while a filter is active are matched directly
+        matches = [row for row in range(start, len(self.changes)) if self._query in self._key(row)]
+        if matches:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(matches) - 1)
+            self._rows.extend(matches)
+            self.endInsertRows()
+
+    def _key(self, row):
+        old, new = self.changes[row]
+        return f"{old} → {new}".lower()
+
+    def _update_index(self):
+        """Extend the search index with rows added since the last filter"""
+        if self._indexed == len(self.changes):
+            return
+        chunk = []
+        for row in range(self._indexed, len(self.changes)):
+            self._index_starts.append(self._index_length)
+            key = self._key(row)
+            chunk.append(key)
+            self._index_length += len(key) + 1
+        self._index_text += '\n'.join(chunk) + '\n'
+        self._indexed = len(self.changes)
+
+    def set_filter(self, query):
+        query = query.strip().lower()
+        if '\n' in query:
+            query = query.replace('\n', '')
+        if query == self._query:
+            return
+        self.beginResetModel()
+        if not query:
+            self._rows = None
+        else:
+            self._update_index()
+            text, starts = self._index_text, self._index_starts
+            if self._rows is not None and self._query and self._query in query:
+                # Narrowing a previous query only needs to look at its matches
+                rows = array('q', (row for row in self._rows
+                                   if text.find(query, starts[row], self._line_end(row)) != -1))
+            else:
+                rows = array('q')
+                pos = text.find(query)
+                while pos != -1:
+                    row = bisect_right(starts, pos) - 1
+                    rows.append(row)
+                    pos = text.find(query, self._line_end(row))
+            self._rows = rows
+        self._query = query
+        self.endResetModel()
+
+    def _line_end(self, row):
+        if row + 1 < len(self._index_starts):
+            return self._index_starts[row + 1]
+        return self._index_length
+
 class DragDropWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -107,6 +391,13 @@ class DragDropWidget(QWidget):
                 else:
                     QMessageBox.warning(self, "Warning", "Please drop a folder, not a file!")
 
+# Item data roles used by the tree preview
+PATH_ROLE = Qt.UserRole
+LOADED_ROLE = Qt.UserRole + 1
+
+# File renames listed under one tree node before the rest are summarized
+TREE_FILE_LIMIT = 1000
+
 class RepoNamerWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -158,22 +449,22 @@ class RepoNamerWindow(QMainWindow):
             QLineEdit:focus, QComboBox:focus {
                 border-color: #2196F3;
             }
-            QListWidget {
+            QListView {
                 border: 2px solid #ddd;
                 border-radius: 4px;
                 background: white;
                 padding: 5px;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 8px;
                 border-bottom: 1px solid #eee;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background: #e3f2fd;
                 color: #1976D2;
                 border-left: 4px solid #2196F3;
             }
-            QListWidget::item:hover {
+            QListView::item:hover {
                 background: #f5f5f5;
             }
         """)
@@ -215,7 +506,23 @@ class RepoNamerWindow(QMainWindow):
                 'csv_files': 'CSV files (*.csv)',
                 'json_files': 'JSON files (*.json)',
                 'txt_files': 'Text files (*.txt)',
-                'all_files': 'All files (*.*)'
+                'all_files': 'All files (*.*)',
+                'cancel': 'Cancel',
+                'scanning': 'Scanning... {} folders, {} items to rename',
+                'cached_plan': '📝 {} items to rename (from the last preview, press Preview to rescan).',
+                'applying': 'Applying... {} of {} items renamed',
+                'please_preview': 'Naming style changed. Click "Preview Changes" to see the new plan.',
+                'cancelled': 'Cancelled after {} items.',
+                'failed': '❌ Failed after {} items: {}',
+                'partial_plan': 'The preview was cancelled or failed, so it is incomplete. Preview again to apply.',
+                'filter_placeholder': 'Filter changes...',
+                'showing_items': 'Showing {} of {} items',
+                'tree_view': 'Tree view (plan folders on expand)',
+                'tree_name': 'Name',
+                'tree_renames': 'Renames here',
+                'tree_more': '... {} more items',
+                'tree_loaded': 'Planned {} folders. Expand a folder to plan it.',
+                'tree_apply_hint': 'Tree view only previews expanded folders. Turn it off and preview again to apply.'
             },
             'zh': {
                 'title': 'Repo Namer - GUI',
@@ -252,14 +559,45 @@ class RepoNamerWindow(QMainWindow):
                 'csv_files': 'CSV 檔案 (*.csv)',
                 'json_files': 'JSON 檔案 (*.json)',
                 'txt_files': '文字檔案 (*.txt)',
-                'all_files': '所有檔案 (*.*)'
+                'all_files': '所有檔案 (*.*)',
+                'cancel': '取消',
+                'scanning': '掃描中... {} 個資料夾，{} 個項目需要重命名',
+                'cached_plan': '📝 {} 個項目需要重命名（來自上次預覽，按「預覽」重新掃描）。',
+                'applying': '套用中... 已重命名 {} / {} 個項目',
+                'please_preview': '命名風格已變更。請點擊「預覽變更」查看新的結果。',
+                'cancelled': '已在 {} 個項目後取消。',
+                'failed': '❌ 處理 {} 個項目後失敗: {}',
+                'partial_plan': '預覽已取消或失敗，結果不完整。請重新預覽後再套用。',
+                'filter_placeholder': '篩選變更...',
+                'showing_items': '顯示 {} / {} 個項目',
+                'tree_view': '樹狀檢視（展開時才計算）',
+                'tree_name': '名稱',
+                'tree_renames': '此處重命名數',
+                'tree_more': '... 還有 {} 個項目',
+                'tree_loaded': '已計算 {} 個資料夾。展開資料夾以計算其內容。',
+                'tree_apply_hint': '樹狀檢視只預覽已展開的資料夾。請關閉樹狀檢視並重新預覽後再套用。'
             }
         }
         self.folder_path = ''
         self.changes = []
+        # Set when a preview stopped early: its rows are shown but never applied
+        self.partial_plan = False
         self.style_var = 'kebab'
         self.ignore_var = '.git,node_modules,.venv'
         self.report_format = 'txt'
+        self.worker = None
+        self.apply_total = 0
+        self.applied = []
+        self.tree = None
+        self.tree_key = None
+        self.tree_cache = {}
+        self.tree_configs = {}
+        self.tree_ignore = None
+        # ((folder, ignore set, rules), style) -> plan, oldest first, filled by previews
+        self.plan_cache = {}
+        self.plan_cache_rows = 0
+        # The folder of the last finished preview; switching style there plans the new style
+        self.previewed_key = None
         self.init_ui()
 
     def t(self, key):
@@ -353,11 +691,16 @@ class RepoNamerWindow(QMainWindow):
         options_row1.addWidget(self.style_label)
         
         self.style_combo = QComboBox()
-        self.style_combo.addItems(['kebab', 'snake', 'lower-camel', 'upper-camel'])
+        self.style_combo.addItems(STYLES)
         self.style_combo.setCurrentText(self.style_var)
         self.style_combo.setFont(font_entry)
+        self.style_combo.currentTextChanged.connect(self.show_style)
         options_row1.addWidget(self.style_combo)
         
+        self.tree_check = QCheckBox(self.t('tree_view'))
+        self.tree_check.setFont(font_label)
+        options_row1.addWidget(self.tree_check)
+        
         options_row1.addStretch()
         options_layout.addLayout(options_row1)
         
@@ -392,6 +735,12 @@ class RepoNamerWindow(QMainWindow):
         self.apply_btn.clicked.connect(self.apply_changes)
         main_actions.addWidget(self.apply_btn)
         
+        self.cancel_btn = QPushButton(self.t('cancel'))
+        self.cancel_btn.setFont(font_btn)
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_worker)
+        main_actions.addWidget(self.cancel_btn)
+        
         self.edit_rules_btn = QPushButton(self.t('edit_rules'))
         self.edit_rules_btn.setFont(font_btn)
         self.edit_rules_btn.clicked.connect(self.edit_rules)
@@ -421,15 +770,33 @@ class RepoNamerWindow(QMainWindow):
         results_group = QGroupBox(self.t('output'))
         results_group.setFont(font_title)
         results_layout = QVBoxLayout()
+        self.results_layout = results_layout
         results_group.setLayout(results_layout)
         
         # Results header with control buttons
         results_header = QHBoxLayout()
         
-        # List widget
-        self.changes_list = QListWidget()
+        # Filter box
+        self.filter_entry = QLineEdit()
+        self.filter_entry.setFont(font_entry)
+        self.filter_entry.setPlaceholderText(self.t('filter_placeholder'))
+        self.filter_entry.setClearButtonEnabled(True)
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(200)
+        self.filter_timer.timeout.connect(self.apply_filter)
+        self.filter_entry.textChanged.connect(self.filter_timer.start)
+        results_layout.addWidget(self.filter_entry)
+        
+        # List view backed by the plan
+        self.changes_model = ChangesModel(self)
+        self.changes_model.set_changes(self.changes)
+        self.changes_list = QListView()
+        self.changes_list.setModel(self.changes_model)
         self.changes_list.setFont(font_list)
-        self.changes_list.setSelectionMode(QListWidget.MultiSelection)
+        self.changes_list.setSelectionMode(QAbstractItemView.MultiSelection)
+        self.changes_list.setUniformItemSizes(True)
+        self.changes_list.setLayoutMode(QListView.Batched)
         self.changes_list.setMinimumHeight(300)
         results_layout.addWidget(self.changes_list)
         
@@ -478,8 +845,13 @@ class RepoNamerWindow(QMainWindow):
         self.lang_label.setText(self.t('language'))
         self.preview_btn.setText(self.t('preview'))
         self.apply_btn.setText(self.t('apply'))
+        self.cancel_btn.setText(self.t('cancel'))
         self.clear_btn.setText(self.t('clear'))
         self.edit_rules_btn.setText(self.t('edit_rules'))
+        self.filter_entry.setPlaceholderText(self.t('filter_placeholder'))
+        self.tree_check.setText(self.t('tree_view'))
+        if self.tree is not None:
+            self.tree.setHeaderLabels([self.t('tree_name'), self.t('tree_renames')])
         self.select_all_btn.setText(self.t('select_all'))
         self.deselect_all_btn.setText(self.t('deselect_all'))
         self.report_label.setText(self.t('report_format'))
@@ -501,57 +873,296 @@ class RepoNamerWindow(QMainWindow):
         if not folder_path.exists():
             QMessageBox.critical(self, "Error", self.t('error_folder_not_exist').format(folder))
             return
-        try:
-            self.style_var = self.style_combo.currentText()
-            self.ignore_var = self.ignore_entry.text().strip()
-            ignore_dirs = None
-            if self.ignore_var:
-                ignore_dirs = set(self.ignore_var.split(','))
-            self.changes = rename_recursive(folder_path, apply=False, ignore_dirs=ignore_dirs, style=self.style_var)
-            self.changes_list.clear()
-            if not self.changes:
-                self.status_bar.showMessage(self.t('no_changes'))
-            else:
-                for old, new in self.changes:
-                    item = QListWidgetItem(f"{old} → {new}")
-                    self.changes_list.addItem(item)
-                self.status_bar.showMessage(self.t('found_items').format(len(self.changes)) + ' ' + self.t('preview_warning'))
-        except Exception as e:
-            QMessageBox.critical(self, "Error", self.t('error_occurred').format(str(e)))
+        if self.worker is not None and self.worker.items is not None:
+            # Never interrupt an apply in progress with a new preview
+            return
+        self.stop_worker()
+        self.style_var = self.style_combo.currentText()
+        self.ignore_var = self.ignore_entry.text().strip()
+        ignore_dirs = None
+        if self.ignore_var:
+            ignore_dirs = set(self.ignore_var.split(','))
+        self.reset_changes()
+        if self.tree_check.isChecked():
+            self.show_tree_preview(folder_path, ignore_dirs)
+            return
+        self.show_list_preview()
+        # A preview button press always rescans; the result replaces the cached plans
+        key = self.make_plan_key(folder_path, ignore_dirs)
+        for cached in [cached for cached in self.plan_cache if cached[0] == key]:
+            self.plan_cache_rows -= len(self.plan_cache.pop(cached))
+        self.start_preview(folder_path, ignore_dirs, key)
+
+    def start_preview(self, folder_path, ignore_dirs, key, other_styles=()):
+        worker = RenameWorker(folder_path, ignore_dirs, self.style_var, parent=self)
+        worker.cache_key = (key, self.style_var)
+        worker.other_styles = tuple(other_styles)
+        self.start_worker(worker, self.on_preview_batch, self.on_preview_progress, self.on_preview_finished)
+
+    def make_plan_key(self, folder_path, ignore_dirs):
+        from cleaner import get_rules
+        return str(folder_path.resolve()), frozenset(ignore_dirs or ()), tuple(get_rules().items())
+
+    def cache_plan(self, key, plan):
+        """Keep a finished plan, dropping the oldest ones past PLAN_CACHE_ROWS rows"""
+        self.plan_cache_rows -= len(self.plan_cache.pop(key, ()))
+        self.plan_cache[key] = plan
+        self.plan_cache_rows += len(plan)
+        while self.plan_cache_rows > PLAN_CACHE_ROWS:
+            self.plan_cache_rows -= len(self.plan_cache.pop(next(iter(self.plan_cache))))
+
+    def show_style(self, style):
+        """Show the selected style's plan for the previewed folder, planning it the first time"""
+        if self.worker is not None or self.tree_check.isChecked():
+            return
+        folder = self.folder_entry.text().strip()
+        if not folder:
+            return
+        ignore_var = self.ignore_entry.text().strip()
+        ignore_dirs = set(ignore_var.split(',')) if ignore_var else None
+        key = self.make_plan_key(Path(folder), ignore_dirs)
+        plan = self.plan_cache.get((key, style))
+        if plan is None and key != self.previewed_key:
+            # The shown plan has the old style; drop it so Apply can't rename with it
+            if self.changes:
+                self.reset_changes()
+                self.status_bar.showMessage(self.t('please_preview'))
+            return
+        self.style_var = style
+        self.ignore_var = ignore_var
+        if plan is None:
+            # The first switch plans every style not cached yet in one walk
+            self.reset_changes()
+            other_styles = [other for other in STYLES if other != style and (key, other) not in self.plan_cache]
+            self.start_preview(Path(folder), ignore_dirs, key, other_styles)
+            return
+        # A copy, so a later preview or apply never changes the cached plan
+        self.partial_plan = False
+        self.apply_btn.setEnabled(True)
+        self.changes = list(plan)
+        self.changes_model.set_changes(self.changes)
+        self.changes_model.set_filter(self.filter_entry.text())
+        if not self.changes:
+            self.status_bar.showMessage(self.t('no_changes'))
+        else:
+            self.status_bar.showMessage(self.t('cached_plan').format(len(self.changes)) + ' ' + self.t('preview_warning'))
+
+    def on_preview_batch(self, batch):
+        self.changes_model.append_changes(batch)
+
+    def on_preview_progress(self, scanned, found):
+        self.status_bar.showMessage(self.t('scanning').format(scanned, found))
+
+    def on_preview_finished(self):
+        worker = self.finish_worker()
+        if worker is None:
+            return
+        if worker.was_cancelled or worker.error is not None:
+            self.partial_plan = True
+            self.apply_btn.setEnabled(False)
+        else:
+            self.cache_plan(worker.cache_key, self.changes)
+            for style, plan in worker.variants.items():
+                self.cache_plan((worker.cache_key[0], style), plan)
+            self.previewed_key = worker.cache_key[0]
+        if worker.was_cancelled:
+            self.status_bar.showMessage(self.t('cancelled').format(len(self.changes)) + ' ' + self.t('partial_plan'))
+        elif worker.error is not None:
+            self.status_bar.showMessage(self.t('failed').format(len(self.changes), worker.error) + ' ' +
+                                        self.t('partial_plan'))
+        elif not self.changes:
+            self.status_bar.showMessage(self.t('no_changes'))
+        else:
+            self.status_bar.showMessage(self.t('found_items').format(len(self.changes)) + ' ' + self.t('preview_warning'))
+
+    def show_list_preview(self):
+        if self.tree is not None:
+            self.tree.hide()
+        self.filter_entry.show()
+        self.changes_list.show()
+
+    def ensure_tree(self):
+        """Build the tree view the first time it is needed"""
+        if self.tree is None:
+            self.tree = QTreeWidget()
+            self.tree.setFont(self.changes_list.font())
+            self.tree.setHeaderLabels([self.t('tree_name'), self.t('tree_renames')])
+            self.tree.setUniformRowHeights(True)
+            self.tree.setMinimumHeight(300)
+            self.tree.itemExpanded.connect(self.load_tree_item)
+            self.results_layout.insertWidget(self.results_layout.indexOf(self.changes_list), self.tree)
+        return self.tree
+
+    def show_tree_preview(self, folder_path, ignore_dirs):
+        tree = self.ensure_tree()
+        key = (str(folder_path.resolve()), frozenset(ignore_dirs or ()), self.style_var)
+        if key != self.tree_key:
+            self.tree_key = key
+            self.tree_cache = {}
+            self.tree_configs = {}
+        self.tree_ignore = ignore_dirs
+        self.filter_entry.hide()
+        self.changes_list.hide()
+        tree.show()
+        tree.clear()
+        root_item = self.make_tree_dir_item(folder_path, str(folder_path))
+        tree.addTopLevelItem(root_item)
+        root_item.setExpanded(True)
+
+    def make_tree_dir_item(self, path, label):
+        item = QTreeWidgetItem([label, ''])
+        item.setData(0, PATH_ROLE, str(path))
+        item.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
+        return item
+
+    def load_tree_item(self, item):
+        """Plan one folder the first time its node is expanded; plans are cached per folder"""
+        if item.data(0, LOADED_ROLE):
+            return
+        path = Path(item.data(0, PATH_ROLE))
+        plan = self.tree_cache.get(path)
+        if plan is None:
+            try:
+                # Folders below the root inherit the config files of the folders above them
+                plan = plan_directory(path, self.tree_ignore, self.style_var, self.tree_configs.get(path))
+            except (OSError, ValueError) as e:
+                item.setText(1, str(e))
+                return
+            self.tree_cache[path] = plan
+        item.setData(0, LOADED_ROLE, True)
+        subdirs, renames, config = plan
+        new_names = {old.name: new.name for old, new in renames}
+        item.setText(1, str(len(renames)))
+        children = []
+        for name in subdirs:
+            self.tree_configs[path / name] = config
+            label = f"{name} → {new_names[name]}" if name in new_names else name
+            children.append(self.make_tree_dir_item(path / name, label))
+        subdir_names = set(subdirs)
+        file_renames = [(old, new) for old, new in renames if old.name not in subdir_names]
+        for old, new in file_renames[:TREE_FILE_LIMIT]:
+            children.append(QTreeWidgetItem([f"{old.name} → {new.name}", '']))
+        if len(file_renames) > TREE_FILE_LIMIT:
+            children.append(QTreeWidgetItem([self.t('tree_more').format(len(file_renames) - TREE_FILE_LIMIT), '']))
+        item.addChildren(children)
+        item.setChildIndicatorPolicy(QTreeWidgetItem.DontShowIndicatorWhenChildless)
+        self.status_bar.showMessage(self.t('tree_loaded').format(len(self.tree_cache)))
 
     def apply_changes(self):
+        if self.tree_check.isChecked() and not self.changes:
+            QMessageBox.warning(self, "Warning", self.t('tree_apply_hint'))
+            return
         if not self.changes:
             QMessageBox.warning(self, "Warning", self.t('warning_no_changes'))
             return
+        if self.partial_plan:
+            QMessageBox.warning(self, "Warning", self.t('partial_plan'))
+            return
+        if self.worker is not None:
+            return
         selected = self.changes_list.selectedIndexes()
         if not selected:
-            items_to_apply = self.changes
+            items_to_apply = list(self.changes)
         else:
-            items_to_apply = [self.changes[i.row()] for i in selected]
+            # Keep plan order so children are renamed before their parents
+            rows = sorted(self.changes_model.plan_index(i.row()) for i in selected)
+            items_to_apply = [self.changes[row] for row in rows]
         reply = QMessageBox.question(self, "Confirm", self.t('confirm_apply').format(len(items_to_apply)),
                                      QMessageBox.Yes | QMessageBox.No)
         if reply != QMessageBox.Yes:
             return
-        try:
-            folder = self.folder_entry.text().strip()
-            folder_path = Path(folder)
-            self.style_var = self.style_combo.currentText()
-            self.ignore_var = self.ignore_entry.text().strip()
-            ignore_dirs = None
-            if self.ignore_var:
-                ignore_dirs = set(self.ignore_var.split(','))
-            changes = rename_recursive(folder_path, apply=True, ignore_dirs=ignore_dirs, style=self.style_var)
-            self.status_bar.showMessage(self.t('changes_applied') + ' ' + self.t('renamed_items').format(len(changes)))
-            self.changes_list.clear()
-            self.changes = []
-        except Exception as e:
-            QMessageBox.critical(self, "Error", self.t('error_occurred').format(str(e)))
+        folder_path = Path(self.folder_entry.text().strip())
+        self.apply_total = len(items_to_apply)
+        self.applied = []
+        self.start_worker(RenameWorker(folder_path, items=items_to_apply, parent=self),
+                          self.on_apply_batch, self.on_apply_progress, self.on_apply_finished)
+
+    def on_apply_batch(self, batch):
+        self.applied.extend(batch)
+
+    def on_apply_progress(self, scanned, done):
+        self.status_bar.showMessage(self.t('applying').format(done, self.apply_total))
+
+    def on_apply_finished(self):
+        # The tree has changed, cached plans no longer match it
+        self.plan_cache.clear()
+        self.plan_cache_rows = 0
+        self.previewed_key = None
+        worker = self.finish_worker()
+        if worker is None:
+            return
+        if worker.was_cancelled:
+            self.status_bar.showMessage(self.t('cancelled').format(len(self.applied)))
+        elif worker.error is not None:
+            self.status_bar.showMessage(self.t('failed').format(len(self.applied), worker.error))
+        else:
+            self.status_bar.showMessage(self.t('changes_applied') + ' ' + self.t('renamed_items').format(len(self.applied)))
+        self.reset_changes()
+
+    def start_worker(self, worker, on_batch, on_progress, on_finished):
+        self.worker = worker
+        worker.batch_ready.connect(on_batch)
+        worker.progress.connect(on_progress)
+        worker.failed.connect(self.on_worker_failed)
+        worker.finished.connect(on_finished)
+        self.preview_btn.setEnabled(False)
+        self.apply_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        # The style can't change under a running worker
+        self.style_combo.setEnabled(False)
+        worker.start()
+
+    def finish_worker(self):
+        worker = self.worker
+        self.worker = None
+        self.preview_btn.setEnabled(True)
+        self.apply_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+        self.style_combo.setEnabled(True)
+        if worker is not None:
+            worker.deleteLater()
+        return worker
+
+    def on_worker_failed(self, message):
+        QMessageBox.critical(self, "Error", self.t('error_occurred').format(message))
+
+    def cancel_worker(self):
+        if self.worker is not None:
+            self.worker.cancel()
+
+    def stop_worker(self):
+        """Cancel a running worker and wait for it, dropping its pending results"""
+        worker = self.worker
+        if worker is None:
+            return
+        worker.cancel()
+        for signal in (worker.batch_ready, worker.progress, worker.finished):
+            signal.disconnect()
+        worker.wait()
+        self.finish_worker()
+
+    def closeEvent(self, event):
+        self.stop_worker()
+        super().closeEvent(event)
 
     def clear_changes(self):
-        self.changes_list.clear()
-        self.changes = []
+        self.stop_worker()
+        self.reset_changes()
         self.status_bar.showMessage('')
 
+    def reset_changes(self):
+        self.changes = []
+        self.partial_plan = False
+        self.apply_btn.setEnabled(self.worker is None)
+        self.changes_model.set_changes(self.changes)
+        self.changes_model.set_filter(self.filter_entry.text())
+
+    def apply_filter(self):
+        self.changes_list.clearSelection()
+        self.changes_model.set_filter(self.filter_entry.text())
+        if self.worker is None and self.changes:
+            self.status_bar.showMessage(self.t('showing_items').format(self.changes_model.rowCount(), len(self.changes)))
+
     def select_all(self):
         self.changes_list.selectAll()
 
@@ -571,6 +1182,8 @@ class RepoNamerWindow(QMainWindow):
             ext, filter_str = '.txt', self.t('txt_files')
         filename, _ = QFileDialog.getSaveFileName(self, self.t('save_file'), f'report{ext}', f'{filter_str};;{self.t("all_files")}')
         if filename:
+            import csv
+            from datetime import datetime
             try:
                 if report_format == 'csv':
                     with open(filename, 'w', newline='', encoding='utf-8') as f:
@@ -610,7 +1223,12 @@ class RepoNamerWindow(QMainWindow):
             with open('rules.json', 'r', encoding='utf-8') as f:
                 current_rules = json.load(f)
             
-            dialog = RulesDialog(self)
+            folder_path = Path(self.folder_entry.text().strip())
+            ignore_var = self.ignore_entry.text().strip()
+            ignore_dirs = set(ignore_var.split(',')) if ignore_var else None
+            if not self.folder_entry.text().strip() or not folder_path.is_dir():
+                folder_path = None
+            dialog = RulesDialog(self, folder_path, ignore_dirs, self.style_combo.currentText(), current_rules)
             dialog.text_edit.setText(json.dumps(current_rules, indent=2, ensure_ascii=False))
             
             if dialog.exec() == QDialog.Accepted:
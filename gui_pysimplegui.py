@@ -3,6 +3,7 @@ import json
 import os
 from pathlib import Path
 from rename import rename_recursive
+from hooks import Hooks
 import csv
 from datetime import datetime
 
@@ -38,6 +39,8 @@ class ModernRepoNamerGUI:
                 'confirm_apply': 'Are you sure you want to rename {} items?\n\nThis action cannot be undone!',
                 'changes_applied': '✅ All changes have been applied!',
                 'renamed_items': 'Renamed {} items:',
+                'scanning': '🔍 Scanned {} folders, {} items to rename...',
+                'applying': '⏳ Renamed {} items...',
                 'error_no_folder': 'Please select a folder first!',
                 'error_folder_not_exist': 'Folder does not exist: {}',
                 'warning_no_changes': 'No changes to apply. Please preview changes first!',
@@ -74,6 +77,8 @@ class ModernRepoNamerGUI:
                 'confirm_apply': '確定要重命名 {} 個項目嗎？\n\n此操作無法復原！',
                 'changes_applied': '✅ 所有變更已套用！',
                 'renamed_items': '已重命名 {} 個項目:',
+                'scanning': '🔍 已掃描 {} 個資料夾，{} 個項目需要重命名...',
+                'applying': '⏳ 已重命名 {} 個項目...',
                 'error_no_folder': '請先選擇資料夾！',
                 'error_folder_not_exist': '資料夾不存在: {}',
                 'warning_no_changes': '沒有變更可套用。請先預覽變更！',
@@ -199,7 +204,8 @@ class ModernRepoNamerGUI:
             # Get changes
             self.changes = rename_recursive(folder_path, apply=False, 
                                           ignore_dirs=ignore_dirs, 
-                                          style=self.style_var)
+                                          style=self.style_var,
+                                          hooks=self.progress_hooks(apply=False))
             
             # Update changes list
             changes_list = []
@@ -220,6 +226,28 @@ class ModernRepoNamerGUI:
         except Exception as e:
             sg.popup_error(self.t('error_occurred').format(str(e)))
     
+    def progress_hooks(self, apply):
+        """Engine hooks that keep the status line moving during a scan or apply"""
+        hooks = Hooks()
+        counts = {'scanned': 0, 'found': 0}
+
+        def on_scanned(batch):
+            counts['scanned'] += len(batch)
+            if not apply:
+                self.window['-STATUS-'].update(self.t('scanning').format(counts['scanned'], counts['found']))
+            # The scan runs on the UI thread, so let the window repaint between batches
+            self.window.refresh()
+
+        def on_changes(batch):
+            counts['found'] += len(batch)
+            if apply:
+                self.window['-STATUS-'].update(self.t('applying').format(counts['found']))
+                self.window.refresh()
+
+        hooks.add('on_directory_scanned', on_scanned)
+        hooks.add('after_rename' if apply else 'on_planned', on_changes)
+        return hooks
+
     def apply_changes(self):
         """Apply changes"""
         if not self.changes:
@@ -255,7 +283,8 @@ class ModernRepoNamerGUI:
             # For now, apply all changes
             changes = rename_recursive(folder_path, apply=True, 
                                     ignore_dirs=ignore_dirs, 
-                                    style=self.style_var)
+                                    style=self.style_var,
+                                    hooks=self.progress_hooks(apply=True))
             
             # Update status
             self.window['-STATUS-'].update(
@@ -3,9 +3,19 @@ from tkinter import ttk, filedialog, messagebox, scrolledtext
 from pathlib import Path
 import sys
 import os
-from rename import rename_recursive
+import time
+import queue
+import threading
+from rename import apply_plan, iter_renames, iter_variant_renames
+from hooks import Hooks
 import tkinterdnd2 as tkdnd
 
+POLL_INTERVAL_MS = 50
+PROGRESS_INTERVAL = 0.1
+STYLES = ["kebab", "snake", "lower-camel", "upper-camel"]
+# Rows of finished previews kept for switching back to a style without a rescan
+PLAN_CACHE_ROWS = 200_000
+
 class RepoNamerGUI:
     def __init__(self, root):
         self.root = root
@@ -16,8 +26,29 @@ class RepoNamerGUI:
         self.folder_path = tk.StringVar()
         self.style_var = tk.StringVar(value="kebab")
         self.ignore_var = tk.StringVar(value=".git,node_modules,.venv")
+        self.max_lines_var = tk.IntVar(value=10000)
+        self.status_var = tk.StringVar()
         self.changes = []
         
+        # Background task state
+        self.queue = queue.Queue()
+        self.worker = None
+        self.cancel_event = threading.Event()
+        self.task_kind = None
+        self.task_total = 0
+        self.task_results = []
+        # The worker's error message, if it failed
+        self.task_error = None
+        self.shown_lines = 0
+        # ((folder, ignore set, rules), style) -> plan, oldest first, filled by previews
+        self.plan_cache = {}
+        self.plan_cache_rows = 0
+        # The folder of the last finished preview; switching style there plans the new style
+        self.previewed_key = None
+        self.task_key = None
+        # Plans of the other styles a style switch planned in the same walk, by style
+        self.task_variants = {}
+        
         self.setup_ui()
         self.setup_drag_drop()
     
@@ -98,10 +129,11 @@ class RepoNamerGUI:
         style_label = ttk.Label(options_frame, text="Naming style:", font=label_font)
         style_label.grid(row=0, column=0, sticky=tk.W, pady=2)
         
-        style_combo = ttk.Combobox(options_frame, textvariable=self.style_var, 
-                                  values=["kebab", "snake", "lower-camel", "upper-camel"], 
+        self.style_combo = ttk.Combobox(options_frame, textvariable=self.style_var, 
+                                  values=STYLES, 
                                   state="readonly", width=15, font=entry_font)
-        style_combo.grid(row=0, column=1, sticky=tk.W, padx=5)
+        self.style_combo.grid(row=0, column=1, sticky=tk.W, padx=5)
+        self.style_combo.bind("<<ComboboxSelected>>", self.show_style)
         
         # Ignore directories
         ignore_label = ttk.Label(options_frame, text="Ignore directories:", font=label_font)
@@ -110,15 +142,26 @@ class RepoNamerGUI:
         ignore_entry = ttk.Entry(options_frame, textvariable=self.ignore_var, width=50, font=entry_font)
         ignore_entry.grid(row=1, column=1, sticky=(tk.W, tk.E), padx=5)
         
+        # Output cap
+        max_lines_label = ttk.Label(options_frame, text="Max lines shown:", font=label_font)
+        max_lines_label.grid(row=2, column=0, sticky=tk.W, pady=2)
+        
+        max_lines_spin = ttk.Spinbox(options_frame, textvariable=self.max_lines_var, from_=100, to=1000000,
+                                     increment=1000, width=10, font=entry_font)
+        max_lines_spin.grid(row=2, column=1, sticky=tk.W, padx=5)
+        
         # Buttons
         button_frame = ttk.Frame(main_frame)
         button_frame.grid(row=3, column=0, columnspan=3, pady=10)
         
-        preview_button = ttk.Button(button_frame, text="Preview Changes", command=self.preview_changes)
-        preview_button.pack(side=tk.LEFT, padx=5)
+        self.preview_button = ttk.Button(button_frame, text="Preview Changes", command=self.preview_changes)
+        self.preview_button.pack(side=tk.LEFT, padx=5)
+        
+        self.apply_button = ttk.Button(button_frame, text="Apply Changes", command=self.apply_changes)
+        self.apply_button.pack(side=tk.LEFT, padx=5)
         
-        apply_button = ttk.Button(button_frame, text="Apply Changes", command=self.apply_changes)
-        apply_button.pack(side=tk.LEFT, padx=5)
+        self.cancel_button = ttk.Button(button_frame, text="Cancel", command=self.cancel_task, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
         
         clear_button = ttk.Button(button_frame, text="Clear", command=self.clear_output)
         clear_button.pack(side=tk.LEFT, padx=5)
@@ -130,6 +173,13 @@ class RepoNamerGUI:
         self.output_text = scrolledtext.ScrolledText(main_frame, height=20, width=80, font=output_font)
         self.output_text.grid(row=5, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
         
+        # Progress
+        self.progress_bar = ttk.Progressbar(main_frame, mode='indeterminate')
+        self.progress_bar.grid(row=6, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
+        
+        status_label = ttk.Label(main_frame, textvariable=self.status_var, font=label_font)
+        status_label.grid(row=6, column=2, sticky=tk.E, padx=5)
+        
         # Configure main frame weights
         main_frame.rowconfigure(5, weight=1)
     
@@ -138,7 +188,15 @@ class RepoNamerGUI:
         if folder:
             self.folder_path.set(folder)
     
+    def parse_ignore_dirs(self):
+        # If no ignore directories specified, use default (None will use default in iter_renames)
+        if self.ignore_var.get().strip():
+            return set(self.ignore_var.get().split(','))
+        return None
+    
     def preview_changes(self):
+        if self.worker is not None:
+            return
         folder = self.folder_path.get()
         if not folder:
             messagebox.showerror("Error", "Please select a folder first!")
@@ -149,32 +207,71 @@ class RepoNamerGUI:
             messagebox.showerror("Error", f"Folder does not exist: {folder}")
             return
         
-        try:
-            # Parse ignore directories
-            ignore_dirs = None
-            if self.ignore_var.get().strip():
-                ignore_dirs = set(self.ignore_var.get().split(','))
-            # If no ignore directories specified, use default (None will use default in rename_recursive)
-            
-            # Get changes
-            self.changes = rename_recursive(folder_path, apply=False, 
-                                          ignore_dirs=ignore_dirs, 
-                                          style=self.style_var.get())
-            
-            # Display results
-            self.output_text.delete(1.0, tk.END)
-            if not self.changes:
-                self.output_text.insert(tk.END, "✅ No files or folders need to be renamed.\n")
+        ignore_dirs = self.parse_ignore_dirs()
+        # The preview button always rescans; the result replaces the cached plans
+        key = self.plan_key(folder_path, ignore_dirs)
+        for cached in [cached for cached in self.plan_cache if cached[0] == key]:
+            self.plan_cache_rows -= len(self.plan_cache.pop(cached))
+        self.start_preview(folder_path, ignore_dirs, key)
+    
+    def start_preview(self, folder_path, ignore_dirs, key, styles=None):
+        # styles: the styles to plan in one walk, the shown one first
+        self.changes = []
+        styles = styles or [self.style_var.get()]
+        self.task_key = (key, styles[0])
+        self.start_task('preview', self.scan_worker, folder_path, ignore_dirs, styles)
+    
+    def plan_key(self, folder_path, ignore_dirs):
+        from cleaner import get_rules
+        return str(folder_path.resolve()), frozenset(ignore_dirs or ()), tuple(get_rules().items())
+    
+    def show_style(self, event=None):
+        """Show the selected style's plan for the previewed folder, planning it the first time"""
+        folder = self.folder_path.get()
+        if self.worker is not None or not folder:
+            return
+        ignore_dirs = self.parse_ignore_dirs()
+        key = self.plan_key(Path(folder), ignore_dirs)
+        style = self.style_var.get()
+        plan = self.plan_cache.get((key, style))
+        if plan is None:
+            if key == self.previewed_key:
+                # The first switch plans every style not cached yet in one walk
+                styles = [style] + [other for other in STYLES
+                                    if other != style and (key, other) not in self.plan_cache]
+                self.start_preview(Path(folder), ignore_dirs, key, styles)
             else:
-                self.output_text.insert(tk.END, f"📝 Found {len(self.changes)} items to rename:\n\n")
-                for old, new in self.changes:
-                    self.output_text.insert(tk.END, f"  {old} → {new}\n")
-                self.output_text.insert(tk.END, f"\n⚠️ This is a preview. Click 'Apply Changes' to actually rename.\n")
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+                # The shown plan has the old style; drop it so Apply can't rename with it
+                self.changes = []
+                self.output_text.delete(1.0, tk.END)
+                self.shown_lines = 0
+                self.output_text.insert(tk.END, "Naming style changed. Click 'Preview Changes' to see the new plan.\n")
+                self.status_var.set("")
+            return
+        self.changes = list(plan)
+        self.output_text.delete(1.0, tk.END)
+        self.shown_lines = 0
+        if not self.changes:
+            self.output_text.insert(tk.END, "✅ No files or folders need to be renamed.\n")
+        else:
+            self.output_text.insert(tk.END, f"📝 Found {len(self.changes)} items to rename:\n\n")
+            self.output_text.insert(tk.END, ''.join(self.format_lines(self.changes)))
+            hidden = len(self.changes) - self.shown_lines
+            if hidden > 0:
+                self.output_text.insert(tk.END, f"  ... {hidden} more items not shown\n")
+        self.status_var.set(f"Found {len(self.changes)} items to rename (from the last preview)")
+    
+    def cache_plan(self, key, plan):
+        """Keep a finished plan, dropping the oldest ones past PLAN_CACHE_ROWS rows"""
+        self.plan_cache_rows -= len(self.plan_cache.pop(key, ()))
+        self.plan_cache[key] = plan
+        self.plan_cache_rows += len(plan)
+        while self.plan_cache_rows > PLAN_CACHE_ROWS:
+            self.plan_cache_rows -= len(self.plan_cache.pop(next(iter(self.plan_cache))))
     
     def apply_changes(self):
+        if self.worker is not None:
+            return
         if not self.changes:
             messagebox.showwarning("Warning", "No changes to apply. Please preview changes first!")
             return
@@ -186,37 +283,189 @@ class RepoNamerGUI:
         if not result:
             return
         
-        try:
-            folder = self.folder_path.get()
-            folder_path = Path(folder)
-            
-            # Parse ignore directories
-            ignore_dirs = None
-            if self.ignore_var.get().strip():
-                ignore_dirs = set(self.ignore_var.get().split(','))
-            # If no ignore directories specified, use default (None will use default in rename_recursive)
-            
-            # Apply changes
-            changes = rename_recursive(folder_path, apply=True, 
-                                    ignore_dirs=ignore_dirs, 
-                                    style=self.style_var.get())
-            
-            # Display results
-            self.output_text.delete(1.0, tk.END)
-            self.output_text.insert(tk.END, "✅ All changes have been applied!\n\n")
-            self.output_text.insert(tk.END, f"Renamed {len(changes)} items:\n\n")
-            for old, new in changes:
-                self.output_text.insert(tk.END, f"  {old} → {new}\n")
-            
-            # Clear changes list
-            self.changes = []
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+        self.task_total = len(self.changes)
+        self.start_task('apply', self.apply_worker, list(self.changes))
+    
+    def cancel_task(self):
+        self.cancel_event.set()
+        self.status_var.set("Cancelling...")
     
     def clear_output(self):
+        if self.worker is not None:
+            self.cancel_task()
         self.output_text.delete(1.0, tk.END)
         self.changes = []
+        self.shown_lines = 0
+    
+    def start_task(self, kind, target, *args):
+        self.task_kind = kind
+        self.task_results = []
+        self.task_error = None
+        self.task_variants = {}
+        self.shown_lines = 0
+        self.cancel_event.clear()
+        self.output_text.delete(1.0, tk.END)
+        self.preview_button.config(state=tk.DISABLED)
+        self.apply_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        # The style can't change under a running task
+        self.style_combo.config(state=tk.DISABLED)
+        if kind == 'apply':
+            self.progress_bar.config(mode='determinate', maximum=max(self.task_total, 1), value=0)
+        else:
+            self.progress_bar.config(mode='indeterminate')
+            self.progress_bar.start(10)
+        self.worker = threading.Thread(target=target, args=args, daemon=True)
+        self.worker.start()
+        self.root.after(POLL_INTERVAL_MS, self.poll_queue)
+    
+    def scan_worker(self, folder_path, ignore_dirs, styles):
+        """Runs in a background thread; only talks to the UI through the queue"""
+        state = {'scanned': 0, 'found': 0}
+        hooks = Hooks(batch_size=1000, flush_interval=PROGRESS_INTERVAL)
+
+        @hooks.on('on_directory_scanned')
+        def on_scanned(batch):
+            state['scanned'] += len(batch)
+            self.queue.put(('progress', state['scanned'], state['found']))
+
+        @hooks.on('on_planned')
+        def on_planned(batch):
+            state['found'] += len(batch)
+            self.queue.put(('batch', batch))
+
+        try:
+            # The shown plan arrives through on_planned batches
+            if len(styles) == 1:
+                for _ in iter_renames(folder_path, ignore_dirs, styles[0], cancelled=self.cancel_event.is_set,
+                                      hooks=hooks):
+                    pass
+            else:
+                variants = {style: [] for style in styles[1:]}
+                for variant, old_path, new_path in iter_variant_renames(
+                        folder_path, [(None, style) for style in styles], ignore_dirs,
+                        cancelled=self.cancel_event.is_set, hooks=hooks):
+                    if variant:
+                        variants[styles[variant]].append((old_path, new_path))
+                self.queue.put(('variants', variants))
+        except Exception as e:
+            self.queue.put(('error', str(e)))
+        hooks.flush()
+        self.queue.put(('progress', state['scanned'], state['found']))
+        self.queue.put(('done', self.cancel_event.is_set()))
+    
+    def apply_worker(self, items):
+        hooks = Hooks(batch_size=200, flush_interval=PROGRESS_INTERVAL)
+        hooks.add('after_rename', lambda batch: self.queue.put(('batch', batch)))
+        try:
+            apply_plan(items, hooks=hooks, cancelled=self.cancel_event.is_set)
+        except Exception as e:
+            self.queue.put(('error', str(e)))
+        self.queue.put(('done', self.cancel_event.is_set()))
+    
+    def poll_queue(self):
+        lines = []
+        finished = None
+        deadline = time.monotonic() + 0.02
+        while finished is None and time.monotonic() < deadline:
+            try:
+                message = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            kind = message[0]
+            if kind == 'batch':
+                self.task_results.extend(message[1])
+                lines.extend(self.format_lines(message[1]))
+            elif kind == 'progress':
+                self.status_var.set(f"Scanned {message[1]} folders, {message[2]} items to rename")
+            elif kind == 'variants':
+                self.task_variants = message[1]
+            elif kind == 'error':
+                self.task_error = message[1]
+                messagebox.showerror("Error", f"An error occurred: {message[1]}")
+            elif kind == 'done':
+                finished = message[1]
+        
+        # One insert per poll keeps the Text widget from relaying out per line
+        if lines:
+            self.output_text.insert(tk.END, ''.join(lines))
+        if self.task_kind == 'apply':
+            self.progress_bar.config(value=len(self.task_results))
+            self.status_var.set(f"Renamed {len(self.task_results)} of {self.task_total} items")
+        
+        if finished is None:
+            self.root.after(POLL_INTERVAL_MS, self.poll_queue)
+        else:
+            self.finish_task(finished)
+    
+    def format_lines(self, batch):
+        try:
+            max_lines = max(int(self.max_lines_var.get()), 0)
+        except (tk.TclError, ValueError):
+            max_lines = 10000
+        room = max_lines - self.shown_lines
+        if room <= 0:
+            return []
+        shown = batch[:room]
+        self.shown_lines += len(shown)
+        return [f"  {old} → {new}\n" for old, new in shown]
+    
+    def finish_task(self, cancelled):
+        self.worker = None
+        self.progress_bar.stop()
+        self.progress_bar.config(mode='determinate', value=0)
+        self.preview_button.config(state=tk.NORMAL)
+        self.apply_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+        self.style_combo.config(state="readonly")
+        
+        count = len(self.task_results)
+        hidden = count - self.shown_lines
+        if hidden > 0:
+            self.output_text.insert(tk.END, f"  ... {hidden} more items not shown\n")
+        
+        if self.task_kind == 'preview':
+            if cancelled or self.task_error is not None:
+                # A partial plan is only shown, never applied
+                self.changes = []
+            else:
+                self.changes = self.task_results
+                self.cache_plan(self.task_key, self.changes)
+                for style, plan in self.task_variants.items():
+                    self.cache_plan((self.task_key[0], style), plan)
+                self.previewed_key = self.task_key[0]
+            if cancelled:
+                self.output_text.insert(1.0, f"⚠️ Preview cancelled after {count} items. Preview again to apply.\n\n")
+            elif self.task_error is not None:
+                self.output_text.insert(1.0, f"❌ Preview failed after {count} items: {self.task_error}\n"
+                                             "Fix the problem and preview again to apply.\n\n")
+            elif not count:
+                self.output_text.insert(tk.END, "✅ No files or folders need to be renamed.\n")
+            else:
+                self.output_text.insert(1.0, f"📝 Found {count} items to rename:\n\n")
+                self.output_text.insert(tk.END, f"\n⚠️ This is a preview. Click 'Apply Changes' to actually rename.\n")
+            if cancelled:
+                self.status_var.set(f"Preview cancelled after {count} items")
+            elif self.task_error is not None:
+                self.status_var.set(f"Preview failed after {count} items")
+            else:
+                self.status_var.set(f"Found {count} items to rename")
+        else:
+            if cancelled:
+                self.output_text.insert(1.0, f"⚠️ Apply cancelled after {count} of {self.task_total} items.\n\n")
+            elif self.task_error is not None:
+                self.output_text.insert(1.0, f"❌ Apply failed after {count} of {self.task_total} items: "
+                                             f"{self.task_error}\n\nRenamed {count} items:\n\n")
+            else:
+                self.output_text.insert(1.0, "✅ All changes have been applied!\n\n" f"Renamed {count} items:\n\n")
+            self.status_var.set(f"Renamed {count} items")
+            # Clear changes list; the tree has changed, so cached plans are stale too
+            self.changes = []
+            self.plan_cache.clear()
+            self.plan_cache_rows = 0
+            self.previewed_key = None
+        self.task_results = []
+        self.task_variants = {}
 
 def main():
     root = tkdnd.TkinterDnD.Tk()
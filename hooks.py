@@ -0,0 +1,86 @@
+import time
+
+EVENTS = ('on_directory_scanned', 'on_planned', 'before_rename', 'after_rename', 'on_error')
+# Events whose handlers get lists of items instead of one call per item
+BATCHED_EVENTS = ('on_directory_scanned', 'on_planned', 'after_rename')
+# Items queued per batched event before its handlers are called
+DEFAULT_BATCH_SIZE = 1000
+# Seconds after which queued items are delivered even if the batch isn't full
+DEFAULT_FLUSH_INTERVAL = 0.1
+
+
+class Hooks:
+    """Callbacks for rename engine events, with per-entry events delivered in batches"""
+
+    # Batched events, each handler gets a list:
+    #   on_directory_scanned([(directory, entry_count), ...])
+    #   on_planned([(old_path, new_path), ...])
+    #   after_rename([(old_path, new_path), ...])
+    # Per-item events:
+    #   before_rename(old_path, new_path): return False to veto the rename
+    #   on_error(path, new_path, error): return True to skip a failed rename and carry on;
+    #     new_path is None for a directory that could not be listed, which is always skipped
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL, clock=time.monotonic):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.handlers = {event: [] for event in EVENTS}
+        self.pending = {event: [] for event in BATCHED_EVENTS}
+        self.last_flush = clock()
+
+    def add(self, event, func):
+        """Register func for event and return it"""
+        if event not in self.handlers:
+            raise ValueError(f"unknown hook event: {event}")
+        self.handlers[event].append(func)
+        return func
+
+    def on(self, event):
+        """Decorator form of add: @hooks.on('after_rename')"""
+        return lambda func: self.add(event, func)
+
+    def active(self):
+        return any(self.handlers.values())
+
+    def emit(self, event, item):
+        """Queue item for a batched event, delivering the batch once it is full"""
+        if not self.handlers[event]:
+            return
+        pending = self.pending[event]
+        pending.append(item)
+        if len(pending) >= self.batch_size:
+            self._deliver(event)
+
+    def tick(self):
+        """Deliver whatever is queued if flush_interval has passed since the last delivery"""
+        if self.clock() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Deliver every queued item, in event order"""
+        self.last_flush = self.clock()
+        for event in BATCHED_EVENTS:
+            if self.pending[event]:
+                self._deliver(event)
+
+    def _deliver(self, event):
+        # Handlers may keep the list (e.g. send it to another thread), so start a new one
+        batch = self.pending[event]
+        self.pending[event] = []
+        for func in self.handlers[event]:
+            func(batch)
+
+    def before_rename(self, old_path, new_path):
+        """False if any handler vetoes the rename"""
+        for func in self.handlers['before_rename']:
+            if func(old_path, new_path) is False:
+                return False
+        return True
+
+    def error(self, path, new_path, error):
+        """True if a handler chose to skip the failure"""
+        handled = False
+        for func in self.handlers['on_error']:
+            if func(path, new_path, error):
+                handled = True
+        return handled
@@ -0,0 +1,146 @@
+import os
+import sys
+import tracemalloc
+from contextlib import contextmanager
+
+# Allocation sites listed per phase
+DEFAULT_TOP = 10
+# Frames kept per allocation; 1 groups allocations by the line that made them
+DEFAULT_FRAMES = 1
+# Share of --max-memory given to the on-disk sort buffer when spilling
+SPILL_SHARE = 0.25
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where getrusage is missing (Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def current_rss_bytes():
+    """Resident set size right now on Linux, the peak elsewhere"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.2f} GB"
+
+
+def _site(frame):
+    # Our own modules relative to the repo, everything else by file name (pathlib.py, ...)
+    path = frame.filename
+    if path.startswith(HERE + os.sep):
+        path = os.path.relpath(path, HERE)
+    else:
+        path = os.path.basename(path)
+    return f"{path}:{frame.lineno}"
+
+
+class MemoryLimitExceeded(RuntimeError):
+    """The process grew past its --max-memory budget"""
+
+
+class MemoryBudget:
+    """Stop the run once resident memory passes a limit, before the OOM killer does"""
+
+    def __init__(self, limit_bytes, measure=current_rss_bytes):
+        self.limit = limit_bytes
+        self.measure = measure
+        self.highest = 0
+
+    def check(self):
+        used = self.measure()
+        if used is None:
+            return None
+        self.highest = max(self.highest, used)
+        if used > self.limit:
+            raise MemoryLimitExceeded(f"Using {format_bytes(used)}, over the --max-memory budget of "
+                                      f"{format_bytes(self.limit)}; stopped before the system kills the process")
+        return used
+
+    def watch(self, hooks):
+        """Check after every batch of scanned directories or planned renames; returns hooks"""
+        # Planned renames also cover --git-index, which scans no directories
+        for event in ('on_directory_scanned', 'on_planned'):
+            hooks.add(event, lambda batch: self.check())
+        return hooks
+
+
+class PhaseMemory:
+    """Memory at the end of one phase: traced now, traced peak, peak RSS and the biggest growth"""
+
+    __slots__ = ('name', 'current', 'peak', 'rss', 'growth')
+
+    def __init__(self, name, current, peak, rss, growth):
+        self.name = name
+        self.current = current
+        self.peak = peak
+        self.rss = rss
+        self.growth = growth
+
+
+class MemoryProfiler:
+    """tracemalloc snapshots per phase, compared to the previous one to find what grew"""
+
+    # Tracing makes every allocation slower (roughly 2-3x run time), so it is opt-in
+    def __init__(self, top=DEFAULT_TOP, frames=DEFAULT_FRAMES):
+        self.top = top
+        self.frames = frames
+        self.phases = []
+        self.previous = None
+
+    def start(self):
+        tracemalloc.start(self.frames)
+        self.previous = self._snapshot()
+        return self
+
+    def stop(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _snapshot(self):
+        # Leave out tracemalloc's own bookkeeping
+        return tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+
+    @contextmanager
+    def phase(self, name):
+        """Record the memory of a phase when it ends, including when it fails"""
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = self._snapshot()
+            growth = [stat for stat in snapshot.compare_to(self.previous, 'lineno') if stat.size_diff > 0]
+            self.previous = snapshot
+            self.phases.append(PhaseMemory(name, current, peak, peak_rss_bytes(), growth[:self.top]))
+
+    def report(self):
+        """Lines for the end of the run: one block per phase, then the peak RSS"""
+        lines = []
+        for phase in self.phases:
+            rss = f", peak RSS {format_bytes(phase.rss)}" if phase.rss is not None else ""
+            lines.append(f"  {phase.name}: {format_bytes(phase.current)} traced at the end, "
+                         f"{format_bytes(phase.peak)} peak{rss}")
+            for stat in phase.growth:
+                lines.append(f"    +{format_bytes(stat.size_diff):>10} in {stat.count_diff:+,} blocks  "
+                             f"{_site(stat.traceback[0])}")
+        rss = peak_rss_bytes()
+        if rss is not None:
+            lines.append(f"  Peak RSS of the run: {format_bytes(rss)}")
+        return lines
@@ -0,0 +1,135 @@
+import os
+import time
+import tempfile
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+# Seconds between metric file updates during a run
+DEFAULT_INTERVAL = 15.0
+# Metric name prefix
+PREFIX = 'reponamer'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def write_atomic(path, text):
+    """Replace path with text in one step, so a reader never sees a partial file"""
+    directory = os.path.dirname(os.path.abspath(path))
+    # Temp names don't end in .prom, so the node exporter ignores them
+    fd, temp = tempfile.mkstemp(dir=directory, prefix='.metrics-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.chmod(temp, 0o644)
+        os.replace(temp, path)
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+
+class RunMetrics:
+    """Counters and phase timings of one run, written as a Prometheus textfile"""
+
+    # stats is handed to the rename engine, which bumps these keys:
+    # directories, entries, errors, planned_file, planned_directory,
+    # applied_file, applied_directory, apply_seconds
+    def __init__(self, path, root, interval=DEFAULT_INTERVAL):
+        self.path = path
+        self.root = str(root)
+        self.interval = interval
+        self.stats = Counter()
+        self.phases = {}
+        self.report_bytes = 0
+        self.started = time.time()
+        self.finished = None
+        self.success = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        """Time a phase; renames applied inside it count towards the apply phase instead"""
+        start = time.perf_counter()
+        applied = self.stats['apply_seconds']
+        try:
+            yield
+        finally:
+            spent = time.perf_counter() - start - (self.stats['apply_seconds'] - applied)
+            self.phases[name] = self.phases.get(name, 0.0) + max(spent, 0.0)
+
+    def start(self):
+        """Write the file now and then every interval seconds until finish()"""
+        self.write()
+        if self.interval:
+            self._thread = threading.Thread(target=self._run, name='metrics', daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.write()
+            except OSError:
+                # A full or read-only disk must not break the run itself
+                pass
+
+    def finish(self, success):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.finished = time.time()
+        self.success = success
+        self.write()
+
+    def render(self):
+        from cleaner import cache_stats
+        from memprof import peak_rss_bytes
+
+        stats = self.stats
+        root = f'root="{_escape(self.root)}"'
+        lookups, misses = cache_stats()
+        phases = dict(self.phases)
+        if stats['apply_seconds']:
+            phases['apply'] = stats['apply_seconds']
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{PREFIX}_{name}{{{', '.join([root] + labels)}}} {value}")
+
+        metric('directories_scanned_total', 'counter', 'Directories listed', [([], stats['directories'])])
+        metric('entries_scanned_total', 'counter', 'Files and directories looked at', [([], stats['entries'])])
+        metric('renames_planned_total', 'counter', 'Renames planned, by entry kind',
+               [([f'kind="{kind}"'], stats['planned_' + kind]) for kind in ('file', 'directory')])
+        metric('renames_applied_total', 'counter', 'Renames applied, by entry kind',
+               [([f'kind="{kind}"'], stats['applied_' + kind]) for kind in ('file', 'directory')])
+        metric('errors_total', 'counter', 'Unreadable directories and failed renames', [([], stats['errors'])])
+        metric('phase_duration_seconds', 'gauge', 'Time spent per phase',
+               [([f'phase="{name}"'], seconds) for name, seconds in sorted(phases.items())])
+        metric('clean_name_cache_lookups_total', 'counter', 'Cleaned-name cache lookups', [([], lookups)])
+        metric('clean_name_cache_misses_total', 'counter', 'Cleaned-name cache misses', [([], misses)])
+        metric('clean_name_cache_hit_ratio', 'gauge', 'Share of names served from the cache',
+               [([], (lookups - misses) / lookups if lookups else 0)])
+        metric('report_bytes', 'gauge', 'Bytes written to the report file', [([], self.report_bytes)])
+        rss = peak_rss_bytes()
+        if rss is not None:
+            metric('peak_rss_bytes', 'gauge', 'Peak resident memory of the run so far', [([], rss)])
+        metric('run_start_timestamp_seconds', 'gauge', 'When the run started', [([], self.started)])
+        metric('run_in_progress', 'gauge', '1 while the run is going', [([], 0 if self.finished else 1)])
+        if self.finished is not None:
+            metric('run_duration_seconds', 'gauge', 'Wall time of the run', [([], self.finished - self.started)])
+            metric('run_success', 'gauge', '1 if the run finished without error', [([], 1 if self.success else 0)])
+            metric('last_run_timestamp_seconds', 'gauge', 'When the run ended', [([], self.finished)])
+        return '\n'.join(lines) + '\n'
+
+    def write(self):
+        # The periodic thread and finish() may write at the same moment
+        with self._lock:
+            write_atomic(self.path, self.render())
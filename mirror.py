@@ -0,0 +1,315 @@
+import os
+import stat
+import errno
+import shutil
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from cleaner import compile_rules
+from rename import walk_tree
+
+# Written at the mirror root; a non-empty target without it is never touched
+MARKER = '.repo-namer-mirror'
+# File operations handed to a worker thread per job
+OPS_PER_JOB = 256
+# linux/fs.h FICLONE: share the source's blocks with the destination
+FICLONE = 0x40049409
+# Errors that mean "this way of linking isn't possible here", not "the file is bad"
+_UNSUPPORTED = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP, errno.EACCES,
+                errno.EINVAL, errno.ENOSYS, errno.ENOTTY}
+
+
+def default_workers():
+    # Linking is syscall-bound, threads overlap the waits
+    return min(32, (os.cpu_count() or 1) * 4)
+
+
+def _reflink(src, dst):
+    import fcntl
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+
+
+def _copy_range(src, dst):
+    # The filesystem may share blocks or copy server-side (XFS, Btrfs, NFS 4.2);
+    # otherwise the kernel copies, still without passing data through user space
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        remaining = os.fstat(fsrc.fileno()).st_size
+        while remaining:
+            copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+            if not copied:
+                break
+            remaining -= copied
+
+
+def link_file(src, dst):
+    """Give dst the contents of src without copying through user space; returns the method used"""
+    try:
+        os.link(src, dst)
+        return 'hardlink'
+    except OSError as e:
+        if e.errno not in _UNSUPPORTED:
+            raise
+    for method, func in (('reflink', _reflink), ('copy_file_range', _copy_range)):
+        try:
+            func(src, dst)
+        except (OSError, ImportError, AttributeError) as e:
+            if os.path.lexists(dst):
+                os.remove(dst)
+            if isinstance(e, OSError) and e.errno not in _UNSUPPORTED:
+                raise
+            continue
+        # Size and mtime are what later runs compare to find changed files
+        shutil.copystat(src, dst)
+        return method
+    raise OSError(errno.EXDEV, "no hard link, reflink or copy_file_range possible", str(src))
+
+
+def link_text(src, dst, mapping):
+    """The target for a mirrored symlink, following the rename when it points into the mirrored tree"""
+    text = os.readlink(src)
+    resolved = Path(os.path.normpath(os.path.join(os.path.dirname(src), text)))
+    mapped = mapping.get(resolved)
+    if mapped is None:
+        return text
+    return str(mapped) if os.path.isabs(text) else os.path.relpath(mapped, os.path.dirname(dst))
+
+
+def _up_to_date(src_st, dst_st, src, dst, text=None):
+    if text is not None:
+        return stat.S_ISLNK(dst_st.st_mode) and os.readlink(dst) == text
+    if not stat.S_ISREG(dst_st.st_mode):
+        return False
+    if (src_st.st_dev, src_st.st_ino) == (dst_st.st_dev, dst_st.st_ino):
+        return True
+    # A reflinked or copied file keeps the source's size and mtime
+    return src_st.st_size == dst_st.st_size and src_st.st_mtime_ns == dst_st.st_mtime_ns
+
+
+def plan_mirror(source, target, ignore_dirs=None, style='kebab', dir_configs=True):
+    """Map the source tree to cleaned target paths: ((src, dst) directories top-down, (src, dst) entries, collisions)"""
+    from archive import suffixed
+
+    source, target = Path(source), Path(target)
+    config = None
+    if dir_configs:
+        from dirconfig import DirConfig
+        config = DirConfig.root(None, style, ignore_dirs)
+    listings = {}
+    for current, files, dirs, dir_config in walk_tree(source, ignore_dirs, config=config):
+        listings[current] = (files, dirs, dir_config)
+
+    default_clean = compile_rules(None, style).clean
+    directories = [(source, target)]
+    entries = []
+    collisions = []
+    stack = [(source, target)]
+    while stack:
+        src_dir, dst_dir = stack.pop()
+        files, dirs, dir_config = listings[src_dir]
+        clean = dir_config.ruleset.clean if dir_config is not None else default_clean
+        used = set()
+        # Sorted, so which name of a colliding pair gets the suffix doesn't depend on listing order
+        for name in sorted(files + dirs):
+            new_name = clean(name) or name
+            number = 1
+            candidate = new_name
+            while candidate in used or candidate == MARKER:
+                candidate = suffixed(new_name, number, dir_config.style if dir_config is not None else style)
+                number += 1
+            used.add(candidate)
+            src, dst = src_dir / name, dst_dir / candidate
+            if candidate != new_name:
+                collisions.append((src, dst))
+            if src in listings:
+                directories.append((src, dst))
+                stack.append((src, dst))
+            elif name in dirs and not os.path.islink(src):
+                # A directory a config file told the walk to skip: mirrored under its original names
+                skipped_ignore = dir_config.ignore_dirs if dir_config is not None else ignore_dirs or ()
+                _plan_unrenamed(src, dst, skipped_ignore, directories, entries)
+            else:
+                # Files, symlinks (to files or directories) and special files
+                entries.append((src, dst))
+    return directories, entries, collisions
+
+
+def _plan_unrenamed(source, target, ignore_dirs, directories, entries):
+    """Add the subtree at source to the plan with every name kept, directories top-down"""
+    stack = [(source, target)]
+    while stack:
+        src_dir, dst_dir = stack.pop()
+        directories.append((src_dir, dst_dir))
+        try:
+            with os.scandir(src_dir) as it:
+                listing = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        for entry in listing:
+            src, dst = src_dir / entry.name, dst_dir / entry.name
+            if not entry.is_dir(follow_symlinks=False):
+                entries.append((src, dst))
+            elif entry.name not in ignore_dirs:
+                stack.append((src, dst))
+
+
+def scan_target(target):
+    """Existing entries below target as {path: lstat result}, directories included"""
+    existing = {}
+    stack = [target]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    st = entry.stat(follow_symlinks=False)
+                    existing[Path(entry.path)] = st
+                    if stat.S_ISDIR(st.st_mode):
+                        stack.append(entry.path)
+        except FileNotFoundError:
+            continue
+    return existing
+
+
+def _mirror_job(ops, existing, mapping, apply):
+    results = []
+    for src, dst in ops:
+        try:
+            src_st = os.lstat(src)
+            if not (stat.S_ISREG(src_st.st_mode) or stat.S_ISLNK(src_st.st_mode)):
+                results.append(('skipped', src, dst, None))
+                continue
+            text = link_text(src, dst, mapping) if stat.S_ISLNK(src_st.st_mode) else None
+            dst_st = existing.get(dst)
+            if dst_st is not None and _up_to_date(src_st, dst_st, src, dst, text):
+                results.append(('kept', src, dst, None))
+                continue
+            action = 'replaced' if dst_st is not None else 'created'
+            if not apply:
+                results.append((action, src, dst, None))
+                continue
+            if dst_st is not None:
+                if stat.S_ISDIR(dst_st.st_mode):
+                    shutil.rmtree(dst)
+                else:
+                    os.remove(dst)
+            if text is not None:
+                os.symlink(text, dst)
+                method = 'symlink'
+            else:
+                method = link_file(src, dst)
+            results.append((action, src, dst, method))
+        except OSError as e:
+            results.append(('error', src, dst, str(e)))
+    return results
+
+
+def _jobs(ops):
+    for start in range(0, len(ops), OPS_PER_JOB):
+        yield ops[start:start + OPS_PER_JOB]
+
+
+def mirror_tree(source, target, apply=False, ignore_dirs=None, style='kebab', workers=None, dir_configs=True,
+                on_op=None):
+    """Build (or bring up to date) a cleaned-name mirror of source at target; returns a summary"""
+    # on_op(action, path) is told about every change: mkdir, created, replaced, removed
+    source, target = Path(source), Path(target)
+    source_real, target_real = os.path.realpath(source), os.path.realpath(target)
+    if target_real == source_real or target_real.startswith(source_real.rstrip(os.sep) + os.sep):
+        raise ValueError("The mirror target must be outside the source folder")
+    if source_real.startswith(target_real.rstrip(os.sep) + os.sep):
+        raise ValueError("The mirror target must not contain the source folder")
+    if target.exists():
+        if not target.is_dir():
+            raise ValueError(f"Mirror target is not a directory: {target}")
+        if any(os.scandir(target)) and not (target / MARKER).exists():
+            raise ValueError(f"{target} is not empty and is not a mirror made by repo-namer, refusing to change it")
+
+    directories, entries, collisions = plan_mirror(source, target, ignore_dirs, style, dir_configs)
+    existing = scan_target(target) if target.exists() else {}
+    existing.pop(target / MARKER, None)
+    summary = Counter()
+    methods = Counter()
+    errors = []
+
+    def report(action, path):
+        summary[action] += 1
+        if on_op is not None:
+            on_op(action, path)
+
+    # Stale entries first, so their names are free; outermost first, rmtree takes the rest
+    mapping = dict(directories)
+    mapping.update(entries)
+    wanted = set(mapping.values())
+    removed = set()
+    for path in sorted(existing, key=lambda p: len(p.parts)):
+        if path in wanted or any(parent in removed for parent in path.parents):
+            continue
+        if apply:
+            try:
+                if stat.S_ISDIR(existing[path].st_mode):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+            except OSError as e:
+                errors.append((path, str(e)))
+                continue
+        removed.add(path)
+        report('removed', path)
+    if removed:
+        existing = {path: st for path, st in existing.items()
+                    if path not in removed and not any(parent in removed for parent in path.parents)}
+
+    for _, directory in directories:
+        st = existing.get(directory)
+        if st is not None and stat.S_ISDIR(st.st_mode):
+            continue
+        if directory == target and target.exists():
+            continue
+        if apply:
+            if st is not None:
+                os.remove(directory)
+            os.makedirs(directory) if directory == target else os.mkdir(directory)
+        report('mkdir', directory)
+    if apply:
+        (target / MARKER).touch()
+
+    if workers is None:
+        workers = default_workers()
+    jobs = list(_jobs(entries))
+    if workers == 1 or len(jobs) < 2:
+        batches = (_mirror_job(job, existing, mapping, apply) for job in jobs)
+        executor = None
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers)
+        batches = executor.map(_mirror_job, jobs, [existing] * len(jobs), [mapping] * len(jobs), [apply] * len(jobs))
+    try:
+        for batch in batches:
+            for action, src, dst, detail in batch:
+                if action == 'error':
+                    errors.append((src, detail))
+                    summary['error'] += 1
+                    continue
+                if detail is not None:
+                    methods[detail] += 1
+                if action in ('created', 'replaced'):
+                    report(action, dst)
+                else:
+                    summary[action] += 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return {
+        'directories': len(directories),
+        'files': len(entries),
+        'created': summary['created'],
+        'replaced': summary['replaced'],
+        'kept': summary['kept'],
+        'removed': summary['removed'],
+        'mkdir': summary['mkdir'],
+        'skipped': summary['skipped'],
+        'methods': dict(methods),
+        'collisions': collisions,
+        'errors': errors,
+    }
@@ -0,0 +1,92 @@
+from collections import defaultdict
+from cleaner import compile_rules, is_regex_rule
+from analyze_rules import may_reproduce
+
+
+class NameIndex:
+    """Inverted index from characters to names, for re-cleaning only what a rule edit can affect"""
+
+    def __init__(self, names, rules, style='kebab'):
+        self.names = sorted(set(names))
+        self.style = style
+        self.rules = dict(rules)
+        self.lowered = [name.lower() for name in self.names]
+        self.by_char = defaultdict(set)
+        for index, name in enumerate(self.lowered):
+            for char in set(name):
+                self.by_char[char].add(index)
+        clean = compile_rules(self.rules, style).clean
+        self.baseline = [clean(name) for name in self.names]
+        self.current = list(self.baseline)
+        self.changed = set()
+
+    def __len__(self):
+        return len(self.names)
+
+    def candidates(self, keyword):
+        """Ids of names whose lowercased form contains keyword"""
+        if not keyword or is_regex_rule(keyword):
+            # A pattern can match names without sharing any character with its source
+            return set(range(len(self.names)))
+        sets = sorted((self.by_char.get(char, set()) for char in set(keyword)), key=len)
+        ids = set(sets[0])
+        for other in sets[1:]:
+            ids &= other
+            if not ids:
+                return ids
+        return {index for index in ids if keyword in self.lowered[index]}
+
+    def changed_keywords(self, rules):
+        """Keywords that were added, removed, given a new replacement or moved"""
+        old, new = self.rules, rules
+        changed = {k for k in old.keys() ^ new.keys()}
+        changed |= {k for k in old.keys() & new.keys() if old[k] != new[k]}
+        old_order = [k for k in old if k in new]
+        new_order = [k for k in new if k in old]
+        for a, b in zip(old_order, new_order):
+            if a != b:
+                changed.update((a, b))
+        return changed
+
+    def affected(self, rules):
+        """Ids of names whose cleaned form may differ under rules"""
+        keywords = self.changed_keywords(rules)
+        if not keywords:
+            return set()
+        # Earlier rules can produce a changed keyword from text that did not contain it
+        everything = list(self.rules.items()) + list(rules.items())
+        pending = list(keywords)
+        while pending:
+            keyword = pending.pop()
+            for other, replacement in everything:
+                if other not in keywords and may_reproduce(replacement, keyword):
+                    keywords.add(other)
+                    pending.append(other)
+        ids = set()
+        for keyword in keywords:
+            ids |= self.candidates(keyword)
+            if len(ids) == len(self.names):
+                break
+        return ids
+
+    def update_rules(self, rules):
+        """Re-clean only the names the edit can affect; returns how many were re-cleaned"""
+        rules = dict(rules)
+        ids = self.affected(rules)
+        clean = compile_rules(rules, self.style).clean
+        for index in ids:
+            cleaned = clean(self.names[index])
+            self.current[index] = cleaned
+            if cleaned != self.baseline[index]:
+                self.changed.add(index)
+            else:
+                self.changed.discard(index)
+        self.rules = rules
+        return len(ids)
+
+    def changed_names(self, limit=None):
+        """(name, cleaned before the edit, cleaned now) for names the edit changes"""
+        ids = sorted(self.changed)
+        if limit is not None:
+            ids = ids[:limit]
+        return [(self.names[i], self.baseline[i], self.current[i]) for i in ids]
@@ -1,90 +1,781 @@
 import sys
 import os
-import argparse
-import subprocess
-from cleaner import clean_name
+import time
+from cleaner import compile_rules
 from pathlib import Path
 
-def rename_recursive(folder_path: Path, apply=False, ignore_dirs=None, use_git=False, style='kebab'):
-    if ignore_dirs is None:
-        ignore_dirs = {'.git', 'node_modules', '.venv'}
-    rename_log = []
+DEFAULT_IGNORE_DIRS = {'.git', 'node_modules', '.venv'}
+
+SYMLINK_POLICIES = ('skip', 'once', 'follow')
+
+def _inside(path, root):
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+def mount_entries(path):
+    """Estimate the entries on the filesystem mounted at path from its used inodes, or None"""
+    try:
+        st = os.statvfs(path)
+    except (OSError, AttributeError):
+        return None
+    # FUSE and some network filesystems report no inode counts
+    return st.f_files - st.f_ffree if st.f_files else None
 
-    for root, dirs, files in os.walk(folder_path, topdown=False):
-        # Filter ignored directories
-        dirs[:] = [d for d in dirs if d not in ignore_dirs]
-        
-        # Skip files in ignored directories
-        current_path = Path(root)
-        if any(ignored in current_path.parts for ignored in ignore_dirs):
+def walk_tree(folder_path, ignore_dirs=None, symlinks='skip', cancelled=None,
+              one_file_system=False, include_mounts=None, on_skip_mount=None, config=None, stats=None,
+              on_error=None, scandir=None):
+    """Yield (directory, files, dirs, config) bottom-up, scanning each physical directory once"""
+    # symlinks: 'skip' never descends symlinked directories, 'once' follows links found
+    # outside followed links, 'follow' follows links at any depth. Links back into the
+    # tree are never followed: their target is scanned under its real path instead.
+    # one_file_system prunes directories on another device than their parent, unless
+    # their real path is in include_mounts; on_skip_mount(path) is told about each one.
+    # With a root dirconfig.DirConfig, config files met on the way are merged into it.
+    # Unreadable directories, and directories gone before they could be stat'ed, are counted
+    # in stats['errors'] when a stats Counter is given, and reported to on_error(path, None, error). scandir(path), when given, returns the
+    # DirEntry list of one directory in place of os.scandir, e.g. from a cache
+    if config is not None:
+        ignore_dirs = config.ignore_dirs
+    elif ignore_dirs is None:
+        ignore_dirs = DEFAULT_IGNORE_DIRS
+    if symlinks not in SYMLINK_POLICIES:
+        raise ValueError(f"unknown symlink policy: {symlinks}")
+    folder_path = Path(folder_path)
+    if any(ignored in folder_path.parts for ignored in ignore_dirs):
+        return
+    try:
+        st = os.stat(folder_path)
+    except OSError:
+        return
+    root_real = os.path.realpath(folder_path)
+    include_mounts = {os.path.realpath(path) for path in include_mounts or ()}
+    # Directories whose contents were scanned, and real directory entries already named
+    scanned = {(st.st_dev, st.st_ino)}
+    named = set(scanned)
+
+    def crosses(entry):
+        # Only called for directories on another device than the one being listed
+        if os.path.realpath(entry.path) in include_mounts:
+            return False
+        if on_skip_mount is not None:
+            on_skip_mount(Path(entry.path))
+        return True
+
+    # (path, link_depth, device, config, listing); listing is None until the directory has been listed
+    stack = [(folder_path, 0, st.st_dev, config, None)]
+    while stack:
+        current, link_depth, dev, config, listing = stack.pop()
+        if listing is not None:
+            yield current, listing[0], listing[1], config
+            continue
+        if cancelled is not None and cancelled():
+            return
+        files, dirs, children = [], [], []
+        try:
+            if scandir is None:
+                with os.scandir(current) as it:
+                    entries = list(it)
+            else:
+                entries = scandir(current)
+        except OSError as e:
+            # Unreadable directories are skipped, like os.walk does
+            if stats is not None:
+                stats['errors'] += 1
+            if on_error is not None:
+                on_error(current, None, e)
             continue
-            
-        # Rename files
-        for name in files:
-            old_path = Path(root) / name
-            new_name = clean_name(name, style)
-            new_path = Path(root) / new_name
-            if old_path != new_path:
-                rename_log.append((old_path, new_path))
-                if apply:
-                    if use_git:
-                        subprocess.run(['git', 'mv', str(old_path), str(new_path)], check=True)
-                    else:
-                        os.rename(old_path, new_path)
-
-        # Rename directories
-        for name in dirs:
-            old_path = Path(root) / name
-            new_name = clean_name(name, style)
-            new_path = Path(root) / new_name
-            if old_path != new_path:
-                rename_log.append((old_path, new_path))
-                if apply:
-                    if use_git:
-                        subprocess.run(['git', 'mv', str(old_path), str(new_path)], check=True)
-                    else:
-                        os.rename(old_path, new_path)
+        if config is not None:
+            from dirconfig import CONFIG_NAME
+            if any(entry.name == CONFIG_NAME for entry in entries):
+                config = config.child(os.path.join(current, CONFIG_NAME))
+                if config.skip:
+                    continue
+            ignore_dirs = config.ignore_dirs
+        for entry in entries:
+            try:
+                is_link = entry.is_symlink()
+                is_dir = entry.is_dir()
+            except OSError:
+                is_link, is_dir = False, False
+            if not is_dir:
+                files.append(entry.name)
+                continue
+            if entry.name in ignore_dirs:
+                continue
+            if is_link:
+                # The link is its own entry and always gets renamed
+                dirs.append(entry.name)
+                if symlinks == 'skip' or (symlinks == 'once' and link_depth):
+                    continue
+                try:
+                    target = entry.stat()
+                except OSError:
+                    continue
+                key = (target.st_dev, target.st_ino)
+                if key in scanned or _inside(os.path.realpath(entry.path), root_real):
+                    continue
+                if one_file_system and target.st_dev != dev and crosses(entry):
+                    continue
+                scanned.add(key)
+                children.append((current / entry.name, link_depth + 1, target.st_dev))
+                continue
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError as e:
+                # Removed or replaced since the listing: nothing left to name or scan
+                if stats is not None:
+                    stats['errors'] += 1
+                if on_error is not None:
+                    on_error(current / entry.name, None, e)
+                continue
+            key = (st.st_dev, st.st_ino)
+            if key in named:
+                # The same directory reached again, e.g. through a bind mount
+                continue
+            # A mount point can't be renamed; its contents are only scanned when allowlisted
+            mount_point = one_file_system and st.st_dev != dev
+            if mount_point and crosses(entry):
+                continue
+            named.add(key)
+            if not mount_point:
+                dirs.append(entry.name)
+            if key not in scanned:
+                scanned.add(key)
+                children.append((current / entry.name, link_depth, st.st_dev))
+        # Files first, then directories, once everything below has been yielded
+        stack.append((current, link_depth, dev, config, (files, dirs)))
+        stack.extend((path, depth, device, config, None) for path, depth, device in reversed(children))
+
+def iter_renames(folder_path: Path, ignore_dirs=None, style='kebab', progress=None, cancelled=None, git_index=False,
+                 symlinks='skip', one_file_system=False, include_mounts=None, on_skip_mount=None, dir_configs=True,
+                 stats=None, hooks=None):
+    """Yield (old_path, new_path) pairs bottom-up, so entries can be renamed as they come"""
+    # stats, a collections.Counter, gets directories, entries, errors and planned_file/planned_directory.
+    # hooks, a hooks.Hooks, gets on_directory_scanned, on_planned and on_error for unreadable directories
+    if hooks is not None and not hooks.active():
+        hooks = None
+    if git_index:
+        # Plan from the tracked paths instead of walking the working tree
+        from git_index import iter_index_renames
+        changes = iter_index_renames(folder_path, ignore_dirs, style, progress, cancelled, stats, dir_configs)
+        if hooks is None:
+            yield from changes
+            return
+        for change in changes:
+            hooks.emit('on_planned', change)
+            hooks.tick()
+            yield change
+        hooks.flush()
+        return
+    scanned = 0
+    config = None
+    if dir_configs:
+        # Each subtree is cleaned with the rules and style of its nearest config files
+        from dirconfig import DirConfig
+        config = DirConfig.root(None, style, ignore_dirs)
+    clean = compile_rules(None, style).clean
+
+    for current_path, files, dirs, dir_config in walk_tree(folder_path, ignore_dirs, symlinks, cancelled,
+                                                           one_file_system, include_mounts, on_skip_mount, config,
+                                                           stats, hooks.error if hooks is not None else None):
+        scanned += 1
+        if progress is not None:
+            progress(scanned)
+        if stats is not None:
+            stats['directories'] += 1
+            stats['entries'] += len(files) + len(dirs)
+        if hooks is not None:
+            hooks.emit('on_directory_scanned', (current_path, len(files) + len(dirs)))
+            hooks.tick()
+        if dir_config is not None:
+            clean = dir_config.ruleset.clean
+        for names, kind in ((files, 'planned_file'), (dirs, 'planned_directory')):
+            for name in names:
+                new_name = clean(name)
+                if new_name != name:
+                    if stats is not None:
+                        stats[kind] += 1
+                    if hooks is not None:
+                        hooks.emit('on_planned', (current_path / name, current_path / new_name))
+                    yield current_path / name, current_path / new_name
+    if hooks is not None:
+        hooks.flush()
+
+def iter_variant_renames(folder_path: Path, variants, ignore_dirs=None, progress=None, cancelled=None,
+                         symlinks='skip', one_file_system=False, include_mounts=None, on_skip_mount=None,
+                         dir_configs=True, hooks=None):
+    """Plan several (rules, style) variants in one walk, yielding (variant index, old_path, new_path)"""
+    # Every directory is listed once and its names are cleaned once per variant; rules None
+    # means the global rules. Config files below the root are merged into every variant.
+    # hooks get on_directory_scanned, and the first variant's renames as on_planned
+    variants = list(variants)
+    if hooks is not None and not hooks.active():
+        hooks = None
+    config = None
+    cleaners = [compile_rules(rules, style).clean for rules, style in variants]
+    if dir_configs:
+        from dirconfig import DirConfig, ConfigSet
+        config = ConfigSet(DirConfig.root(rules, style, ignore_dirs) for rules, style in variants)
+    scanned = 0
+
+    for current_path, files, dirs, dir_config in walk_tree(folder_path, ignore_dirs, symlinks, cancelled,
+                                                           one_file_system, include_mounts, on_skip_mount, config,
+                                                           None, hooks.error if hooks is not None else None):
+        scanned += 1
+        if progress is not None:
+            progress(scanned)
+        names = files + dirs
+        if hooks is not None:
+            hooks.emit('on_directory_scanned', (current_path, len(names)))
+            hooks.tick()
+        if dir_config is not None:
+            cleaners = [variant_config.ruleset.clean for variant_config in dir_config.configs]
+        for variant, clean in enumerate(cleaners):
+            for name in names:
+                new_name = clean(name)
+                if new_name != name:
+                    if hooks is not None and variant == 0:
+                        hooks.emit('on_planned', (current_path / name, current_path / new_name))
+                    yield variant, current_path / name, current_path / new_name
+    if hooks is not None:
+        hooks.flush()
+
+def plan_variants(folder_path: Path, variants, ignore_dirs=None, progress=None, cancelled=None, symlinks='skip',
+                  one_file_system=False, include_mounts=None, on_skip_mount=None, dir_configs=True, hooks=None):
+    """Plan several (rules, style) variants in one walk; returns one list of (old, new) pairs per variant"""
+    variants = list(variants)
+    plans = [[] for _ in variants]
+    for variant, old_path, new_path in iter_variant_renames(folder_path, variants, ignore_dirs, progress, cancelled,
+                                                            symlinks, one_file_system, include_mounts,
+                                                            on_skip_mount, dir_configs, hooks):
+        plans[variant].append((old_path, new_path))
+    return plans
+
+def plan_directory(dir_path: Path, ignore_dirs=None, style='kebab', config=None):
+    """Plan renames for the entries directly inside dir_path, without descending"""
+    # config is the DirConfig inherited from above dir_path (the root config when None); returns
+    # (subdirs, renames, config) where config, with dir_path's own config file merged in, is
+    # the one to pass down when planning the subdirs
+    from dirconfig import CONFIG_NAME, DirConfig
+    if config is None:
+        config = DirConfig.root(None, style, ignore_dirs)
+    subdirs = []
+    renames = []
+    with os.scandir(dir_path) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+    if any(entry.name == CONFIG_NAME for entry in entries):
+        config = config.child(dir_path / CONFIG_NAME)
+    if config.skip:
+        return subdirs, renames, config
+    clean = config.ruleset.clean
+    for entry in entries:
+        # Symlinked directories are renamed but never descended, like os.walk
+        is_dir = entry.is_dir(follow_symlinks=False)
+        if is_dir:
+            if entry.name in config.ignore_dirs:
+                continue
+            subdirs.append(entry.name)
+        new_name = clean(entry.name)
+        if new_name != entry.name:
+            renames.append((dir_path / entry.name, dir_path / new_name))
+    return subdirs, renames, config
+
+def apply_rename(old_path: Path, new_path: Path, use_git=False):
+    if use_git:
+        import subprocess
+        subprocess.run(['git', 'mv', str(old_path), str(new_path)], check=True)
+    else:
+        os.rename(old_path, new_path)
+
+def apply_change(old_path: Path, new_path: Path, use_git=False, limiter=None, stats=None):
+    """apply_rename under an optional rate limiter, counting applied_file/applied_directory and apply_seconds"""
+    if stats is None:
+        if limiter is not None:
+            limiter.run(apply_rename, old_path, new_path, use_git)
+        else:
+            apply_rename(old_path, new_path, use_git)
+        return
+    start = time.perf_counter()
+    try:
+        if limiter is not None:
+            limiter.run(apply_rename, old_path, new_path, use_git)
+        else:
+            apply_rename(old_path, new_path, use_git)
+    except Exception:
+        stats['errors'] += 1
+        raise
+    finally:
+        stats['apply_seconds'] += time.perf_counter() - start
+    stats['applied_directory' if os.path.isdir(new_path) else 'applied_file'] += 1
+
+def apply_hooked(old_path: Path, new_path: Path, use_git=False, limiter=None, stats=None, hooks=None):
+    """apply_change with the before_rename, after_rename and on_error hooks; False if vetoed or skipped"""
+    if not hooks.before_rename(old_path, new_path):
+        return False
+    try:
+        apply_change(old_path, new_path, use_git, limiter, stats)
+    except Exception as e:
+        if not hooks.error(old_path, new_path, e):
+            raise
+        return False
+    hooks.emit('after_rename', (old_path, new_path))
+    hooks.tick()
+    return True
+
+def apply_plan(changes, use_git=False, limiter=None, stats=None, hooks=None, cancelled=None):
+    """Apply planned renames in order; returns the ones applied"""
+    if hooks is not None and not hooks.active():
+        hooks = None
+    applied = []
+    try:
+        for old_path, new_path in changes:
+            if cancelled is not None and cancelled():
+                break
+            if hooks is None:
+                apply_change(old_path, new_path, use_git, limiter, stats)
+            elif not apply_hooked(old_path, new_path, use_git, limiter, stats, hooks):
+                continue
+            applied.append((old_path, new_path))
+    finally:
+        if hooks is not None:
+            hooks.flush()
+    return applied
+
+def rename_recursive(folder_path: Path, apply=False, ignore_dirs=None, use_git=False, style='kebab', git_index=False,
+                     limiter=None, symlinks='skip', one_file_system=False, include_mounts=None, on_skip_mount=None,
+                     dir_configs=True, stats=None, hooks=None):
+    rename_log = []
+    if hooks is not None and not hooks.active():
+        # Nothing registered: take the same path as without hooks
+        hooks = None
+
+    try:
+        for old_path, new_path in iter_renames(folder_path, ignore_dirs, style, git_index=git_index,
+                                               symlinks=symlinks, one_file_system=one_file_system,
+                                               include_mounts=include_mounts, on_skip_mount=on_skip_mount,
+                                               dir_configs=dir_configs, stats=stats, hooks=hooks):
+            if apply:
+                if hooks is None:
+                    apply_change(old_path, new_path, use_git, limiter, stats)
+                elif not apply_hooked(old_path, new_path, use_git, limiter, stats, hooks):
+                    # Vetoed or skipped after an error: not part of the log
+                    continue
+            rename_log.append((old_path, new_path))
+    finally:
+        if hooks is not None:
+            hooks.flush()
 
     return rename_log
 
-if __name__ == "__main__":
+def run_batch_cli(args, ignore_dirs):
+    from batch import read_manifest, run_batch
+    import json
+
+    roots = list(args.folder)
+    if args.manifest:
+        roots.extend(read_manifest(args.manifest))
+    if args.workers is not None and args.workers < 1:
+        print("❌ --workers must be at least 1")
+        sys.exit(1)
+
+    def on_result(summary):
+        if summary['status'] == 'ok':
+            print(f"  ✅ {summary['root']}: {summary['renamed']} items ({summary['seconds']}s)")
+        else:
+            print(f"  ❌ {summary['root']}: {summary['error']}")
+        for mount in summary.get('skipped_mounts', []):
+            print(f"    ⛔ Skipped mount point: {format_mount(mount['path'], mount['entries'])}")
+
+    print(f"📦 Processing {len(roots)} folders:")
+    report = run_batch(roots, workers=args.workers, apply=args.apply, ignore_dirs=ignore_dirs,
+                       use_git=args.git, style=args.style, git_index=args.git_index,
+                       max_ops=args.max_ops_per_sec, adaptive=args.adaptive, symlinks=args.symlinks,
+                       one_file_system=args.one_file_system, include_mounts=args.include_mount,
+                       dir_configs=not args.no_dir_config, on_result=on_result)
+    print(f"\n📝 {report['renamed']} items in {report['roots']} folders, "
+          f"{report['failed']} failed, {report['seconds']}s with {report['workers']} workers")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"📝 Report written to {args.report}")
+
+    if not args.apply:
+        print("\n⚠️ No changes applied (use --apply to execute renaming)")
+    if report['failed']:
+        sys.exit(1)
+
+def batch_unsupported(args):
+    """The options in args that batch mode can't honour"""
+    # --mirror and --estimate must never fall through to the batch renamer, which renames in
+    # place; the others are only wired into single-folder runs and would be silently dropped
+    options = (('--mirror', args.mirror), ('--estimate', args.estimate), ('--rewrite-refs', args.rewrite_refs),
+               ('--sort-buffer', args.sort_buffer is not None), ('--max-memory', args.max_memory is not None),
+               ('--memory-profile', args.memory_profile), ('--metrics-file', args.metrics_file))
+    return [flag for flag, used in options if used]
+
+def format_mount(path, entries):
+    return f"{path} (~{entries:,} entries)" if entries is not None else f"{path} (size unknown)"
+
+def print_skipped_mounts(skipped):
+    if not skipped:
+        return
+    print("⛔ Skipped mount points (--one-file-system):")
+    for path, entries in skipped:
+        print(f"  {format_mount(path, entries)}")
+    known = [entries for _, entries in skipped if entries is not None]
+    if known:
+        print(f"⛔ About {sum(known):,} entries not scanned")
+
+def phase(metrics, name, profiler=None):
+    """metrics.phase(name) and profiler.phase(name), whichever are collected"""
+    from contextlib import ExitStack
+
+    stack = ExitStack()
+    # Profiler outermost, so its snapshots don't count towards the timed phase
+    if profiler is not None:
+        stack.enter_context(profiler.phase(name))
+    if metrics is not None:
+        stack.enter_context(metrics.phase(name))
+    return stack
+
+def run_sorted_cli(folder, args, ignore_dirs, limiter=None, on_skip_mount=None, metrics=None, profiler=None,
+                   hooks=None):
+    """Plan into an external sorter, then apply and report from the merged runs"""
+    from extsort import ExternalSorter
+
+    stats = metrics.stats if metrics is not None else None
+    with ExternalSorter(args.sort_buffer) as sorter:
+        with phase(metrics, 'scan', profiler):
+            sorter.extend(iter_renames(folder, ignore_dirs, args.style, git_index=args.git_index,
+                                       symlinks=args.symlinks, one_file_system=args.one_file_system,
+                                       include_mounts=args.include_mount, on_skip_mount=on_skip_mount,
+                                       dir_configs=not args.no_dir_config, stats=stats, hooks=hooks))
+        if not sorter.count:
+            print("✅ No files or folders need to be renamed.")
+            return
+        if sorter.spilled:
+            print(f"💾 Plan of {sorter.count} items sorted in {sorter.spilled} runs on disk")
+        print("📝 The following items will be renamed (old → new):")
+        report = open(args.report, "w", encoding="utf-8") if args.report else None
+        try:
+            # Deepest entries come first, so each rename can be applied as it is listed
+            with phase(metrics, 'report', profiler):
+                for old, new in sorter:
+                    print(f"  {old} → {new}")
+                    if report is not None:
+                        report.write(f"{old} → {new}\n")
+                    if args.apply:
+                        apply_change(old, new, args.git, limiter, stats)
+        finally:
+            if report is not None:
+                report.close()
+        if args.report:
+            if metrics is not None:
+                metrics.report_bytes = os.path.getsize(args.report)
+            print(f"\n📝 Report written to {args.report}")
+
+        if args.rewrite_refs:
+            with phase(metrics, 'rewrite_refs', profiler):
+                rewrite_refs_cli(folder, sorter, args, ignore_dirs)
+
+    if args.apply:
+        print("\n✅ All changes have been applied!")
+    else:
+        print("\n⚠️ No changes applied (use --apply to execute renaming)")
+
+def run_folder_cli(folder, args, ignore_dirs, limiter=None, on_skip_mount=None, metrics=None, profiler=None,
+                   hooks=None):
+    """Plan, list, report and apply the renames for one folder"""
+    if args.sort_buffer is not None:
+        run_sorted_cli(folder, args, ignore_dirs, limiter, on_skip_mount, metrics, profiler, hooks)
+        return
+
+    stats = metrics.stats if metrics is not None else None
+    with phase(metrics, 'scan', profiler):
+        changes = rename_recursive(folder, apply=args.apply, ignore_dirs=ignore_dirs, use_git=args.git,
+                                   style=args.style, git_index=args.git_index, limiter=limiter,
+                                   symlinks=args.symlinks, one_file_system=args.one_file_system,
+                                   include_mounts=args.include_mount, on_skip_mount=on_skip_mount,
+                                   dir_configs=not args.no_dir_config, stats=stats, hooks=hooks)
+
+    if not changes:
+        print("✅ No files or folders need to be renamed.")
+        return
+    print("📝 The following items will be renamed (old → new):")
+    for old, new in changes:
+        print(f"  {old} → {new}")
+
+    # Output report
+    if args.report:
+        with phase(metrics, 'report', profiler):
+            with open(args.report, "w", encoding="utf-8") as f:
+                for old, new in changes:
+                    f.write(f"{old} → {new}\n")
+        if metrics is not None:
+            metrics.report_bytes = os.path.getsize(args.report)
+        print(f"\n📝 Report written to {args.report}")
+
+    if args.rewrite_refs:
+        with phase(metrics, 'rewrite_refs', profiler):
+            rewrite_refs_cli(folder, changes, args, ignore_dirs)
+
+    if args.apply:
+        print("\n✅ All changes have been applied!")
+    else:
+        print("\n⚠️ No changes applied (use --apply to execute renaming)")
+
+def format_duration(seconds):
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.1f} min"
+    return f"{seconds / 3600:.1f} h"
+
+def run_estimate_cli(folder, args, ignore_dirs):
+    """Estimate the rename volume and run time from a random sample of directories"""
+    from estimate import estimate_tree, DEFAULT_BUDGET
+
+    budget = args.sample_dirs or DEFAULT_BUDGET
+    print(f"🎲 Sampling up to {budget} directories (nothing is renamed)...")
+    result = estimate_tree(folder, ignore_dirs, args.style, budget, latency_dir=args.latency_probe)
+    estimates = result['estimates']
+    if result['exact']:
+        print(f"📊 The whole tree was listed ({result['listed']} directories), counts are exact:")
+    else:
+        print(f"📊 Estimate from {result['probes']} probes over {result['listed']} directories (95% confidence):")
+    for metric, label in (('directories', 'Directories'), ('entries', 'Entries'),
+                          ('renames', 'Renames'), ('collisions', 'Name collisions')):
+        mean, low, high = estimates[metric]
+        if result['exact']:
+            print(f"  {label}: {mean:,.0f}")
+        else:
+            print(f"  {label}: ~{mean:,.0f} ({low:,.0f} – {high:,.0f})")
+
+    mean, low, high = result['scan_seconds']
+    print(f"⏱️ Scan: ~{format_duration(mean)} ({format_duration(low)} – {format_duration(high)}), "
+          f"{result['seconds_per_listing'] * 1000:.2f} ms per directory")
+    if args.latency_probe is None:
+        print("⚠️ Apply time not projected: add --latency-probe DIR to time test renames in a scratch directory there")
+        return
+    if result['apply_seconds'] is None:
+        print(f"⚠️ Apply time unknown: could not time test renames in {args.latency_probe}")
+        return
+    apply_seconds = result['apply_seconds']
+    if args.max_ops_per_sec:
+        # Throttled runs can't go faster than the limit
+        apply_seconds = tuple(max(seconds, count / args.max_ops_per_sec)
+                              for seconds, count in zip(apply_seconds, estimates['renames']))
+    mean, low, high = apply_seconds
+    print(f"⏱️ Apply: ~{format_duration(mean)} ({format_duration(low)} – {format_duration(high)}), "
+          f"{result['rename_latency'] * 1000:.2f} ms per rename measured with os.rename")
+    print(f"🧪 Wrote to disk: test renames in a scratch directory under {args.latency_probe}, removed afterwards")
+    if args.git:
+        print("⚠️ git mv is much slower than os.rename, expect a longer apply with --git")
+
+def run_mirror_cli(folder, args, ignore_dirs):
+    """Build or update a cleaned-name mirror of folder at --mirror, leaving folder untouched"""
+    from mirror import mirror_tree
+
+    report = open(args.report, "w", encoding="utf-8") if args.report else None
+
+    def on_op(action, path):
+        report.write(f"{action}: {path}\n")
+
+    print(f"🪞 {'Mirroring' if args.apply else 'Planning mirror of'} {folder} → {args.mirror}")
+    try:
+        summary = mirror_tree(folder, args.mirror, apply=args.apply, ignore_dirs=ignore_dirs, style=args.style,
+                              workers=args.workers, dir_configs=not args.no_dir_config,
+                              on_op=on_op if report is not None else None)
+    finally:
+        if report is not None:
+            report.close()
+
+    print(f"📊 {summary['directories']} directories, {summary['files']} files: "
+          f"{summary['created']} new, {summary['replaced']} changed, {summary['kept']} unchanged, "
+          f"{summary['removed']} removed, {summary['mkdir']} directories created")
+    if summary['methods']:
+        print("🔗 " + ", ".join(f"{count} {method}" for method, count in sorted(summary['methods'].items())))
+    if summary['skipped']:
+        print(f"⏭️ Skipped {summary['skipped']} special files (sockets, FIFOs, devices)")
+    for src, dst in summary['collisions']:
+        print(f"⚠️ Name collision: {src} → {dst}")
+    if args.report:
+        print(f"📝 Report written to {args.report}")
+    for path, error in summary['errors']:
+        print(f"❌ {path}: {error}")
+    if not args.apply:
+        print("\n⚠️ No changes applied (use --apply to build the mirror)")
+    if summary['errors']:
+        sys.exit(1)
+
+def rewrite_refs_cli(folder, changes, args, ignore_dirs):
+    from rewrite_refs import rewrite_references
+
+    def on_result(result):
+        path, count, diff = result
+        if args.apply:
+            print(f"  {path}: {count} references")
+        else:
+            print(diff, end='' if diff.endswith('\n') else '\n')
+
+    def on_ambiguous(old_name, new_names):
+        print(f"⚠️ Not rewriting references to {old_name}: renamed to {', '.join(new_names)} in different folders")
+
+    print("\n🔗 Rewriting references to renamed paths:" if args.apply else "\n🔗 References that will be rewritten:")
+    # Without --git the index still lists the old paths after --apply
+    results = rewrite_references(folder, changes, apply=args.apply, ignore_dirs=ignore_dirs,
+                                 workers=args.workers, git_index=args.git_index, on_result=on_result,
+                                 applied=args.apply and not args.git, on_ambiguous=on_ambiguous)
+    print(f"🔗 {sum(count for _, count, _ in results)} references in {len(results)} files")
+
+def main():
+    # Imported here so code that imports rename as a library doesn't pay for argparse
+    import argparse
+
     parser = argparse.ArgumentParser(description="Clean and normalize folder/file names.")
-    parser.add_argument("folder", help="Path to the folder you want to clean.")
+    parser.add_argument("folder", nargs="*", help="Path to the folder you want to clean (several folders run in batch mode).")
+    parser.add_argument("--manifest", help="File listing folders to clean, one per line (batch mode)")
+    parser.add_argument("--workers", type=int, help="Worker processes for batch mode (default: CPU count), threads for --mirror (default: 4 per CPU, at most 32)")
     parser.add_argument("--apply", action="store_true", help="Apply changes (default is dry-run).")
     parser.add_argument("--ignore", help="Comma-separated list of directories to ignore (default: .git,node_modules,.venv)")
     parser.add_argument("--report", help="Output report file (optional)")
     parser.add_argument("--git", action="store_true", help="Use git mv instead of os.rename (for git repositories)")
     parser.add_argument("--style", choices=['kebab', 'snake', 'lower-camel', 'upper-camel'], default='kebab', help="Naming style (default: kebab)")
+    parser.add_argument("--git-index", action="store_true", help="Plan from the files tracked by git instead of walking the folder")
+    parser.add_argument("--rewrite-refs", action="store_true", help="Also rewrite references to renamed paths inside text files")
+    parser.add_argument("--sort-buffer", type=float, metavar="MB", help="Sort the plan deepest-first on disk, keeping at most MB in memory")
+    parser.add_argument("--symlinks", choices=SYMLINK_POLICIES, default='skip', help="Symlinked directories: skip them, follow them once (no links inside links), or follow all (default: skip)")
+    parser.add_argument("--one-file-system", action="store_true", help="Don't descend into directories on other filesystems (mount points)")
+    parser.add_argument("--include-mount", action="append", metavar="PATH", help="Mount point to descend into anyway with --one-file-system (repeatable)")
+    parser.add_argument("--no-dir-config", action="store_true", help="Ignore .reponamer.json files in subdirectories")
+    parser.add_argument("--max-ops-per-sec", type=float, help="Limit renames per second when applying (shared filesystems)")
+    parser.add_argument("--adaptive", action="store_true", help="Back off automatically when rename latency rises (up to --max-ops-per-sec)")
+    parser.add_argument("--estimate", action="store_true", help="Estimate entries, renames, collisions and run time from a random sample of directories, without renaming")
+    parser.add_argument("--sample-dirs", type=int, metavar="N", help="Directories listed by --estimate (default: 2000)")
+    parser.add_argument("--latency-probe", metavar="DIR", help="Let --estimate time test renames in a scratch directory under DIR to project the apply time (ideally on the folder's filesystem)")
+    parser.add_argument("--mirror", metavar="TARGET", help="Build the cleaned tree at TARGET from hard links (or reflinks), leaving the folder untouched; re-runs only change what changed")
+    parser.add_argument("--max-memory", type=float, metavar="MB", help="Memory budget: spill the plan to disk to stay within it, and stop the run if it is passed anyway")
+    parser.add_argument("--memory-action", choices=['spill', 'fail'], default='spill', help="With --max-memory: sort the plan on disk within the budget and stop if it is still passed (spill), or keep the plan in memory and only stop (fail) (default: spill)")
+    parser.add_argument("--memory-profile", action="store_true", help="Trace allocations and print memory per phase, top allocation sites and peak RSS (slower)")
+    parser.add_argument("--metrics-file", metavar="PATH", help="Write Prometheus text-format metrics to PATH (e.g. for the node exporter textfile collector)")
+    parser.add_argument("--metrics-interval", type=float, default=15.0, metavar="SECONDS", help="Rewrite the metrics file this often during the run, 0 to write only at start and end (default: 15)")
     args = parser.parse_args()
 
-    folder = Path(args.folder)
-    if not folder.exists():
-        print(f"❌ Folder does not exist: {folder}")
-        sys.exit(1)
-
     # Handle ignored directories
     ignore_dirs = None
     if args.ignore:
         ignore_dirs = set(args.ignore.split(','))
         print(f"📁 Ignored directories: {', '.join(ignore_dirs)}")
 
-    changes = rename_recursive(folder, apply=args.apply, ignore_dirs=ignore_dirs, use_git=args.git, style=args.style)
+    if args.max_ops_per_sec is not None and args.max_ops_per_sec <= 0:
+        print("❌ --max-ops-per-sec must be greater than 0")
+        sys.exit(1)
 
-    if not changes:
-        print("✅ No files or folders need to be renamed.")
-    else:
-        print("📝 The following items will be renamed (old → new):")
-        for old, new in changes:
-            print(f"  {old} → {new}")
+    if args.manifest or len(args.folder) > 1:
+        unsupported = batch_unsupported(args)
+        if unsupported:
+            print(f"❌ {', '.join(unsupported)} can't be used with several folders or --manifest, "
+                  "run one folder at a time")
+            sys.exit(1)
+        run_batch_cli(args, ignore_dirs)
+        return
+    if not args.folder:
+        parser.error("a folder (or --manifest) is required")
 
-        # Output report
-        if args.report:
-            with open(args.report, "w", encoding="utf-8") as f:
-                for old, new in changes:
-                    f.write(f"{old} → {new}\n")
-            print(f"\n📝 Report written to {args.report}")
+    folder = Path(args.folder[0])
+    if not folder.exists():
+        print(f"❌ Folder does not exist: {folder}")
+        sys.exit(1)
 
-        if args.apply:
-            print("\n✅ All changes have been applied!")
-        else:
-            print("\n⚠️ No changes applied (use --apply to execute renaming)")
+    if args.estimate:
+        if args.sample_dirs is not None and args.sample_dirs < 1:
+            print("❌ --sample-dirs must be at least 1")
+            sys.exit(1)
+        if args.latency_probe is not None and not os.path.isdir(args.latency_probe):
+            print(f"❌ --latency-probe directory does not exist: {args.latency_probe}")
+            sys.exit(1)
+        run_estimate_cli(folder, args, ignore_dirs)
+        return
+    if args.mirror:
+        if args.workers is not None and args.workers < 1:
+            print("❌ --workers must be at least 1")
+            sys.exit(1)
+        try:
+            run_mirror_cli(folder, args, ignore_dirs)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        return
+
+    if args.sort_buffer is not None and args.sort_buffer <= 0:
+        print("❌ --sort-buffer must be greater than 0")
+        sys.exit(1)
+    if args.metrics_interval < 0:
+        print("❌ --metrics-interval must not be negative")
+        sys.exit(1)
+    if args.max_memory is not None and args.max_memory <= 0:
+        print("❌ --max-memory must be greater than 0")
+        sys.exit(1)
+
+    budget = None
+    hooks = None
+    if args.max_memory:
+        from memprof import MemoryBudget, SPILL_SHARE
+        from hooks import Hooks
+        budget = MemoryBudget(int(args.max_memory * 1024 * 1024))
+        hooks = budget.watch(Hooks())
+        if args.memory_action == 'spill':
+            # Only the plan grows with the tree, so it gets a fixed share of the budget on disk
+            share = args.max_memory * SPILL_SHARE
+            if args.sort_buffer is None or args.sort_buffer > share:
+                args.sort_buffer = share
+            print(f"💾 Memory budget {args.max_memory:g} MB: sorting the plan on disk with a {args.sort_buffer:g} MB buffer")
+
+    limiter = None
+    if args.apply and (args.max_ops_per_sec or args.adaptive):
+        from throttle import make_limiter
+        limiter = make_limiter(args.max_ops_per_sec, args.adaptive)
+
+    skipped = []
+
+    def on_skip_mount(path):
+        skipped.append((path, mount_entries(path)))
+
+    metrics = None
+    if args.metrics_file:
+        from metrics import RunMetrics
+        metrics = RunMetrics(args.metrics_file, folder, args.metrics_interval).start()
+    profiler = None
+    if args.memory_profile:
+        from memprof import MemoryProfiler
+        profiler = MemoryProfiler().start()
+    success = False
+    try:
+        try:
+            if budget is not None:
+                budget.check()
+            run_folder_cli(folder, args, ignore_dirs, limiter, on_skip_mount, metrics, profiler, hooks)
+        except (RuntimeError, ValueError) as e:
+            print(f"❌ {e}")
+            if metrics is not None:
+                metrics.stats['errors'] += 1
+            sys.exit(1)
+        print_skipped_mounts(skipped)
+        if limiter is not None:
+            print(f"🐢 {limiter.summary()}")
+        if budget is not None:
+            from memprof import format_bytes
+            print(f"🧠 Highest memory use {format_bytes(budget.highest)} of {format_bytes(budget.limit)}")
+        success = True
+    finally:
+        if profiler is not None:
+            # Also after a failure: what grew is what a --max-memory stop needs explained
+            profiler.stop()
+            print("\n🧠 Memory by phase (tracemalloc, biggest growth per phase):")
+            print("\n".join(profiler.report()))
+        if metrics is not None:
+            metrics.finish(success)
+            print(f"📈 Metrics written to {args.metrics_file}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+import os
+import re
+import mmap
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from rename import DEFAULT_IGNORE_DIRS
+
+# Files with a NUL byte in their first block are treated as binary
+BINARY_SNIFF_SIZE = 8192
+# Files handed to a worker process per job
+FILES_PER_JOB = 256
+# Below this many files the pool costs more than it saves
+MIN_PARALLEL_FILES = 2000
+# Characters that may not touch a matched segment, so `Utils` never matches inside `MyUtils2`
+_NAME_CHARS = r"\w\-+#.&"
+_NAME_CHAR = re.compile(f"[{_NAME_CHARS}]")
+_SEPARATORS = '/\\'
+# Parents a reference may name without being checked against the renamed entry's folder
+_RELATIVE_PARENTS = ('.', '..')
+
+# Matcher built once per worker process
+_matcher = None
+
+
+def build_mapping(changes):
+    """Map each renamed segment (old name) to its new name; returns (mapping, ambiguous)"""
+    # A name renamed differently in different folders (per-folder config files) can't be
+    # rewritten from the name alone: it is left out and returned in ambiguous, old -> new names
+    mapping = {}
+    ambiguous = {}
+    for old_path, new_path in changes:
+        old_name = os.path.basename(os.fspath(old_path))
+        new_name = os.path.basename(os.fspath(new_path))
+        if old_name == new_name:
+            continue
+        if old_name in ambiguous:
+            ambiguous[old_name].add(new_name)
+        elif mapping.setdefault(old_name, new_name) != new_name:
+            ambiguous[old_name] = {mapping.pop(old_name), new_name}
+    return mapping, ambiguous
+
+
+def build_parents(changes, mapping):
+    """Map each old segment in mapping to the names its folder has before and after the rename"""
+    # None when a change has no folder, so that segment's parent can't be checked
+    parents = {}
+    for old_path, _ in changes:
+        old_path = os.fspath(old_path)
+        name = os.path.basename(old_path)
+        if name not in mapping or parents.get(name, ()) is None:
+            continue
+        parent = os.path.basename(os.path.dirname(old_path))
+        if not parent:
+            parents[name] = None
+            continue
+        names = parents.setdefault(name, set())
+        names.add(parent)
+        names.add(mapping.get(parent, parent))
+    return parents
+
+
+class ReferenceMatcher:
+    """One alternation over every old segment, in a str and a bytes flavour"""
+
+    # parents (from build_parents) lets a reference like `Other Dir/Utils.py` be left alone
+    # when no Utils.py under a folder named Other Dir was renamed
+    def __init__(self, mapping, parents=None):
+        self.mapping = mapping
+        self.parents = parents or {}
+        # Longest first: the regex alternation takes the first branch that matches
+        segments = sorted(mapping, key=len, reverse=True)
+        alternation = '|'.join(re.escape(segment) for segment in segments)
+        self.pattern = re.compile(f"(?<![{_NAME_CHARS}])(?:{alternation})(?![{_NAME_CHARS}])")
+        # The bytes pattern only answers "could this file match", so it needs no boundaries
+        self.prefilter = re.compile('|'.join(re.escape(s) for s in segments).encode('utf-8', 'surrogateescape'))
+
+    def rewrite(self, text):
+        """Return (new_text, number of references rewritten)"""
+        count = 0
+
+        def replace(match):
+            nonlocal count
+            start, end = match.span()
+            segment = match.group()
+            # Only path-like references: next to a separator, or a file name with an extension.
+            # After a separator, the folder written before it must be one the segment was renamed in
+            if start and text[start - 1] in _SEPARATORS:
+                if not self.parent_matches(text, start - 1, segment):
+                    return segment
+                count += 1
+                return self.mapping[segment]
+            if (end < len(text) and text[end] in _SEPARATORS) or '.' in segment.strip('.'):
+                count += 1
+                return self.mapping[segment]
+            return segment
+        return self.pattern.sub(replace, text), count
+
+    def parent_matches(self, text, end, segment):
+        """Whether the path segment ending at text[end] (a separator) can be segment's folder"""
+        if not end or not _NAME_CHAR.match(text[end - 1]):
+            # No folder written before the separator, e.g. `/Utils.py`
+            return True
+        parents = self.parents.get(segment)
+        if parents is None:
+            return True
+        for parent in (*parents, *_RELATIVE_PARENTS):
+            begin = end - len(parent)
+            if begin >= 0 and text.startswith(parent, begin) and not (begin and _NAME_CHAR.match(text[begin - 1])):
+                return True
+        return False
+
+
+def iter_text_files(folder_path, ignore_dirs=None, git_index=False, renames=None):
+    """Yield every regular file below folder_path, skipping ignored directories"""
+    # renames maps old paths to new names for renames applied after the git index was
+    # read without updating it (no git mv), so the listed paths are mapped to where they are now
+    if ignore_dirs is None:
+        ignore_dirs = DEFAULT_IGNORE_DIRS
+    if git_index:
+        from git_index import iter_index_paths
+        root = str(folder_path)
+        for path in iter_index_paths(folder_path):
+            parts = path.split('/')
+            if any(part in ignore_dirs for part in parts[:-1]):
+                continue
+            if renames:
+                old = full = root
+                for part in parts:
+                    old = os.path.join(old, part)
+                    full = os.path.join(full, renames.get(old, part))
+            else:
+                full = os.path.join(root, path)
+            if not os.path.islink(full):
+                yield full
+        return
+    for root, dirs, files in os.walk(folder_path):
+        dirs[:] = [d for d in dirs if d not in ignore_dirs]
+        for name in files:
+            path = os.path.join(root, name)
+            if not os.path.islink(path):
+                yield path
+
+
+def _write_in_place(path, data):
+    with open(path, 'r+b') as f:
+        f.write(data)
+        f.truncate()
+
+
+def _write_back(path, data):
+    """Replace path's content atomically, keeping its mode, owner and hard links"""
+    st = os.stat(path)
+    if st.st_nlink > 1:
+        # A new inode would split the file from its other links
+        _write_in_place(path, data)
+        return
+    fd, temp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.rewrite-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(temp, st.st_mode & 0o7777)
+        if hasattr(os, 'chown') and (st.st_uid, st.st_gid) != (os.getuid(), os.getgid()):
+            try:
+                os.chown(temp, st.st_uid, st.st_gid)
+            except PermissionError:
+                # Only the owner's content can be kept: write through the existing file
+                os.remove(temp)
+                _write_in_place(path, data)
+                return
+        os.replace(temp, path)
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+
+def unified_diff(path, old_lines, new_lines, context=2):
+    """Unified diff for rewrites that only change lines in place"""
+    # Segments never span lines, so lines correspond one to one and
+    # difflib's sequence matching (slow on repetitive files) isn't needed
+    changed = [i for i, (old, new) in enumerate(zip(old_lines, new_lines)) if old != new]
+    out = [f"--- {path}\n", f"+++ {path}\n"]
+    start = 0
+    while start < len(changed):
+        end = start
+        while end + 1 < len(changed) and changed[end + 1] - changed[end] <= 2 * context + 1:
+            end += 1
+        first = max(changed[start] - context, 0)
+        last = min(changed[end] + context + 1, len(old_lines))
+        out.append(f"@@ -{first + 1},{last - first} +{first + 1},{last - first} @@\n")
+        for i in range(first, last):
+            if old_lines[i] == new_lines[i]:
+                out.append(' ' + old_lines[i])
+            else:
+                out.append('-' + old_lines[i])
+                out.append('+' + new_lines[i])
+        start = end + 1
+    return ''.join(line if line.endswith('\n') else line + '\n' for line in out)
+
+
+def rewrite_file(path, matcher, apply=False, context=2):
+    """Rewrite references in one file; returns (path, count, diff) or None when nothing changed"""
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if b'\0' in data[:BINARY_SNIFF_SIZE] or not matcher.prefilter.search(data):
+                    return None
+                raw = data[:]
+    except (OSError, ValueError):
+        return None
+    text = raw.decode('utf-8', 'surrogateescape')
+    new_text, count = matcher.rewrite(text)
+    if not count:
+        return None
+    diff = unified_diff(path, text.splitlines(keepends=True), new_text.splitlines(keepends=True), context)
+    if apply:
+        _write_back(path, new_text.encode('utf-8', 'surrogateescape'))
+    return path, count, diff
+
+
+def _init_worker(mapping, parents=None):
+    global _matcher
+    _matcher = ReferenceMatcher(mapping, parents)
+
+
+def _rewrite_job(paths, apply):
+    results = []
+    for path in paths:
+        result = rewrite_file(path, _matcher, apply)
+        if result is not None:
+            results.append(result)
+    return results
+
+
+def _jobs(paths):
+    job = []
+    for path in paths:
+        job.append(path)
+        if len(job) >= FILES_PER_JOB:
+            yield job
+            job = []
+    if job:
+        yield job
+
+
+def rewrite_references(folder_path, changes, apply=False, ignore_dirs=None, workers=None, git_index=False,
+                       on_result=None, applied=False, on_ambiguous=None):
+    """Rewrite references to the renamed segments in every text file below folder_path"""
+    # applied: changes were renamed on disk but not in the git index, so index paths are mapped.
+    # on_ambiguous(old_name, new_names) hears about each name that is left alone
+    mapping, ambiguous = build_mapping(changes)
+    if on_ambiguous is not None:
+        for old_name in sorted(ambiguous):
+            on_ambiguous(old_name, sorted(ambiguous[old_name]))
+    if not mapping:
+        return []
+    parents = build_parents(changes, mapping)
+    renames = None
+    if git_index and applied:
+        renames = {os.fspath(old): os.path.basename(os.fspath(new)) for old, new in changes}
+    paths = list(iter_text_files(folder_path, ignore_dirs, git_index, renames))
+    results = []
+
+    def collect(batch):
+        for result in batch:
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+
+    if workers == 1 or len(paths) < MIN_PARALLEL_FILES:
+        _init_worker(mapping, parents)
+        collect(_rewrite_job(paths, apply))
+        return results
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(mapping, parents)) as executor:
+        jobs = list(_jobs(paths))
+        for batch in executor.map(_rewrite_job, jobs, [apply] * len(jobs)):
+            collect(batch)
+    return results
@@ -0,0 +1,264 @@
+import sys
+import os
+import hmac
+import json
+import secrets
+import socket
+import socketserver
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from cleaner import read_rules, DEFAULT_RULES
+from dirconfig import DirConfig, STYLES
+from rename import DEFAULT_IGNORE_DIRS, apply_rename, walk_tree
+from client import DEFAULT_PORT, default_socket_path, default_token_path, read_token
+
+# Directory listings newer than this are re-read, their mtime may not have ticked yet
+RACY_WINDOW_NS = 2_000_000_000
+# Roots whose listings are kept; the least recently planned one is dropped first
+SCAN_ROOTS_LIMIT = 8
+
+
+def ensure_token(path):
+    """Return the request token stored at path, creating the file (mode 0600) on first start"""
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        if hasattr(os, 'getuid'):
+            st = os.stat(path)
+            if st.st_uid != os.getuid() or st.st_mode & 0o077:
+                raise PermissionError(f"Token file {path} must be yours and private (chmod 600 {path})") from None
+        token = read_token(path)
+        if not token:
+            raise ValueError(f"Token file {path} is empty; delete it to get a new token")
+        return token
+    token = secrets.token_hex(32)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(token + '\n')
+    return token
+
+
+class RuleCache:
+    """Rules files parsed once and reloaded only when their mtime changes"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rules = {}
+
+    def get(self, path):
+        """Return (version, rules) for a rules file, or the defaults when path is None"""
+        if path is None:
+            return None, DEFAULT_RULES
+        mtime = os.stat(path).st_mtime_ns
+        with self.lock:
+            cached = self.rules.get(path)
+            if cached is None or cached[0] != mtime:
+                try:
+                    rules = read_rules(path)
+                except ValueError:
+                    # Invalid JSON falls back to the defaults, like cleaner.load_rules
+                    rules = DEFAULT_RULES
+                cached = self.rules[path] = (mtime, rules)
+            return cached
+
+    def config(self, path, style, ignore_dirs):
+        """Return the root DirConfig for one rule set, style and ignore list"""
+        # Rule sets are shared by content, so an edited file gets a fresh name cache
+        _, rules = self.get(path)
+        return DirConfig.root(rules, style, ignore_dirs)
+
+
+class ScanCache:
+    """Directory listings per root, revalidated by directory mtime"""
+
+    def __init__(self, limit=SCAN_ROOTS_LIMIT):
+        self.lock = threading.Lock()
+        self.limit = limit
+        self.roots = {}
+        # key -> [lock, requests using it]; dropped when the last request is done
+        self.root_locks = {}
+
+    @contextmanager
+    def root_lock(self, key):
+        """Serialize requests on one root"""
+        with self.lock:
+            entry = self.root_locks.get(key)
+            if entry is None:
+                entry = self.root_locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self.lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self.root_locks[key]
+
+    def plan(self, folder, config):
+        """Plan renames bottom-up like rename.iter_renames, reusing unchanged listings"""
+        # config is the root dirconfig.DirConfig; config files below are honoured like in a walk
+        key = (folder, config.ignore_dirs)
+        with self.lock:
+            old = self.roots.pop(key, {})
+        new = {}
+        changes = []
+
+        def scandir(path):
+            listing = new[path] = self._listing(path, old)
+            return listing[2]
+
+        for current, files, dirs, dir_config in walk_tree(folder, config=config, scandir=scandir):
+            clean = dir_config.ruleset.clean
+            for name in files + dirs:
+                new_name = clean(name)
+                if new_name != name:
+                    changes.append((str(current / name), str(current / new_name)))
+        with self.lock:
+            self.roots[key] = new
+            while len(self.roots) > self.limit:
+                del self.roots[next(iter(self.roots))]
+        return changes
+
+    def _listing(self, path, old):
+        mtime = os.stat(path).st_mtime_ns
+        cached = old.get(path)
+        if cached is not None and cached[0] == mtime and cached[1] - mtime > RACY_WINDOW_NS:
+            return cached
+        listed_at = time.time_ns()
+        with os.scandir(path) as it:
+            return (mtime, listed_at, list(it))
+
+    def forget(self, folder, config):
+        with self.lock:
+            self.roots.pop((folder, config.ignore_dirs), None)
+
+
+class PlanningServer:
+    """Answers plan and apply requests with warm rule and scan caches"""
+
+    def __init__(self):
+        self.rules = RuleCache()
+        self.scans = ScanCache()
+
+    def handle(self, message):
+        cmd = message.get('cmd')
+        if cmd == 'ping':
+            return {'ok': True}
+        if cmd not in ('plan', 'apply'):
+            return {'ok': False, 'error': f'unknown command: {cmd}'}
+        folder = os.path.abspath(message['folder'])
+        if not os.path.isdir(folder):
+            return {'ok': False, 'error': f'Folder does not exist: {folder}'}
+        style = message.get('style', 'kebab')
+        if style not in STYLES:
+            return {'ok': False, 'error': f'unknown style: {style}'}
+        ignore = message.get('ignore')
+        ignore_dirs = set(ignore) if ignore else DEFAULT_IGNORE_DIRS
+        config = self.rules.config(message.get('rules'), style, ignore_dirs)
+        with self.scans.root_lock((folder, config.ignore_dirs)):
+            changes = self.scans.plan(folder, config)
+            if cmd == 'apply':
+                applied = []
+                try:
+                    for old, new in changes:
+                        apply_rename(Path(old), Path(new), message.get('git', False))
+                        applied.append((old, new))
+                except Exception as e:
+                    # The renames done before the failure are on disk, the caller has to know them
+                    return {'ok': False, 'error': f"{type(e).__name__}: {e}", 'changes': applied}
+                finally:
+                    self.scans.forget(folder, config)
+        return {'ok': True, 'changes': changes}
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def respond(self, response):
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+        self.wfile.flush()
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                message = None
+            # Anything else on the port, e.g. an HTTP request from a web page, ends the connection
+            if not isinstance(message, dict):
+                self.respond({'ok': False, 'error': 'invalid request, expected one JSON object per line'})
+                return
+            token = message.get('token')
+            if not isinstance(token, str) or not hmac.compare_digest(token.encode('utf-8'), self.server.token):
+                self.respond({'ok': False, 'error': 'invalid token'})
+                return
+            shutdown = False
+            try:
+                if message.get('cmd') == 'shutdown':
+                    shutdown = True
+                    response = {'ok': True}
+                else:
+                    response = self.server.planner.handle(message)
+            except Exception as e:
+                response = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+            self.respond(response)
+            if shutdown:
+                # shutdown() waits for serve_forever, so it can't run on a handler thread
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def serve(socket_path=None, port=None, token_path=None):
+    # Every request carries the token from the per-user token file, so other local
+    # users and web pages that can reach the TCP port can't plan or apply renames
+    token = ensure_token(token_path or default_token_path())
+    if port is None and socket_path is None:
+        socket_path = default_socket_path()
+    if port is None and socket_path is not None and hasattr(socket, 'AF_UNIX'):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = UnixServer(socket_path, RequestHandler)
+        os.chmod(socket_path, 0o600)
+        where = socket_path
+    else:
+        server = TCPServer(('127.0.0.1', port or DEFAULT_PORT), RequestHandler)
+        where = f"127.0.0.1:{server.server_address[1]}"
+    server.planner = PlanningServer()
+    server.token = token.encode('utf-8')
+    print(f"🚀 repo-namer server listening on {where}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if isinstance(server, UnixServer) and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Keep rules and directory scans warm and answer plan/apply requests.")
+    parser.add_argument("--socket", help="Unix socket path (default: /tmp/repo-namer-<uid>.sock)")
+    parser.add_argument("--port", type=int, help=f"Listen on localhost TCP instead (e.g. {DEFAULT_PORT})")
+    parser.add_argument("--token-file", help="Request token file, created on first start (default: ~/.repo-namer-token)")
+    args = parser.parse_args()
+    try:
+        serve(args.socket, args.port, args.token_file)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+from analyze_rules import analyze, minimize_rules, static_findings
+
+
+def test_static_findings_name_each_kind():
+    rules = {' ': '-', 'C#': 'csharp', 'same': 'same', 'x y': 'z', 're:(': '', '!': ''}
+    findings = {keyword: kind for keyword, (kind, _) in static_findings(rules).items()}
+    assert findings == {'C#': 'unreachable', 'same': 'noop', 'x y': 'shadowed', '!': 'filtered', 're:(': 'invalid'}
+
+
+def test_shadowing_is_not_claimed_when_an_earlier_rule_can_rebuild_the_keyword():
+    rules = {'a': '', 'ab': 'x', 'b': 'a', 'aa': 'y'}
+    assert 'aa' not in static_findings(rules)
+
+
+def test_minimized_rules_clean_every_name_the_same():
+    rules = {'c#': 'csharp', ' ': '-', 'same': 'same', 'x y': 'z', '&': 'and'}
+    minimized, removed = minimize_rules(rules)
+    assert minimized == {'c#': 'csharp', ' ': '-', '&': 'and'}
+    assert set(removed) == {'same', 'x y'}
+    names = ['C# Notes', 'Tom & Jerry', 'x y z', 'same thing']
+    result = analyze(names, rules)
+    assert result['mismatches'] == [] and result['minimized'] == minimized
+    assert 'x y' in result['never_fired']
@@ -0,0 +1,58 @@
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from archive import rename_archive
+
+
+def write_zip(path, names):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name in names:
+            archive.writestr(name, f'data of {name}')
+
+
+def write_tar(path, names, mode='w:gz'):
+    with tarfile.open(path, mode) as archive:
+        for name in names:
+            data = f'data of {name}'.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+
+def test_zip_members_are_renamed_with_their_data(tmp_path):
+    write_zip(tmp_path / 'in.zip', ['Docs Dir/My File.txt', 'top.md'])
+    assert rename_archive(tmp_path / 'in.zip', tmp_path / 'out.zip') == []
+    with zipfile.ZipFile(tmp_path / 'out.zip') as archive:
+        assert archive.namelist() == ['docs-dir/my-file.txt', 'top.md']
+        assert archive.read('docs-dir/my-file.txt') == b'data of Docs Dir/My File.txt'
+
+
+@pytest.mark.parametrize('kind', ['zip', 'tar.gz'])
+def test_clean_names_keep_their_name_when_a_dirty_one_comes_first(tmp_path, kind):
+    source, target = tmp_path / f'in.{kind}', tmp_path / f'out.{kind}'
+    (write_zip if kind == 'zip' else write_tar)(source, ['A B.txt', 'a-b.txt'])
+    collisions = rename_archive(source, target)
+    assert collisions == [('A B.txt', 'a-b-1.txt')]
+    if kind == 'zip':
+        with zipfile.ZipFile(target) as archive:
+            assert archive.read('a-b.txt') == b'data of a-b.txt'
+    else:
+        with tarfile.open(target) as archive:
+            assert archive.extractfile('a-b.txt').read() == b'data of a-b.txt'
+
+
+def test_tar_hard_links_follow_the_renamed_target(tmp_path):
+    with tarfile.open(tmp_path / 'in.tar', 'w') as archive:
+        info = tarfile.TarInfo('Big File.bin')
+        info.size = 3
+        archive.addfile(info, io.BytesIO(b'abc'))
+        link = tarfile.TarInfo('Link Here')
+        link.type = tarfile.LNKTYPE
+        link.linkname = 'Big File.bin'
+        archive.addfile(link)
+    rename_archive(tmp_path / 'in.tar', tmp_path / 'out.tar')
+    with tarfile.open(tmp_path / 'out.tar') as archive:
+        assert archive.getmember('link-here').linkname == 'big-file.bin'
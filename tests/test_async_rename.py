@@ -0,0 +1,32 @@
+import asyncio
+
+from async_rename import aapply_renames, aiter_renames
+from rename import iter_renames
+
+
+def make_tree(root):
+    for index in range(3):
+        folder = root / f'Some Dir {index}' / 'Inner Dir'
+        folder.mkdir(parents=True)
+        for name in ('My File.txt', 'Other File.md', 'clean.txt'):
+            (folder / name).write_text(name)
+
+
+async def collect(iterator):
+    return [change async for change in iterator]
+
+
+def test_async_plan_matches_the_sync_plan(tmp_path):
+    make_tree(tmp_path)
+    planned = asyncio.run(collect(aiter_renames(tmp_path, chunk_size=2)))
+    assert planned == list(iter_renames(tmp_path))
+
+
+def test_renames_can_be_applied_while_the_walk_runs(tmp_path):
+    make_tree(tmp_path)
+    applied = asyncio.run(aapply_renames(aiter_renames(tmp_path, chunk_size=2), chunk_size=1))
+    assert len(applied) == 12
+    assert sorted(path.relative_to(tmp_path).as_posix() for path in tmp_path.rglob('*.*')) == [
+        f'some-dir-{index}/inner-dir/{name}' for index in range(3) for name in ('clean.txt', 'my-file.txt',
+                                                                                  'other-file.md')]
+
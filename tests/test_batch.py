@@ -0,0 +1,43 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from batch import read_manifest, run_batch
+
+RENAME = Path(__file__).resolve().parent.parent / 'rename.py'
+
+
+def make_trees(tmp_path):
+    trees = [tmp_path / 'a', tmp_path / 'b']
+    for tree in trees:
+        tree.mkdir()
+        (tree / 'My File.txt').write_text('x')
+    return trees
+
+
+@pytest.mark.parametrize('option', [['--rewrite-refs'], ['--sort-buffer', '8'], ['--max-memory', '512'],
+                                    ['--memory-profile'], ['--metrics-file', 'metrics.prom']])
+def test_single_folder_options_are_refused_in_batch_mode(tmp_path, option):
+    trees = make_trees(tmp_path)
+    result = subprocess.run([sys.executable, str(RENAME), *map(str, trees), *option, '--apply'],
+                            capture_output=True, text=True, cwd=tmp_path)
+    assert result.returncode == 1
+    assert option[0] in result.stdout
+    assert all((tree / 'My File.txt').exists() for tree in trees)
+
+
+def test_a_failing_root_does_not_stop_the_others(tmp_path):
+    trees = make_trees(tmp_path)
+    missing = tmp_path / 'missing'
+    report = run_batch([str(trees[0]), str(missing), str(trees[1]), str(trees[0])], workers=2, apply=True)
+    assert [result['root'] for result in report['results']] == [str(trees[0]), str(missing), str(trees[1])]
+    assert [result['status'] for result in report['results']] == ['ok', 'error', 'ok']
+    assert (report['roots'], report['failed'], report['renamed']) == (3, 1, 2)
+    assert all((tree / 'my-file.txt').exists() for tree in trees)
+
+
+def test_manifest_skips_blank_lines_and_comments(tmp_path):
+    (tmp_path / 'roots.txt').write_text('# roots\n/srv/a\n\n  /srv/b  \n  # old\n')
+    assert read_manifest(tmp_path / 'roots.txt') == ['/srv/a', '/srv/b']
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+import cleaner
+from cleaner import clean_name, compile_rules, read_rules
+
+
+@pytest.fixture
+def rules_file(tmp_path, monkeypatch):
+    """Point the global rules at a rules.json in tmp_path, restoring them afterwards"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cleaner, 'RULES', {})
+    monkeypatch.setattr(cleaner, '_rules_loaded', False)
+
+    def write(rules):
+        (tmp_path / 'rules.json').write_text(json.dumps(rules))
+        cleaner.reload_rules()
+    return write
+
+
+def test_regex_rules_apply_in_order_after_earlier_rules():
+    rules = {' ': '-', 're:-v\\d+$': '', 're:^draft-': 'wip-'}
+    assert clean_name('Draft Report v2', rules=rules) == 'wip-report'
+    assert compile_rules(rules, 'snake').clean('Draft Report v2') == 'wip_report'
+
+
+def test_invalid_regex_rule_is_rejected(tmp_path):
+    (tmp_path / 'rules.json').write_text(json.dumps({'re:(': ''}))
+    with pytest.raises(ValueError):
+        read_rules(tmp_path / 'rules.json')
+
+
+def test_clean_name_follows_reloaded_rules(rules_file):
+    rules_file({' ': '-', 'foo': 'bar'})
+    assert clean_name('Foo File') == 'bar-file'
+    rules_file({' ': '_', 'foo': 'baz'})
+    assert clean_name('Foo File', 'snake') == 'baz_file'
+
+
+def test_ruleset_cleans_each_name_once():
+    ruleset = compile_rules({' ': '-', 'only-in-this-test': ''}, 'kebab')
+    assert [ruleset.clean('A B'), ruleset.clean('A B')] == ['a-b', 'a-b']
+    assert (ruleset.lookups, ruleset.misses) == (2, 1)
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from dirconfig import DirConfig
+from rename import iter_renames
+
+
+def write_config(folder, data):
+    (folder / '.reponamer.json').write_text(json.dumps(data))
+
+
+def plan(root):
+    return sorted((old.relative_to(root).as_posix(), new.name) for old, new in iter_renames(root))
+
+
+def test_configs_cascade_to_every_folder_below(tmp_path):
+    (tmp_path / 'Py Code' / 'Sub Pkg').mkdir(parents=True)
+    (tmp_path / 'Py Code' / 'Sub Pkg' / 'My Module.py').write_text('')
+    (tmp_path / 'Top File.txt').write_text('')
+    write_config(tmp_path / 'Py Code', {'style': 'snake', 'rules': {'module': 'mod'}})
+    write_config(tmp_path / 'Py Code' / 'Sub Pkg', {'rules': {'module': None}})
+    assert plan(tmp_path) == [('Py Code', 'py-code'), ('Py Code/Sub Pkg', 'sub_pkg'),
+                              ('Py Code/Sub Pkg/My Module.py', 'my_module.py'), ('Top File.txt', 'top-file.txt')]
+
+
+def test_skip_and_ignore_apply_below_the_config(tmp_path):
+    (tmp_path / 'Vendor Lib' / 'Inner Dir').mkdir(parents=True)
+    (tmp_path / 'App Dir' / 'Build Out').mkdir(parents=True)
+    write_config(tmp_path / 'Vendor Lib', {'skip': True})
+    write_config(tmp_path / 'App Dir', {'ignore': ['Build Out']})
+    assert plan(tmp_path) == [('App Dir', 'app-dir'), ('Vendor Lib', 'vendor-lib')]
+
+
+def test_identical_settings_share_one_config():
+    root = DirConfig.root({' ': '-'}, 'kebab', ())
+    assert root.merge({'style': 'snake'}, 'a') is root.merge({'style': 'snake'}, 'b')
+    assert root.merge({'style': 'snake'}, 'a').ruleset is DirConfig.root({' ': '-'}, 'snake', ()).ruleset
+
+
+@pytest.mark.parametrize('content', ['[1, 2]', '{bad json', '{"style": "shouty"}'])
+def test_invalid_config_files_are_reported(tmp_path, content):
+    (tmp_path / '.reponamer.json').write_text(content)
+    with pytest.raises(ValueError, match='Invalid config file'):
+        DirConfig.root().child(tmp_path / '.reponamer.json')
@@ -0,0 +1,50 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from estimate import estimate_tree, measure_rename_latency
+
+RENAME = Path(__file__).resolve().parent.parent / 'rename.py'
+
+
+def make_tree(root):
+    for d in range(3):
+        directory = root / f'Dir {d}'
+        directory.mkdir(parents=True)
+        for f in range(4):
+            (directory / f'File {f}.txt').touch()
+        (directory / 'clean.txt').touch()
+    return sorted(root.rglob('*'))
+
+
+def test_small_tree_is_counted_exactly(tmp_path):
+    make_tree(tmp_path)
+    result = estimate_tree(tmp_path, seed=1)
+    assert result['exact']
+    estimates = result['estimates']
+    assert estimates['directories'][0] == 4
+    assert estimates['entries'][0] == 3 + 3 * 5
+    assert estimates['renames'][0] == 3 + 3 * 4
+    assert estimates['collisions'][0] == 0
+
+
+def test_estimate_only_reads_the_tree(tmp_path):
+    before = make_tree(tmp_path)
+    result = estimate_tree(tmp_path, seed=1)
+    assert result['apply_seconds'] is None
+    assert sorted(tmp_path.rglob('*')) == before
+
+
+def test_latency_probe_cleans_up_its_scratch_directory(tmp_path):
+    assert measure_rename_latency(tmp_path) is not None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_estimate_with_several_folders_renames_nothing(tmp_path):
+    trees = [tmp_path / 'a', tmp_path / 'b']
+    before = [make_tree(tree) for tree in trees]
+    result = subprocess.run([sys.executable, str(RENAME), *map(str, trees), '--estimate', '--apply'],
+                            capture_output=True, text=True)
+    assert result.returncode == 1
+    assert '--estimate' in result.stdout
+    assert [sorted(tree.rglob('*')) for tree in trees] == before
@@ -0,0 +1,36 @@
+import os
+import random
+from pathlib import Path
+
+import extsort
+from extsort import ExternalSorter, depth_key
+
+
+def make_changes(count):
+    rng = random.Random(7)
+    changes = []
+    for _ in range(count):
+        parts = [f'Dir {rng.randrange(20)}' for _ in range(rng.randrange(1, 5))]
+        old = os.path.join('root', *parts)
+        changes.append((old, old.lower().replace(' ', '-')))
+    return changes
+
+
+def test_spilled_runs_merge_into_the_in_memory_order(tmp_path, monkeypatch):
+    # A small fan-in makes the tiered merge go through several levels
+    monkeypatch.setattr(extsort, 'MAX_MERGE_FAN_IN', 3)
+    changes = make_changes(3000)
+    expected = [(Path(old), Path(new)) for old, new in sorted(set(changes), key=depth_key)]
+    with ExternalSorter(buffer_mb=0.01, tmpdir=tmp_path) as sorter:
+        sorter.extend(changes)
+        assert sorter.spilled > 1
+        assert list(sorter) == expected
+        assert list(sorter) == expected
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_small_plans_never_touch_disk(tmp_path):
+    with ExternalSorter(tmpdir=tmp_path) as sorter:
+        sorter.extend([('a/b/c', 'a/b/x'), ('a', 'y'), ('a/b/c', 'a/b/x')])
+        assert list(sorter) == [(Path('a/b/c'), Path('a/b/x')), (Path('a'), Path('y'))]
+        assert sorter.spilled == 0 and sorter.directory is None
@@ -0,0 +1,33 @@
+import subprocess
+
+from git_index import iter_index_paths
+from rename import iter_renames
+
+
+def git(cwd, *args):
+    subprocess.run(['git', '-C', str(cwd), *args], check=True, capture_output=True)
+
+
+def make_repo(tmp_path):
+    git(tmp_path, 'init', '-q')
+    (tmp_path / 'Src Dir' / 'Sub Dir').mkdir(parents=True)
+    (tmp_path / 'Src Dir' / 'Sub Dir' / 'My File.py').write_text('x')
+    (tmp_path / 'Top File.md').write_text('x')
+    (tmp_path / '.gitignore').write_text('Build Out/\n')
+    git(tmp_path, 'add', '.')
+    (tmp_path / 'Build Out').mkdir()
+    (tmp_path / 'Build Out' / 'Untracked File.o').write_text('x')
+    return tmp_path
+
+
+def test_index_plan_matches_the_walk_for_tracked_files(tmp_path):
+    repo = make_repo(tmp_path)
+    planned = set(iter_renames(repo, git_index=True))
+    walked = {change for change in iter_renames(repo) if 'Build Out' not in change[0].parts}
+    assert planned == walked
+    assert all('Build Out' not in old.parts for old, _ in planned)
+
+
+def test_index_paths_are_relative_to_the_folder(tmp_path):
+    repo = make_repo(tmp_path)
+    assert sorted(iter_index_paths(repo / 'Src Dir')) == ['Sub Dir/My File.py']
@@ -0,0 +1,37 @@
+import pytest
+
+pytest.importorskip('PySide6')
+from gui_pyside6 import RenameWorker
+
+
+def test_failed_apply_keeps_the_error_and_the_applied_prefix(tmp_path):
+    (tmp_path / 'A B.txt').write_text('x')
+    items = [(tmp_path / 'A B.txt', tmp_path / 'a-b.txt'), (tmp_path / 'Gone.txt', tmp_path / 'gone.txt')]
+    worker = RenameWorker(tmp_path, items=items)
+    applied = []
+    worker.batch_ready.connect(applied.extend)
+    worker.run()
+    assert worker.error is not None and not worker.was_cancelled
+    assert applied == items[:1]
+
+
+def test_cancelled_preview_is_marked(tmp_path):
+    (tmp_path / 'A B.txt').write_text('x')
+    worker = RenameWorker(tmp_path)
+    worker.cancel()
+    worker.run()
+    assert worker.was_cancelled and worker.error is None
+
+
+def test_filter_matches_rows_added_before_and_after_it():
+    from gui_pyside6 import ChangesModel
+    model = ChangesModel()
+    model.set_changes([('a/Read Me.md', 'a/read-me.md'), ('b/Notes.txt', 'b/notes.txt')])
+    model.set_filter('read')
+    assert [model.plan_index(row) for row in range(model.rowCount())] == [0]
+    model.append_changes([('c/Readme Old', 'c/readme-old'), ('d/Other', 'd/other')])
+    assert [model.plan_index(row) for row in range(model.rowCount())] == [0, 2]
+    model.set_filter('readme')
+    assert [model.plan_index(row) for row in range(model.rowCount())] == [2]
+    model.set_filter('')
+    assert model.rowCount() == 4
@@ -0,0 +1,105 @@
+import pytest
+
+pytest.importorskip('tkinterdnd2')
+import gui_tkinter
+
+
+class FakeWidget:
+    """Stands in for the Tk widgets finish_task touches, collecting the text written"""
+
+    def __init__(self):
+        self.text = ''
+
+    def insert(self, index, text):
+        self.text = text + self.text if index == 1.0 else self.text + text
+
+    def config(self, **options):
+        pass
+
+    stop = start = config
+
+
+    def delete(self, start, end):
+        self.text = ''
+
+
+class FakeVar:
+    def __init__(self, value=None):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+def make_gui(kind, error=None, results=(('a', 'b'),)):
+    gui = gui_tkinter.RepoNamerGUI.__new__(gui_tkinter.RepoNamerGUI)
+    gui.output_text = FakeWidget()
+    gui.progress_bar = gui.preview_button = gui.apply_button = gui.cancel_button = gui.style_combo = FakeWidget()
+    gui.status_var = FakeVar()
+    gui.task_kind = kind
+    gui.task_error = error
+    gui.task_results = list(results)
+    gui.task_total = len(results)
+    gui.task_key = (('folder', frozenset(), ()), 'kebab')
+    gui.shown_lines = len(results)
+    gui.changes = []
+    gui.plan_cache = {}
+    gui.plan_cache_rows = 0
+    gui.previewed_key = None
+    gui.task_variants = {}
+    gui.worker = None
+    return gui
+
+
+def test_failed_preview_is_not_offered_for_apply():
+    gui = make_gui('preview', error='boom')
+    gui.finish_task(False)
+    assert gui.changes == []
+    assert 'boom' in gui.output_text.text and 'Click' not in gui.output_text.text
+
+
+def test_failed_apply_does_not_report_success():
+    gui = make_gui('apply', error='boom')
+    gui.finish_task(False)
+    assert 'boom' in gui.output_text.text and 'All changes have been applied' not in gui.output_text.text
+
+
+def test_finished_preview_is_cached():
+    gui = make_gui('preview')
+    gui.finish_task(False)
+    assert gui.changes == [('a', 'b')]
+    assert gui.plan_cache == {gui.task_key: [('a', 'b')]}
+
+
+def test_first_style_switch_plans_the_remaining_styles_in_one_walk(tmp_path, monkeypatch):
+    gui = make_gui('preview')
+    gui.folder_path = FakeVar(str(tmp_path))
+    gui.ignore_var = FakeVar('')
+    gui.style_var = FakeVar('snake')
+    key = gui.plan_key(tmp_path, None)
+    gui.previewed_key = key
+    gui.plan_cache = {(key, 'kebab'): []}
+    started = []
+    monkeypatch.setattr(gui, 'start_task', lambda *args: started.append(args))
+    gui.show_style()
+    assert started[0][0] == 'preview' and started[0][-1] == ['snake', 'lower-camel', 'upper-camel']
+
+
+def test_style_switch_on_another_folder_drops_the_shown_plan(tmp_path):
+    gui = make_gui('preview')
+    gui.folder_path = FakeVar(str(tmp_path))
+    gui.ignore_var = FakeVar('')
+    gui.style_var = FakeVar('snake')
+    gui.changes = [('a', 'b')]
+    gui.show_style()
+    assert gui.changes == []
+
+
+def test_other_styles_planned_in_the_walk_are_cached():
+    gui = make_gui('preview')
+    gui.task_variants = {'snake': [('a', 'c')]}
+    gui.finish_task(False)
+    assert gui.plan_cache[(gui.task_key[0], 'snake')] == [('a', 'c')]
@@ -0,0 +1,59 @@
+import pytest
+
+from hooks import Hooks
+from rename import apply_plan, iter_renames
+
+
+def make_tree(root):
+    (root / 'Some Dir').mkdir()
+    for name in ('A File.txt', 'B File.txt', 'Keep Me.txt'):
+        (root / 'Some Dir' / name).write_text(name)
+
+
+def test_batches_are_delivered_when_full_and_on_flush():
+    clock = [0.0]
+    hooks = Hooks(batch_size=2, flush_interval=1.0, clock=lambda: clock[0])
+    batches = []
+    hooks.add('on_planned', batches.append)
+    for item in range(3):
+        hooks.emit('on_planned', item)
+    hooks.tick()
+    assert batches == [[0, 1]]
+    clock[0] = 1.0
+    hooks.tick()
+    assert batches == [[0, 1], [2]]
+
+
+def test_unknown_events_are_rejected():
+    with pytest.raises(ValueError):
+        Hooks().add('on_renamed', print)
+
+
+def test_planning_reports_every_rename(tmp_path):
+    make_tree(tmp_path)
+    hooks = Hooks(batch_size=2)
+    planned, scanned = [], []
+    hooks.add('on_planned', planned.extend)
+    hooks.add('on_directory_scanned', scanned.extend)
+    assert list(iter_renames(tmp_path, hooks=hooks)) == planned
+    assert sorted(path.name for path, _ in scanned) == ['Some Dir', tmp_path.name]
+
+
+def test_vetoed_and_skipped_renames_are_left_out(tmp_path):
+    make_tree(tmp_path)
+    changes = list(iter_renames(tmp_path))
+    hooks = Hooks()
+    after, errors = [], []
+    hooks.add('before_rename', lambda old, new: old.name != 'A File.txt')
+    hooks.add('after_rename', after.extend)
+
+    @hooks.on('on_error')
+    def skip(path, new_path, error):
+        errors.append(path.name)
+        return True
+
+    (tmp_path / 'Some Dir' / 'B File.txt').unlink()
+    applied = apply_plan(changes, hooks=hooks)
+    assert [old.name for old, _ in applied] == ['Keep Me.txt', 'Some Dir']
+    assert after == applied and errors == ['B File.txt']
+    assert sorted(path.name for path in (tmp_path / 'some-dir').iterdir()) == ['A File.txt', 'keep-me.txt']
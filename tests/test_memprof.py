@@ -0,0 +1,38 @@
+import pytest
+
+from hooks import Hooks
+from memprof import MemoryBudget, MemoryLimitExceeded, MemoryProfiler, format_bytes
+from rename import iter_renames
+
+
+def test_budget_stops_the_scan_once_memory_passes_the_limit(tmp_path):
+    for index in range(5):
+        (tmp_path / f'Some Dir {index}').mkdir()
+    used = iter(range(100, 1000, 100))
+    budget = MemoryBudget(250, measure=lambda: next(used))
+    hooks = budget.watch(Hooks(batch_size=1))
+    with pytest.raises(MemoryLimitExceeded, match='--max-memory'):
+        list(iter_renames(tmp_path, hooks=hooks))
+    assert budget.highest == 300
+
+
+def test_unknown_memory_never_stops_the_run():
+    assert MemoryBudget(1, measure=lambda: None).check() is None
+
+
+def test_profiler_reports_growth_per_phase():
+    profiler = MemoryProfiler(top=3).start()
+    try:
+        with profiler.phase('scan'):
+            kept = [str(index) * 10 for index in range(20000)]
+    finally:
+        profiler.stop()
+    (phase,) = profiler.phases
+    assert phase.name == 'scan' and phase.peak >= phase.current > 0
+    assert phase.growth and 'test_memprof.py' in profiler.report()[1]
+    assert kept
+
+
+def test_sizes_are_human_readable():
+    assert [format_bytes(size) for size in (512, 2048, 3 * 1024 ** 2, 5 * 1024 ** 3)] == [
+        '512 B', '2.0 KB', '3.0 MB', '5.00 GB']
@@ -0,0 +1,45 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from metrics import RunMetrics
+
+RENAME = Path(__file__).resolve().parent.parent / 'rename.py'
+
+
+def samples(text):
+    """metric name with labels -> value, for the sample lines of a textfile"""
+    return dict(line.rsplit(' ', 1) for line in text.splitlines() if not line.startswith('#'))
+
+
+def test_run_writes_counts_and_outcome(tmp_path):
+    tree = tmp_path / 'tree'
+    (tree / 'Some Dir').mkdir(parents=True)
+    (tree / 'Some Dir' / 'My File.txt').write_text('x')
+    prom = tmp_path / 'run.prom'
+    result = subprocess.run([sys.executable, str(RENAME), str(tree), '--apply', '--metrics-file', str(prom)],
+                            capture_output=True, text=True, cwd=tmp_path)
+    assert result.returncode == 0, result.stdout + result.stderr
+    values = samples(prom.read_text())
+    root = f'root="{tree}"'
+    assert values[f'reponamer_renames_planned_total{{{root}, kind="file"}}'] == '1'
+    assert values[f'reponamer_renames_applied_total{{{root}, kind="directory"}}'] == '1'
+    assert values[f'reponamer_run_success{{{root}}}'] == '1'
+    assert values[f'reponamer_run_in_progress{{{root}}}'] == '0'
+    assert [path.name for path in tmp_path.iterdir() if path.name.startswith('.metrics-')] == []
+
+
+def test_labels_are_escaped(tmp_path):
+    metrics = RunMetrics(tmp_path / 'run.prom', 'a"b\\c', interval=0)
+    metrics.start()
+    metrics.finish(False)
+    text = (tmp_path / 'run.prom').read_text()
+    assert 'root="a\\"b\\\\c"' in text
+    assert samples(text)['reponamer_run_success{root="a\\"b\\\\c"}'] == '0'
+
+
+def test_time_spent_applying_is_not_counted_twice():
+    metrics = RunMetrics('unused.prom', 'root')
+    with metrics.phase('scan'):
+        metrics.stats['apply_seconds'] += 5.0
+    assert metrics.phases['scan'] == 0.0
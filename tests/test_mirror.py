@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from mirror import MARKER, mirror_tree
+
+RENAME = Path(__file__).resolve().parent.parent / 'rename.py'
+
+
+def make_tree(root):
+    (root / 'My Docs').mkdir(parents=True)
+    (root / 'My Docs' / 'Read Me.txt').write_text('hello')
+    (root / 'Top File.md').write_text('top')
+    return sorted(str(p.relative_to(root)) for p in root.rglob('*'))
+
+
+def listing(root):
+    return sorted(str(p.relative_to(root)) for p in root.rglob('*'))
+
+
+def run_rename(*args):
+    return subprocess.run([sys.executable, str(RENAME), *map(str, args)], capture_output=True, text=True)
+
+
+def test_mirror_apply_leaves_source_untouched(tmp_path):
+    source = tmp_path / 'source'
+    before = make_tree(source)
+    result = run_rename(source, '--mirror', tmp_path / 'mirror', '--apply')
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert listing(source) == before
+    assert listing(tmp_path / 'mirror') == sorted([MARKER, 'my-docs', 'my-docs/read-me.txt', 'top-file.md'])
+    assert (tmp_path / 'mirror' / 'my-docs' / 'read-me.txt').read_text() == 'hello'
+
+
+def test_mirror_with_several_folders_is_refused(tmp_path):
+    trees = [tmp_path / 'a', tmp_path / 'b']
+    before = [make_tree(tree) for tree in trees]
+    result = run_rename(*trees, '--mirror', tmp_path / 'mirror', '--apply')
+    assert result.returncode == 1
+    assert '--mirror' in result.stdout
+    assert [listing(tree) for tree in trees] == before
+    assert not (tmp_path / 'mirror').exists()
+
+
+def test_skipped_directory_is_mirrored_unrenamed(tmp_path):
+    source = tmp_path / 'source'
+    make_tree(source)
+    vendor = source / 'Vendor Lib'
+    (vendor / 'Sub Dir').mkdir(parents=True)
+    (vendor / 'Sub Dir' / 'Keep Me.c').write_text('int x;')
+    (vendor / '.reponamer.json').write_text(json.dumps({'skip': True}))
+    summary = mirror_tree(source, tmp_path / 'mirror', apply=True)
+    assert summary['skipped'] == 0
+    mirrored = tmp_path / 'mirror' / 'vendor-lib'
+    assert (mirrored / 'Sub Dir' / 'Keep Me.c').read_text() == 'int x;'
+    assert (mirrored / '.reponamer.json').exists()
@@ -0,0 +1,59 @@
+import os
+from types import SimpleNamespace
+
+from rename import walk_tree
+
+
+class MountedEntry:
+    """A DirEntry whose stat reports another device, as a mount point's does"""
+
+    def __init__(self, entry):
+        self.entry = entry
+        self.name = entry.name
+        self.path = entry.path
+
+    def is_symlink(self):
+        return False
+
+    def is_dir(self, follow_symlinks=True):
+        return True
+
+    def stat(self, follow_symlinks=True):
+        st = self.entry.stat(follow_symlinks=follow_symlinks)
+        return SimpleNamespace(st_dev=st.st_dev + 1, st_ino=st.st_ino)
+
+
+def make_tree(tmp_path):
+    (tmp_path / 'Mounted Disk' / 'Deep Dir').mkdir(parents=True)
+    (tmp_path / 'Local Dir').mkdir()
+
+    def scandir(path):
+        # Everything inside the mount is on its device too
+        inside = 'Mounted Disk' in path.parts
+        with os.scandir(path) as it:
+            return [MountedEntry(entry) if inside or entry.name == 'Mounted Disk' else entry for entry in it]
+    return scandir
+
+
+def walked(tmp_path, **options):
+    return {path.relative_to(tmp_path).as_posix(): sorted(dirs) for path, _, dirs, _ in walk_tree(tmp_path, **options)}
+
+
+def test_mount_points_are_neither_named_nor_scanned_with_one_file_system(tmp_path):
+    scandir = make_tree(tmp_path)
+    skipped = []
+    assert walked(tmp_path, one_file_system=True, on_skip_mount=skipped.append, scandir=scandir) == {
+        'Local Dir': [], '.': ['Local Dir']}
+    assert skipped == [tmp_path / 'Mounted Disk']
+
+
+def test_allowlisted_mounts_are_scanned_but_keep_their_name(tmp_path):
+    scandir = make_tree(tmp_path)
+    result = walked(tmp_path, one_file_system=True, include_mounts=[tmp_path / 'Mounted Disk'], scandir=scandir)
+    assert result['Mounted Disk'] == ['Deep Dir']
+    assert result['.'] == ['Local Dir']
+
+
+def test_mounts_are_crossed_by_default(tmp_path):
+    scandir = make_tree(tmp_path)
+    assert walked(tmp_path, scandir=scandir)['.'] == ['Local Dir', 'Mounted Disk']
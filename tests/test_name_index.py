@@ -0,0 +1,25 @@
+from cleaner import compile_rules
+from name_index import NameIndex
+
+NAMES = ['C# Notes', 'Tom & Jerry', 'plain', 'Read Me.md', 'a+b', 'Draft v2.txt']
+
+
+def test_edits_reclean_only_affected_names_and_match_a_full_clean():
+    rules = {'c#': 'csharp', ' ': '-', '&': 'and'}
+    index = NameIndex(NAMES, rules)
+    edited = {'c#': 'cs', ' ': '-', '&': 'and'}
+    assert index.update_rules(edited) == 1
+    assert index.changed_names() == [('C# Notes', 'csharp-notes', 'cs-notes')]
+    for edit in ({' ': '_', '&': 'and'}, {' ': '-', '&': 'and', 're:-v\\d+': ''}, {'&': 'and', ' ': '-', 'c#': 'cs'}):
+        index.update_rules(edit)
+        clean = compile_rules(edit).clean
+        assert index.current == [clean(name) for name in index.names]
+
+
+def test_reverting_an_edit_leaves_no_changes():
+    rules = {' ': '-'}
+    index = NameIndex(NAMES, rules)
+    index.update_rules({' ': '_'})
+    assert index.changed_names()
+    index.update_rules(rules)
+    assert index.changed_names() == []
@@ -0,0 +1,13 @@
+from rename import iter_renames, plan_variants
+
+STYLES = ['kebab', 'snake', 'lower-camel', 'upper-camel']
+
+
+def test_one_walk_matches_a_walk_per_style(tmp_path):
+    (tmp_path / 'Some Dir' / 'Inner Dir').mkdir(parents=True)
+    (tmp_path / 'Some Dir' / 'Inner Dir' / 'My File.txt').write_text('x')
+    (tmp_path / 'Top File.md').write_text('x')
+    (tmp_path / 'Some Dir' / '.reponamer.json').write_text('{"style": "snake"}')
+    plans = plan_variants(tmp_path, [(None, style) for style in STYLES])
+    assert plans == [list(iter_renames(tmp_path, style=style)) for style in STYLES]
+    assert (tmp_path / 'Some Dir' / 'Inner Dir', tmp_path / 'Some Dir' / 'inner_dir') in plans[0]
@@ -0,0 +1,74 @@
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from rename import iter_renames, apply_rename
+from rewrite_refs import build_mapping, rewrite_references
+
+
+def test_path_like_references_are_rewritten(tmp_path):
+    (tmp_path / 'Docs Dir').mkdir()
+    (tmp_path / 'Docs Dir' / 'My Notes.md').write_text('notes')
+    (tmp_path / 'index.md').write_text('See Docs Dir/My Notes.md, not the Docs Dir class.\n')
+    changes = list(iter_renames(tmp_path))
+    results = rewrite_references(tmp_path, changes, apply=True, workers=1)
+    assert [count for _, count, _ in results] == [2]
+    assert (tmp_path / 'index.md').read_text() == 'See docs-dir/my-notes.md, not the Docs Dir class.\n'
+
+
+def test_names_renamed_differently_are_left_alone():
+    changes = [(Path('a/My File.txt'), Path('a/my-file.txt')), (Path('b/My File.txt'), Path('b/my_file.txt')),
+               (Path('c/Other One.txt'), Path('c/other-one.txt'))]
+    mapping, ambiguous = build_mapping(changes)
+    assert mapping == {'Other One.txt': 'other-one.txt'}
+    assert ambiguous == {'My File.txt': {'my-file.txt', 'my_file.txt'}}
+
+
+def git(cwd, *args):
+    subprocess.run(['git', '-C', str(cwd), *args], check=True, capture_output=True)
+
+
+@pytest.mark.parametrize('use_git', [False, True])
+def test_git_index_files_are_found_after_apply(tmp_path, monkeypatch, use_git):
+    monkeypatch.chdir(tmp_path)
+    git(tmp_path, 'init', '-q')
+    git(tmp_path, 'config', 'user.email', 'test@example.com')
+    git(tmp_path, 'config', 'user.name', 'test')
+    (tmp_path / 'Docs Dir').mkdir()
+    (tmp_path / 'Docs Dir' / 'Read Me.md').write_text('see Docs Dir/Other File.txt\n')
+    (tmp_path / 'Docs Dir' / 'Other File.txt').write_text('x')
+    git(tmp_path, 'add', '.')
+    git(tmp_path, 'commit', '-qm', 'init')
+    changes = list(iter_renames(tmp_path, git_index=True))
+    for old, new in changes:
+        apply_rename(old, new, use_git)
+    results = rewrite_references(tmp_path, changes, apply=True, workers=1, git_index=True, applied=not use_git)
+    assert [Path(path).name for path, _, _ in results] == ['read-me.md']
+    assert (tmp_path / 'docs-dir' / 'read-me.md').read_text() == 'see docs-dir/other-file.txt\n'
+
+
+def test_references_under_another_folder_are_left_alone(tmp_path):
+    (tmp_path / 'Docs Dir').mkdir()
+    (tmp_path / 'Docs Dir' / 'My Notes.md').write_text('notes')
+    text = 'Docs Dir/My Notes.md and ./My Notes.md, but not Other Dir/My Notes.md or xDocs Dir/My Notes.md\n'
+    (tmp_path / 'index.txt').write_text(text)
+    rewrite_references(tmp_path, list(iter_renames(tmp_path)), apply=True, workers=1)
+    assert (tmp_path / 'index.txt').read_text() == (
+        'docs-dir/my-notes.md and ./my-notes.md, but not Other Dir/My Notes.md or xDocs Dir/My Notes.md\n')
+
+
+def test_rewritten_files_keep_mode_and_hard_links(tmp_path):
+    (tmp_path / 'My File.txt').write_text('x')
+    (tmp_path / 'script.sh').write_text('cat ./My File.txt\n')
+    (tmp_path / 'script.sh').chmod(0o751)
+    os.link(tmp_path / 'script.sh', tmp_path / 'linked.sh')
+    (tmp_path / 'notes.txt').write_text('see ./My File.txt\n')
+    (tmp_path / 'notes.txt').chmod(0o640)
+    rewrite_references(tmp_path, list(iter_renames(tmp_path)), apply=True, workers=1)
+    assert (tmp_path / 'linked.sh').read_text() == 'cat ./my-file.txt\n'
+    assert os.path.samefile(tmp_path / 'script.sh', tmp_path / 'linked.sh')
+    assert (tmp_path / 'script.sh').stat().st_mode & 0o777 == 0o751
+    assert (tmp_path / 'notes.txt').read_text() == 'see ./my-file.txt\n'
+    assert (tmp_path / 'notes.txt').stat().st_mode & 0o777 == 0o640
@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+import client
+import server
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def make_tree(tmp_path):
+    folder = tmp_path / 'tree'
+    (folder / 'Some Dir').mkdir(parents=True)
+    (folder / 'Some Dir' / 'My File.txt').write_text('x')
+    return folder
+
+
+def test_plan_matches_the_walk(tmp_path):
+    folder = make_tree(tmp_path)
+    response = server.PlanningServer().handle({'cmd': 'plan', 'folder': str(folder)})
+    assert response == {'ok': True, 'changes': [
+        (str(folder / 'Some Dir' / 'My File.txt'), str(folder / 'Some Dir' / 'my-file.txt')),
+        (str(folder / 'Some Dir'), str(folder / 'some-dir'))]}
+
+
+def test_failed_apply_returns_the_renames_already_done(tmp_path, monkeypatch):
+    folder = make_tree(tmp_path)
+    real_rename = server.apply_rename
+
+    def fail_on_directories(old, new, use_git=False):
+        if old.is_dir():
+            raise PermissionError('read-only directory')
+        real_rename(old, new, use_git)
+
+    monkeypatch.setattr(server, 'apply_rename', fail_on_directories)
+    response = server.PlanningServer().handle({'cmd': 'apply', 'folder': str(folder)})
+    assert not response['ok'] and 'read-only directory' in response['error']
+    assert response['changes'] == [(str(folder / 'Some Dir' / 'My File.txt'), str(folder / 'Some Dir' / 'my-file.txt'))]
+
+
+@pytest.fixture
+def running_server(tmp_path):
+    if not hasattr(server.socket, 'AF_UNIX'):
+        pytest.skip('needs Unix sockets')
+    socket_path = str(tmp_path / 'server.sock')
+    token = server.ensure_token(str(tmp_path / 'token'))
+    instance = server.UnixServer(socket_path, server.RequestHandler)
+    instance.planner = server.PlanningServer()
+    instance.token = token.encode('utf-8')
+    thread = threading.Thread(target=instance.serve_forever, daemon=True)
+    thread.start()
+    yield socket_path, token
+    instance.shutdown()
+    instance.server_close()
+
+
+def test_token_file_is_private(tmp_path):
+    path = tmp_path / 'token'
+    token = server.ensure_token(str(path))
+    assert server.ensure_token(str(path)) == token
+    if hasattr(os, 'getuid'):
+        assert path.stat().st_mode & 0o777 == 0o600
+
+
+def test_requests_need_the_token(running_server, tmp_path):
+    socket_path, token = running_server
+    assert client.request({'cmd': 'ping'}, socket_path, token=token) == {'ok': True}
+    assert client.request({'cmd': 'ping'}, socket_path, token='wrong') == {'ok': False, 'error': 'invalid token'}
+
+
+def test_client_falls_back_to_rename_py_for_options_the_server_lacks(tmp_path):
+    folder = make_tree(tmp_path)
+    env = dict(os.environ, REPO_NAMER_SOCKET=str(tmp_path / 'missing.sock'))
+    result = subprocess.run([sys.executable, str(ROOT / 'client.py'), str(folder), '--no-dir-config'],
+                            capture_output=True, text=True, cwd=tmp_path, env=env)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert 'my-file.txt' in result.stdout
@@ -0,0 +1,17 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_importing_rename_defers_rules_and_heavy_modules(tmp_path):
+    # A rules.json that can't be parsed would be noticed if importing read it
+    (tmp_path / 'rules.json').write_text('{not json')
+    code = ('import sys, rename, cleaner; '
+            'print(cleaner._rules_loaded, sorted({"json", "subprocess", "concurrent.futures", "dirconfig", '
+            '"hooks", "tempfile"} & set(sys.modules)))')
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=tmp_path,
+                            env=dict(os.environ, PYTHONPATH=str(ROOT)))
+    assert result.stdout.split('\n')[0] == 'False []', result.stderr
@@ -0,0 +1,43 @@
+from throttle import AdaptiveRateLimiter, RateLimiter, make_limiter
+
+
+class FakeClock:
+    """A clock that only moves when the limiter sleeps or the test advances it"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_rate_limiter_holds_the_rate_after_the_burst():
+    clock = FakeClock()
+    limiter = RateLimiter(10, burst=1, clock=clock, sleep=clock.sleep)
+    for _ in range(21):
+        limiter.acquire()
+    assert abs(clock.now - 2.0) < 1e-9
+    assert abs(limiter.achieved_rate() - 10.5) < 1e-9
+
+
+def test_adaptive_limiter_backs_off_on_slow_renames_and_recovers():
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(100, clock=clock, sleep=clock.sleep)
+    for latency in [0.01] * 5 + [0.2] * 5:
+        clock.now += 0.1
+        limiter.observe(latency)
+    assert limiter.backoffs >= 1 and limiter.rate <= 50
+    backed_off = limiter.rate
+    for _ in range(50):
+        clock.now += 0.1
+        limiter.observe(0.01)
+    assert limiter.rate > backed_off
+
+
+def test_no_options_means_no_limiter():
+    assert make_limiter() is None
+    assert isinstance(make_limiter(adaptive=True), AdaptiveRateLimiter)
+    assert make_limiter(50).rate == 50
@@ -0,0 +1,74 @@
+import os
+from collections import Counter
+
+from rename import walk_tree
+
+
+def test_directory_removed_mid_walk_is_reported_not_fatal(tmp_path):
+    (tmp_path / 'Gone Dir').mkdir()
+    (tmp_path / 'Kept Dir').mkdir()
+
+    def scandir(path):
+        with os.scandir(path) as it:
+            entries = list(it)
+        if path == tmp_path:
+            (tmp_path / 'Gone Dir').rmdir()
+        return entries
+
+    errors = []
+    stats = Counter()
+    walked = [(path, dirs) for path, _, dirs, _ in walk_tree(
+        tmp_path, stats=stats, scandir=scandir, on_error=lambda *args: errors.append(args))]
+    assert walked == [(tmp_path / 'Kept Dir', []), (tmp_path, ['Kept Dir'])]
+    assert [(path, type(error)) for path, _, error in errors] == [(tmp_path / 'Gone Dir', FileNotFoundError)]
+    assert stats['errors'] == 1
+
+
+def listed(root, **options):
+    return {path.relative_to(root).as_posix(): sorted(files + dirs) for path, files, dirs, _ in walk_tree(root, **options)}
+
+
+def make_linked_tree(tmp_path):
+    root, outside = tmp_path / 'root', tmp_path / 'outside'
+    (root / 'Real Dir').mkdir(parents=True)
+    (outside / 'Inner').mkdir(parents=True)
+    (outside / 'Inner' / 'Far File.txt').write_text('x')
+    os.symlink(outside, root / 'Link Out')
+    os.symlink(outside, root / 'Second Link')
+    os.symlink(root / 'Real Dir', root / 'Link Back')
+    return root
+
+
+def test_symlinked_directories_are_named_but_not_followed_by_default(tmp_path):
+    root = make_linked_tree(tmp_path)
+    assert listed(root) == {'Real Dir': [], '.': ['Link Back', 'Link Out', 'Real Dir', 'Second Link']}
+
+
+def test_followed_links_scan_each_target_once_and_never_back_into_the_tree(tmp_path):
+    root = make_linked_tree(tmp_path)
+    walked = listed(root, symlinks='follow')
+    # Whichever link is listed first is followed; the other one, and the link back into the tree, are only named
+    inner = [path for path in walked if path.endswith('/Inner')]
+    assert len(inner) == 1 and walked[inner[0]] == ['Far File.txt']
+    assert not any(path.startswith('Link Back/') for path in walked)
+    assert walked['.'] == ['Link Back', 'Link Out', 'Real Dir', 'Second Link']
+
+
+def test_symlink_loops_end(tmp_path):
+    (tmp_path / 'a').mkdir()
+    os.symlink(tmp_path / 'a', tmp_path / 'a' / 'loop')
+    assert listed(tmp_path, symlinks='follow') == {'a': ['loop'], '.': ['a']}
+
+
+def test_planning_one_folder_at_a_time_matches_the_walk(tmp_path):
+    from rename import iter_renames, plan_directory
+    (tmp_path / 'Some Dir' / 'Snake Dir' / '.git').mkdir(parents=True)
+    (tmp_path / 'Some Dir' / 'Snake Dir' / 'My File.txt').write_text('x')
+    (tmp_path / 'Some Dir' / '.reponamer.json').write_text('{"style": "snake"}')
+    planned, pending = [], [(tmp_path, None)]
+    while pending:
+        folder, config = pending.pop()
+        subdirs, renames, config = plan_directory(folder, config=config)
+        planned.extend(renames)
+        pending.extend((folder / name, config) for name in subdirs)
+    assert sorted(planned) == sorted(iter_renames(tmp_path))
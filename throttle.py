@@ -0,0 +1,119 @@
+import time
+
+# Ceiling for --adaptive when no --max-ops-per-sec is given
+DEFAULT_ADAPTIVE_MAX = 500.0
+# Slowest rate adaptive mode backs off to
+MIN_RATE = 1.0
+# Back off when recent latency is this many times the baseline
+LATENCY_FACTOR = 2.0
+# Halve the rate at most this often, so one slow burst isn't punished repeatedly
+BACKOFF_COOLDOWN = 1.0
+# Ops/sec added per second while latency stays healthy
+ADDITIVE_INCREASE = 10.0
+# Seconds for the baseline to settle on a new, permanently higher latency
+BASELINE_WINDOW = 30.0
+
+
+class RateLimiter:
+    """Token bucket limiting operations per second, with a small burst allowance"""
+
+    def __init__(self, rate, burst=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.burst = burst if burst is not None else max(1.0, self.rate / 10)
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = self.burst
+        self.last = clock()
+        self.started = None
+        self.ops = 0
+        self.waited = 0.0
+
+    def acquire(self):
+        """Block until one operation may run"""
+        now = self.clock()
+        if self.started is None:
+            self.started = now
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        if self.tokens < 1:
+            delay = (1 - self.tokens) / self.rate
+            self.sleep(delay)
+            self.waited += delay
+            self.last = self.clock()
+            self.tokens = 1.0
+        self.tokens -= 1
+        self.ops += 1
+
+    def observe(self, latency):
+        """Record how long an operation took; the plain limiter ignores it"""
+
+    def run(self, func, *args):
+        """Run func under the limit and feed its latency back"""
+        self.acquire()
+        start = self.clock()
+        try:
+            return func(*args)
+        finally:
+            self.observe(self.clock() - start)
+
+    def achieved_rate(self):
+        if self.started is None:
+            return 0.0
+        elapsed = self.clock() - self.started
+        return self.ops / elapsed if elapsed > 0 else float(self.ops)
+
+    def summary(self):
+        return f"{self.ops} renames at {self.achieved_rate():.1f} ops/s (limit {self.rate:.1f}, waited {self.waited:.1f}s)"
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """AIMD rate control: halve the rate when latency rises, creep back up while it is healthy"""
+
+    def __init__(self, max_rate=DEFAULT_ADAPTIVE_MAX, min_rate=MIN_RATE, clock=time.monotonic, sleep=time.sleep):
+        super().__init__(max_rate, clock=clock, sleep=sleep)
+        self.max_rate = float(max_rate)
+        self.min_rate = float(min_rate)
+        self.baseline = None
+        self.recent = None
+        self.last_backoff = None
+        self.last_observed = None
+        self.backoffs = 0
+
+    def observe(self, latency):
+        now = self.clock()
+        if self.recent is None:
+            self.baseline = self.recent = latency
+            self.last_observed = now
+            return
+        elapsed = now - self.last_observed
+        self.recent += (latency - self.recent) * 0.2
+        # The baseline follows drops at once but rises slowly, so it tracks the unloaded latency
+        if self.recent < self.baseline:
+            self.baseline = self.recent
+        else:
+            self.baseline += (self.recent - self.baseline) * min(1.0, elapsed / BASELINE_WINDOW)
+
+        if self.recent > self.baseline * LATENCY_FACTOR:
+            if self.last_backoff is None or now - self.last_backoff >= BACKOFF_COOLDOWN:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.burst = max(1.0, self.rate / 10)
+                self.tokens = min(self.tokens, self.burst)
+                self.last_backoff = now
+                self.backoffs += 1
+        else:
+            self.rate = min(self.max_rate, self.rate + ADDITIVE_INCREASE * elapsed)
+            self.burst = max(1.0, self.rate / 10)
+        self.last_observed = now
+
+    def summary(self):
+        return (f"{self.ops} renames at {self.achieved_rate():.1f} ops/s "
+                f"(adaptive, now {self.rate:.1f} of {self.max_rate:.1f}, {self.backoffs} backoffs, waited {self.waited:.1f}s)")
+
+
+def make_limiter(max_ops=None, adaptive=False):
+    """Build the limiter for the CLI options, or None when apply is unthrottled"""
+    if adaptive:
+        return AdaptiveRateLimiter(max_ops or DEFAULT_ADAPTIVE_MAX)
+    if max_ops:
+        return RateLimiter(max_ops)
+    return None